@@ -30,7 +30,6 @@ setup(
         "pettingzoo==1.23.1",
         "Pillow==9.5.0",
         "pygame==2.4.0",
-        "scikit-learn==1.2.2",
         "scipy==1.10.1",
         "texasholdem==0.9.0",
     ],
@@ -1,17 +1,23 @@
 from abc import ABC, abstractmethod
+import copy
+import functools
 
 import attrs
+import numpy as np
 
-# If we change from eventlet, we need to change this
-from eventlet.green.threading import Timer
+from .exceptions import PlaygroundInvalidActionException
 from .sid_util import SidSessionInfo
-from typing import Dict, List
+from .timer_wheel import TimerWheel, timer_wheel
+from typing import Any, Dict, List, Optional, Tuple
 import time
 
-# How long does the client have to submit an action
-# TODO: This should really be configurable
+# How long does the client have to submit an action, by default
 TIMEOUT = 5 * 60  # 5 minutes
 
+# Default timeouts for game types (see GameInterface.get_game_type) that differ from TIMEOUT.
+# Models in model-only pools answer in well under a second, so idle games are reclaimed sooner.
+GAME_TYPE_TIMEOUTS = {1: 60}
+
 
 class GameParameterInterface:
     """
@@ -23,7 +29,35 @@ class GameParameterInterface:
     parameters are then used in game matching.
     """
 
-    pass
+    def get_timeout(self, game_type: int) -> Optional[float]:
+        """
+        Parameters can override this to set the move timeout, in seconds, for
+        games of game_type. None leaves it to the game, see GameInterface.timeouts.
+        """
+        return None
+
+
+@attrs.define
+class MoveTimes:
+    """
+    How long a player took to move, in seconds, from the previous move (or the start
+    of the game) to their action being submitted
+    """
+
+    num_moves: int = 0
+    total: float = 0.0
+    longest: float = 0.0
+    last: float = 0.0
+
+    def record(self, seconds: float):
+        self.num_moves += 1
+        self.total += seconds
+        self.longest = max(self.longest, seconds)
+        self.last = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.num_moves if self.num_moves else 0.0
 
 
 @attrs.define
@@ -65,11 +99,86 @@ class PlayerInterface:
         return self.session_info.is_human
 
 
+# Stands in for a player_id that wasn't passed, in get_state cache keys
+_DEFAULT_PLAYER_ID = object()
+
+
+def _cached_get_state(get_state):
+    """
+    Wraps a get_state implementation so it is computed once per iteration for each
+    (player_sid, player_id). Calls with any other argument (e.g. GoGame's delta
+    mode) always go through.
+    """
+
+    @functools.wraps(get_state)
+    def wrapper(self, *args, **kwargs):
+        if not self.cache_state or len(args) > 2 or kwargs.keys() - {"player_sid", "player_id"}:
+            return get_state(self, *args, **kwargs)
+
+        player_sid = args[0] if len(args) > 0 else kwargs.get("player_sid", "")
+        player_id = args[1] if len(args) > 1 else kwargs.get("player_id", _DEFAULT_PLAYER_ID)
+        key = (self.iteration, player_sid, player_id)
+        try:
+            return self.state_cache[key]
+        except KeyError:
+            pass
+
+        state = get_state(self, *args, **kwargs)
+        self.state_cache[key] = state
+        return state
+
+    return wrapper
+
+
+def _invalidates_state_cache(submit_action):
+    """
+    Wraps a submit_action implementation so it clears the get_state cache, even
+    when called directly instead of through advance_game_state
+    """
+
+    @functools.wraps(submit_action)
+    def wrapper(self, *args, **kwargs):
+        self.state_cache.clear()
+        return submit_action(self, *args, **kwargs)
+
+    return wrapper
+
+
 class GameInterface(ABC):
     """
     An abstract class to represent one instance of a running game.
     """
 
+    cache_state = True
+    """
+    Whether get_state results are reused until the next action. Games whose
+    state changes with time, and not only with actions, should set this to False.
+    """
+
+    timers: TimerWheel = timer_wheel
+    """ Where move timeouts are scheduled, shared by all games """
+
+    timeouts: Dict[int, float] = GAME_TYPE_TIMEOUTS
+    """
+    Move timeout for each game type, in seconds. Games can override this, and
+    TIMEOUT is used for game types it doesn't have.
+    """
+
+    snapshot_attributes: Tuple[str, ...] = ("iteration", "reward")
+    """
+    The attributes holding the mutable state of the game, which snapshot copies.
+    Games extend this with their own.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Games define get_state and submit_action themselves, so the cache
+        # is added around their implementations
+        if "get_state" in cls.__dict__:
+            cls.get_state = _cached_get_state(cls.__dict__["get_state"])
+        if "submit_action" in cls.__dict__:
+            cls.submit_action = _invalidates_state_cache(cls.__dict__["submit_action"])
+
     def __init__(
         self,
         game_id: str,
@@ -86,10 +195,19 @@ class GameInterface(ABC):
         self.game_type = game_type
 
         self.reward = 0
-        self.timer_thread = None
+        self.timer = None
         self.self_training = self_training
         self.time_last_updated = time.time()
 
+        self.timeout = self.get_timeout()
+        self.num_timeouts = 0
+        # player_id -> how long they took to move, see record_move_time
+        self.move_times: Dict[int, MoveTimes] = {}
+        self.time_turn_started = self.time_last_updated
+
+        # (iteration, player_sid, player_id) -> get_state result, see cache_state
+        self.state_cache = {}
+
     @abstractmethod
     def submit_action(self, action, player_sid="") -> bool:
         """
@@ -118,6 +236,40 @@ class GameInterface(ABC):
         """
         raise NotImplementedError
 
+    def submit_actions(self, actions: List[Any]):
+        """
+        Submits actions in order, each for the player moving at that point, and
+        increments the iteration after each one. See advance_many.
+
+        Games can override this to defer their per-move bookkeeping (scores,
+        rewards, ...) to after the last action. They still have to stop at the end
+        of the game, raising PlaygroundInvalidActionException for any action after it.
+        """
+        for i, action in enumerate(actions):
+            if self.submit_action(action, self.get_player_moving().sid) is False:
+                raise PlaygroundInvalidActionException(f"Action {i} ({action!r}) was rejected.")
+            self.iteration += 1
+
+    def get_observation(self, player_sid="", player_id=-1):
+        """
+        Games can optionally define this, as a numeric alternative to get_state
+        for model clients that would otherwise parse the JSON into arrays.
+
+        Returns (observation, reward), with the same reward as get_state. The
+        observation is a zero-dimensional structured NumPy array whose dtype,
+        given by get_observation_dtype, is the schema: one field per numeric
+        get_state entry, with the same name where there is one. The layout is
+        fixed for a given game and parameters, so observation.tobytes() can be
+        sent as is and read back with np.frombuffer(buffer, dtype)[0].
+        """
+        raise NotImplementedError
+
+    def get_observation_dtype(self) -> np.dtype:
+        """
+        Games that define get_observation return the dtype of its observations here.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def get_is_game_over(self) -> bool:
         """
@@ -179,25 +331,71 @@ class GameInterface(ABC):
         """
         return self.game_type
 
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns a copy of the mutable state of the game (its snapshot_attributes),
+        which restore can roll the game back to, any number of times. Players,
+        timers and anything else that doesn't change during a game is left out, so
+        this is cheap enough for lookahead search or undoing a rejected action.
+        """
+        return self._copy_state(
+            {name: getattr(self, name) for name in self.snapshot_attributes}
+        )
+
+    def restore(self, snapshot: Dict[str, Any]):
+        """
+        Rolls the game back to a snapshot taken from it
+        """
+        for name, value in self._copy_state(snapshot).items():
+            setattr(self, name, value)
+        self.state_cache.clear()
+
+    def _copy_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copies snapshot values. Games can override this for values with a cheaper
+        way to be copied than copy.deepcopy.
+        """
+        # References to players (e.g. player_moving) keep pointing at the same players
+        memo = {id(player): player for player in self.players.values()}
+        return {name: copy.deepcopy(value, memo) for name, value in state.items()}
+
+    def get_timeout(self) -> float:
+        """
+        Returns the move timeout for this game, in seconds: the one set by its
+        parameters if any, then the one for its game type, then TIMEOUT.
+        """
+        get_parameters_timeout = getattr(self.parameters, "get_timeout", None)
+        if get_parameters_timeout is not None:
+            timeout = get_parameters_timeout(self.game_type)
+            if timeout is not None:
+                return timeout
+        return self.timeouts.get(self.game_type, TIMEOUT)
+
     def reset_timeout(self, callback, callback_args):
         """
         Resets the move timeout, which will call
         callback with callback_args when completed. This generally
-        fires when a player has not made a move in TIMEOUT seconds.
+        fires when a player has not made a move in self.timeout seconds.
         """
-        if self.timer_thread is not None:
-            self.timer_thread.cancel()
-            self.time_last_updated = time.time()
+        if self.timer is not None:
+            self.timers.cancel(self.timer)
+        self.time_last_updated = time.time()
 
         # Set a timer for the next action
-        self.timer_thread = Timer(TIMEOUT, callback, args=callback_args)
-        self.timer_thread.start()
+        self.timer = self.timers.schedule(
+            self.timeout, self._on_timeout, (callback, callback_args)
+        )
+
+    def _on_timeout(self, callback, callback_args):
+        self.num_timeouts += 1
+        callback(*callback_args)
 
     def cancel_timeout(self):
         """
         Stop pending move timeout
         """
-        self.timer_thread.cancel()
+        if self.timer is not None:
+            self.timers.cancel(self.timer)
 
     @property
     def timeout_timestamp(self) -> int:
@@ -205,13 +403,47 @@ class GameInterface(ABC):
         Returns time, in seconds since epoch, when the current pending
         move times out
         """
-        return int(self.time_last_updated + TIMEOUT)
+        return int(self.time_last_updated + self.timeout)
+
+    def record_move_time(self, player_id: int):
+        """
+        Records how long player_id took to move, and starts timing the next move
+        """
+        now = time.time()
+        if player_id not in self.move_times:
+            self.move_times[player_id] = MoveTimes()
+        self.move_times[player_id].record(now - self.time_turn_started)
+        self.time_turn_started = now
 
     # will call the game-specific function to advance state,
     def advance_game_state(self, action, player_sid="") -> bool:
         """
         Function to internally advance the state of the game
         """
+        player_id = self.get_player_moving().player_id
         result = self.submit_action(action, player_sid)
         self.iteration += 1
+        self.state_cache.clear()
+        self.record_move_time(player_id)
         return result
+
+    def advance_many(self, actions) -> int:
+        """
+        Applies a sequence of actions, each for the player moving at that point, e.g.
+        to replay a game from its log or fast-forward to a test position. This is for
+        trusted, server side use: player SIDs aren't checked and move times aren't recorded.
+
+        If an action is invalid, the game is rolled back to before the first one and the
+        exception is raised.
+        :return: The number of actions applied
+        """
+        actions = list(actions)
+        snapshot = self.snapshot()
+        try:
+            self.submit_actions(actions)
+        except Exception:
+            self.restore(snapshot)
+            raise
+        self.state_cache.clear()
+        self.time_turn_started = time.time()
+        return len(actions)
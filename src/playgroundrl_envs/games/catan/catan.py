@@ -37,6 +37,12 @@ class CatanParameters(GameParameterInterface):
 
 
 class CatanGame(GameInterface):
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "game",
+        "winning_player",
+        "is_game_over",
+    )
+
     def __init__(
         self,
         game_id,
@@ -131,6 +137,29 @@ class CatanGame(GameInterface):
         # TODO: Reward
         return state_json, 0
 
+    def _copy_state(self, state):
+        # Catanatron copies its own games much faster than deepcopy, keeping the players
+        copied = super()._copy_state({name: value for name, value in state.items() if name != "game"})
+        copied["game"] = state["game"].copy()
+        return copied
+
+    def get_observation(self, player_sid="", player_id=-1):
+        player_moving: SidSessionInfo = self.get_player_moving()
+
+        if player_id == -1:
+            player = player_moving
+        else:
+            player = self.players[player_id]
+
+        observation = self.encoder.convert_observation(self.game, player.player_id)
+        observation["player_moving_id"] = player_moving.player_id
+
+        # TODO: Reward
+        return observation, 0
+
+    def get_observation_dtype(self):
+        return self.encoder.observation_dtype
+
     @staticmethod
     def get_game_name():
         return "catan"
@@ -1,12 +1,14 @@
 import json
 from enum import Enum
+import numpy as np
 import sys
 from typing import Dict, List
 
 from catanatron.models.map import Water, Port, LandTile
 from catanatron.game import Game
 from catanatron.models.player import Color
-from catanatron.models.enums import RESOURCES, Action, ActionType
+from catanatron.models.enums import RESOURCES, Action, ActionType, ActionPrompt, SETTLEMENT, CITY
+from catanatron.models.board import NUM_NODES, get_edges
 from catanatron.state_functions import get_longest_road_length
 
 from catanatron.json import GameEncoder
@@ -59,10 +61,16 @@ ID_TO_COORD = {value: key for key, value in COORD_TO_ID.items()}
     #         # TODO: Ordering
     #         if adj_list_ids == tile_ids:
     #             return old_id
+# Building codes in observations, 0 is no building
+BUILDING_TYPES = [None, SETTLEMENT, CITY]
+NUM_EDGES = len(get_edges())
+
+
 class CustomGameEncoder():
     def __init__(self, game: Game):
         self.construct_tile_id_mappings(game)
         self.construct_node_id_mappings(game)
+        self.construct_observation_dtype(game)
 
     def construct_tile_id_mappings(self, game: Game):
         print(game.state.board.map.port_nodes)
@@ -225,6 +233,77 @@ class CustomGameEncoder():
             }
             return d
 
+    def construct_observation_dtype(self, game: Game):
+        """
+        Schema of convert_observation. Tiles are indexed by the new tile id, but nodes are
+        indexed by the catanatron node id (see node_old_to_new) and edges in get_edges()
+        order. Resources are indices into RESOURCES (-1 for the desert), buildings into
+        BUILDING_TYPES, prompts into ActionPrompt, and colors into the "colors" field
+        (-1 for none), which itself holds indices into Color. player_state has a field per entry of the JSON player_state.
+        """
+        num_colors = len(game.state.colors)
+        player_state_keys = [key[3:] for key in game.state.player_state if key.startswith("P0_")]
+
+        self.observation_dtype = np.dtype(
+            [
+                ("player_moving_id", np.int8),
+                ("tile_resources", np.int8, (len(COORD_TO_ID),)),
+                ("tile_numbers", np.int8, (len(COORD_TO_ID),)),
+                ("node_buildings", np.int8, (NUM_NODES,)),
+                ("node_colors", np.int8, (NUM_NODES,)),
+                ("edge_colors", np.int8, (NUM_EDGES,)),
+                ("player_state", [(key, np.int32) for key in player_state_keys]),
+                ("colors", np.int8, (num_colors,)),
+                ("is_initial_build_phase", np.bool_),
+                ("robber_coordinate", np.int8),
+                ("current_prompt", np.int8),
+                ("longest_roads_by_player", np.int8, (num_colors,)),
+                ("winning_color", np.int8),
+            ]
+        )
+
+    def convert_observation(self, game: Game, player_num):
+        """
+        Numeric version of convert_state, without playable_actions
+        """
+        colors = list(game.state.colors)
+        color_index = {color: i for i, color in enumerate(colors)}
+
+        observation = np.zeros((), dtype=self.observation_dtype)
+        for coordinate, tile in game.state.board.map.land_tiles.items():
+            tile_id = COORD_TO_ID[tuple(coordinate)]
+            observation["tile_resources"][tile_id] = (
+                -1 if tile.resource is None else RESOURCES.index(tile.resource)
+            )
+            observation["tile_numbers"][tile_id] = tile.number or 0
+
+        observation["node_colors"] = -1
+        for node_id, (color, building_type) in game.state.board.buildings.items():
+            observation["node_buildings"][node_id] = BUILDING_TYPES.index(building_type)
+            observation["node_colors"][node_id] = color_index[color]
+
+        roads = game.state.board.roads
+        observation["edge_colors"] = [
+            color_index[roads[edge]] if edge in roads else -1 for edge in get_edges()
+        ]
+
+        # Same player as convert_state
+        player_state = observation["player_state"]
+        for key, val in game.state.player_state.items():
+            if key[1] == str(player_num):
+                player_state[key[3:]] = val
+
+        observation["colors"] = [list(Color).index(color) for color in colors]
+        observation["is_initial_build_phase"] = game.state.is_initial_build_phase
+        observation["robber_coordinate"] = COORD_TO_ID[tuple(game.state.board.robber_coordinate)]
+        observation["current_prompt"] = list(ActionPrompt).index(game.state.current_prompt)
+        observation["longest_roads_by_player"] = [
+            get_longest_road_length(game.state, color) for color in colors
+        ]
+        winning_color = game.winning_color()
+        observation["winning_color"] = -1 if winning_color is None else color_index[winning_color]
+        return observation
+
     def convert_action(self, action: tuple) -> Dict:
         _, type_, value = action
         # TODO: We can also do additional action conversions to make them more sane
@@ -1,11 +1,131 @@
 from ..game_interface import GameInterface, PlayerInterface, GameParameterInterface
 from enum import Enum
 import attrs
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
+import numpy as np
 import chess as pychess
 from ..sid_util import SidSessionInfo
 from ..exceptions import PlaygroundInvalidActionException
+from .chess_probe import TABLEBASE_LOSS, TABLEBASE_WIN, ChessProber
+
+# A position has to repeat 5 times for a fivefold repetition, which takes at least
+# this many reversible plies (each of which increments the halfmove clock)
+FIVEFOLD_MIN_HALFMOVES = 16
+
+
+# Schema of get_observation, the fields of the FEN plus those of get_state. board is
+# indexed [rank, file] (a1 is [0, 0]) and holds the piece type (pychess.PAWN to
+# pychess.KING), positive for white and negative for black, or 0 for an empty square.
+# castling is white kingside, white queenside, black kingside, black queenside.
+# ep_square is the en passant target square (0 to 63) or -1, as in the FEN.
+OBSERVATION_DTYPE = np.dtype(
+    [
+        ("player_moving_id", np.int8),
+        ("player_id", np.int8),
+        ("board", np.int8, (8, 8)),
+        ("turn", np.bool_),
+        ("castling", np.bool_, (4,)),
+        ("ep_square", np.int8),
+        ("halfmove_clock", np.int16),
+        ("fullmove_number", np.int16),
+    ]
+)
+
+# Planes of the tensor observation (see ChessParameters.tensor_observation), each indexed
+# [rank, file] like board above: one per color (white first) and piece type (pychess.PAWN
+# to pychess.KING), then the castling rights in the order of castling, filled with
+# whether the right is held, the en passant square (only if the capture is legal, as in
+# the FEN), and the side to move, filled with turn.
+NUM_PIECE_PLANES = 12
+CASTLING_PLANES = slice(12, 16)
+EP_PLANE = 16
+TURN_PLANE = 17
+NUM_PLANES = 18
+
+# Moves are indexed from_square * 64 + to_square, promoting to a queen if a pawn reaches the
+# last rank, followed by the underpromotions: for each from file, the capture towards the
+# a file, the push and the capture towards the h file, each to a knight, bishop and rook.
+UNDERPROMOTIONS = [pychess.KNIGHT, pychess.BISHOP, pychess.ROOK]
+NUM_MOVE_INDICES = 64 * 64 + 8 * 3 * len(UNDERPROMOTIONS)
+
+# Schema of get_observation with tensor_observation. legal_moves is indexed by move_index.
+TENSOR_OBSERVATION_DTYPE = np.dtype(
+    [
+        ("player_moving_id", np.int8),
+        ("player_id", np.int8),
+        ("planes", np.bool_, (NUM_PLANES, 8, 8)),
+        ("legal_moves", np.bool_, (NUM_MOVE_INDICES,)),
+        ("halfmove_clock", np.int16),
+        ("fullmove_number", np.int16),
+    ]
+)
+
+
+def move_index(move: pychess.Move) -> int:
+    if move.promotion in UNDERPROMOTIONS:
+        from_file = pychess.square_file(move.from_square)
+        direction = pychess.square_file(move.to_square) - from_file + 1
+        return (
+            64 * 64
+            + (from_file * 3 + direction) * len(UNDERPROMOTIONS)
+            + UNDERPROMOTIONS.index(move.promotion)
+        )
+    return move.from_square * 64 + move.to_square
+
+
+def index_move(index: int, board: pychess.Board) -> pychess.Move:
+    """
+    The move of board with the given move_index, the inverse of move_index
+    """
+    if index < 64 * 64:
+        from_square, to_square = divmod(index, 64)
+        promotion = None
+        if board.piece_type_at(from_square) == pychess.PAWN and pychess.square_rank(
+            to_square
+        ) in (0, 7):
+            promotion = pychess.QUEEN
+        return pychess.Move(from_square, to_square, promotion)
+
+    index -= 64 * 64
+    from_file, direction = divmod(index // len(UNDERPROMOTIONS), 3)
+    from_rank, to_rank = (6, 7) if board.turn == pychess.WHITE else (1, 0)
+    return pychess.Move(
+        pychess.square(from_file, from_rank),
+        pychess.square(from_file + direction - 1, to_rank),
+        UNDERPROMOTIONS[index % len(UNDERPROMOTIONS)],
+    )
+
+
+def board_planes(board: pychess.Board) -> np.ndarray:
+    """
+    :return: (NUM_PLANES, 8, 8) bool array, see NUM_PLANES
+    """
+    planes = np.zeros((NUM_PLANES, 8, 8), dtype=np.bool_)
+    masks = np.array(
+        [
+            board.pieces_mask(piece_type, color)
+            for color in (pychess.WHITE, pychess.BLACK)
+            for piece_type in pychess.PIECE_TYPES
+        ],
+        dtype="<u8",
+    )
+    # Bit i of a mask is square i, that is [i // 8, i % 8]
+    planes[:NUM_PIECE_PLANES] = np.unpackbits(masks.view(np.uint8), bitorder="little").reshape(
+        NUM_PIECE_PLANES, 8, 8
+    )
+    planes[CASTLING_PLANES] = np.array(
+        [
+            board.has_kingside_castling_rights(pychess.WHITE),
+            board.has_queenside_castling_rights(pychess.WHITE),
+            board.has_kingside_castling_rights(pychess.BLACK),
+            board.has_queenside_castling_rights(pychess.BLACK),
+        ]
+    )[:, None, None]
+    if board.has_legal_en_passant():
+        planes[EP_PLANE].reshape(64)[board.ep_square] = True
+    planes[TURN_PLANE] = board.turn
+    return planes
 
 
 @attrs.define
@@ -19,10 +139,37 @@ class ChessPlayer(PlayerInterface):
 
 @attrs.define(frozen=True)
 class ChessParameters(GameParameterInterface):
-    pass
+    tensor_observation: bool = False
+    """ get_observation returns board planes and a legal move mask, see TENSOR_OBSERVATION_DTYPE """
+
+    adjudicate_endgames: bool = False
+    """ End the game as soon as ChessGame.prober finds a tablebase win """
+
+
+@attrs.define(frozen=True)
+class Adjudication:
+    """
+    Outcome of a game ended early from a tablebase win, with the fields of pychess.Outcome
+    """
+
+    winner: pychess.Color
+    termination: str = "tablebase"
 
 
 class ChessGame(GameInterface):
+    prober: Optional[ChessProber] = None
+    """ Opening book and tablebases shared by all games, see chess_probe """
+
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "board",
+        "player_moving",
+        "player_waiting",
+        "winning_player",
+        "is_game_over",
+        "outcome",
+        "legal_move_mask",
+    )
+
     def __init__(
         self,
         game_id: str,
@@ -44,12 +191,18 @@ class ChessGame(GameInterface):
         self.player_waiting.color = pychess.BLACK
 
         self.winning_player = None
+        # Outcome of the current position, updated once per ply
+        self.outcome: pychess.Outcome = None
+        # Computed on demand, once per ply
+        self.legal_move_mask: np.ndarray = None
 
     def submit_action(self, action, player_sid=""):
         # Check it's their turn
         # TODO: We can probably do this in a smoother way
         if self.player_moving.sid != player_sid:
             raise PlaygroundInvalidActionException("Not your turn")
+        if self.is_game_over:
+            raise PlaygroundInvalidActionException("The game is over")
 
         # The move mst be for current moving player
         player = self.player_moving
@@ -58,6 +211,44 @@ class ChessGame(GameInterface):
         if player.color != self.board.turn:
             raise PlaygroundInvalidActionException("Not your turn")
 
+        move = self.parse_move(action)
+        material_changed = self.board.is_capture(move) or move.promotion is not None
+        self.board.push(move)
+        self.legal_move_mask = None
+        self.player_waiting, self.player_moving = (
+            self.player_moving,
+            self.player_waiting,
+        )
+
+        self._set_outcome(self._find_outcome(material_changed))
+        return True
+
+    def submit_actions(self, actions):
+        """
+        Pushes the moves, checking after each one whether the game ended, and sets
+        the rewards once, after the last one
+        """
+        outcome = self.outcome
+        for action in actions:
+            if self.is_game_over or outcome is not None:
+                raise PlaygroundInvalidActionException("The game is over")
+            move = self.parse_move(action)
+            material_changed = self.board.is_capture(move) or move.promotion is not None
+            self.board.push(move)
+            self.iteration += 1
+            self.player_waiting, self.player_moving = (
+                self.player_moving,
+                self.player_waiting,
+            )
+            outcome = self._find_outcome(material_changed)
+
+        self.legal_move_mask = None
+        self._set_outcome(outcome)
+
+    def parse_move(self, action) -> pychess.Move:
+        """
+        :return: The move of a submitted action, if it is legal
+        """
         # Expect format
         # {
         #   'uci': 'g1f3'
@@ -65,22 +256,28 @@ class ChessGame(GameInterface):
         action = json.loads(action)
 
         move_uci = action["uci"]
-        move = pychess.Move.from_uci(move_uci)
+        try:
+            move = pychess.Move.from_uci(move_uci)
+        except ValueError:
+            raise PlaygroundInvalidActionException("Illegal move")
 
-        if move not in self.board.legal_moves:
+        # Checks this move only, rather than generating all the legal ones
+        if not self.board.is_legal(move):
             raise PlaygroundInvalidActionException("Illegal move")
+        return move
 
-        self.board.push(move)
-        self.player_waiting, self.player_moving = (
-            self.player_moving,
-            self.player_waiting,
-        )
+    def _find_outcome(self, material_changed=True):
+        outcome = self.compute_outcome(material_changed)
+        if outcome is None and self.parameters.adjudicate_endgames and self.prober is not None:
+            outcome = self.adjudicate()
+        return outcome
 
+    def _set_outcome(self, outcome):
         # check if the game is over, TODO: make this cleaner
-        outcome = self.board.outcome()
+        self.outcome = outcome
         if outcome is not None:
             self.is_game_over = True
-            if outcome.termination in pychess.Termination:
+            if isinstance(outcome, Adjudication) or outcome.termination in pychess.Termination:
                 for player_id in list(self.players.keys()):
                     self.reward[player_id] = (
                         1 if outcome.winner is self.players[player_id].color else -1
@@ -89,7 +286,47 @@ class ChessGame(GameInterface):
                 for player_id in list(self.players.keys()):
                     self.reward[player_id] = 0
 
-        return True
+    def compute_outcome(self, material_changed=True):
+        """
+        Same as self.board.outcome(), skipping the checks the last move can't have changed
+        :param material_changed: Whether the last move was a capture or a promotion. Material
+        can only become insufficient after one, so it is only checked then.
+        """
+        board = self.board
+        if not any(board.generate_legal_moves()):
+            if board.is_check():
+                return pychess.Outcome(pychess.Termination.CHECKMATE, not board.turn)
+            # Checked before stalemate, like board.outcome() does
+            if material_changed and board.is_insufficient_material():
+                return pychess.Outcome(pychess.Termination.INSUFFICIENT_MATERIAL, None)
+            return pychess.Outcome(pychess.Termination.STALEMATE, None)
+
+        if material_changed and board.is_insufficient_material():
+            return pychess.Outcome(pychess.Termination.INSUFFICIENT_MATERIAL, None)
+        if board.is_seventyfive_moves():
+            return pychess.Outcome(pychess.Termination.SEVENTYFIVE_MOVES, None)
+        # Walks back through the move stack, so only once a repetition is possible
+        if board.halfmove_clock >= FIVEFOLD_MIN_HALFMOVES and board.is_fivefold_repetition():
+            return pychess.Outcome(pychess.Termination.FIVEFOLD_REPETITION, None)
+        return None
+
+    def adjudicate(self) -> Optional[Adjudication]:
+        wdl = self.prober.probe_wdl(self.board)
+        if wdl == TABLEBASE_WIN:
+            return Adjudication(self.board.turn)
+        if wdl == TABLEBASE_LOSS:
+            return Adjudication(not self.board.turn)
+        return None
+
+    def get_book_move(self, rng=None) -> Optional[str]:
+        """
+        :return: The UCI of a move from the opening book of ChessGame.prober, for baseline
+        bots, or None out of book or without a prober
+        """
+        if self.prober is None:
+            return None
+        move = self.prober.book_move(self.board, rng)
+        return move.uci() if move is not None else None
 
     def get_is_game_over(self):
         return self.is_game_over
@@ -109,6 +346,65 @@ class ChessGame(GameInterface):
         }
         return json.dumps(state), self.reward[player_id]
 
+    def get_observation(self, player_sid="", player_id=None):
+        if player_id == None:
+            player_id = self.player_moving.player_id
+
+        if self.parameters.tensor_observation:
+            return self.get_tensor_observation(player_id), self.reward[player_id]
+
+        observation = np.zeros((), dtype=OBSERVATION_DTYPE)
+        observation["player_moving_id"] = self.player_moving.player_id
+        observation["player_id"] = player_id
+
+        board = observation["board"].reshape(64)
+        for square, piece in self.board.piece_map().items():
+            board[square] = piece.piece_type if piece.color else -piece.piece_type
+
+        observation["turn"] = self.board.turn
+        observation["castling"] = [
+            self.board.has_kingside_castling_rights(pychess.WHITE),
+            self.board.has_queenside_castling_rights(pychess.WHITE),
+            self.board.has_kingside_castling_rights(pychess.BLACK),
+            self.board.has_queenside_castling_rights(pychess.BLACK),
+        ]
+        # The FEN only shows the en passant square when the capture is legal
+        if self.board.has_legal_en_passant():
+            observation["ep_square"] = self.board.ep_square
+        else:
+            observation["ep_square"] = -1
+        observation["halfmove_clock"] = self.board.halfmove_clock
+        observation["fullmove_number"] = self.board.fullmove_number
+        return observation, self.reward[player_id]
+
+    def get_tensor_observation(self, player_id):
+        observation = np.zeros((), dtype=TENSOR_OBSERVATION_DTYPE)
+        observation["player_moving_id"] = self.player_moving.player_id
+        observation["player_id"] = player_id
+        observation["planes"] = board_planes(self.board)
+        observation["legal_moves"] = self.get_legal_move_mask()
+        observation["halfmove_clock"] = self.board.halfmove_clock
+        observation["fullmove_number"] = self.board.fullmove_number
+        return observation
+
+    def get_legal_move_mask(self):
+        """
+        :return: (NUM_MOVE_INDICES,) bool array, whether the move with each move_index is legal.
+        Shared by both players, so it is only computed once per position.
+        """
+        if self.legal_move_mask is None:
+            mask = np.zeros(NUM_MOVE_INDICES, dtype=np.bool_)
+            if not self.is_game_over:
+                mask[[move_index(move) for move in self.board.generate_legal_moves()]] = True
+            mask.flags.writeable = False
+            self.legal_move_mask = mask
+        return self.legal_move_mask
+
+    def get_observation_dtype(self):
+        if self.parameters.tensor_observation:
+            return TENSOR_OBSERVATION_DTYPE
+        return OBSERVATION_DTYPE
+
     @staticmethod
     def get_game_name():
         return "chess"
@@ -122,13 +418,14 @@ class ChessGame(GameInterface):
 
     def get_outcome(self, player_id):
         # TODO: Claim draw
-        outcome = self.board.outcome()
+        outcome = self.outcome
         player = self.players[player_id]
 
         if outcome is None:
             return None
 
-        if outcome.termination == pychess.Termination.CHECKMATE:
+        # Checkmate or adjudication, every other termination is a draw
+        if outcome.winner is not None:
             if outcome.winner is player.color:
                 return 1
             return 0
@@ -0,0 +1,103 @@
+"""
+Opening book and endgame tablebase lookups for ChessGame.
+
+A ChessProber reads a Polyglot opening book and Syzygy tablebases from local
+files (nothing is downloaded). ChessGame consults it, when one is set as
+ChessGame.prober, to adjudicate games that reach a tablebase win (see
+ChessParameters.adjudicate_endgames) and to serve book moves to baseline bots
+(see ChessGame.get_book_move).
+
+The chess pool plays the same opening lines and endgames over and over, so
+results are kept in an LRU keyed by the Polyglot Zobrist hash of the position.
+Tablebases are only probed once few enough pieces are left for a table to exist.
+
+Example:
+
+    ChessGame.prober = ChessProber.open(book_path="books/performance.bin", tablebase_dir="syzygy/")
+"""
+
+import random
+from typing import List, Optional, Tuple
+
+import chess as pychess
+import chess.polyglot
+import chess.syzygy
+
+from ..lru import LRUCache
+
+# WDL values (for the side to move) that are decisive even under the 50 move rule
+TABLEBASE_WIN = 2
+TABLEBASE_LOSS = -2
+
+_MISSING = object()
+
+
+class ChessProber:
+    def __init__(self, book=None, tablebase=None, max_cache_size=100_000):
+        """
+        :param book: chess.polyglot.MemoryMappedReader, or None for no book
+        :param tablebase: chess.syzygy.Tablebase, or None for no tablebases
+        """
+        self.book = book
+        self.tablebase = tablebase
+        # Tables are named after their pieces, e.g. KQvK for 3
+        self.max_tablebase_pieces = max((len(name) - 1 for name in getattr(tablebase, "wdl", ())), default=0)
+
+        self.book_cache = LRUCache(max_cache_size)
+        self.wdl_cache = LRUCache(max_cache_size)
+
+    @classmethod
+    def open(cls, book_path=None, tablebase_dir=None, max_cache_size=100_000):
+        book = chess.polyglot.open_reader(book_path) if book_path else None
+        tablebase = chess.syzygy.open_tablebase(tablebase_dir) if tablebase_dir else None
+        return cls(book, tablebase, max_cache_size)
+
+    def close(self):
+        if self.book is not None:
+            self.book.close()
+        if self.tablebase is not None:
+            self.tablebase.close()
+
+    def book_moves(self, board: pychess.Board) -> List[Tuple[pychess.Move, int]]:
+        """
+        :return: The (move, weight) book entries for the position, empty if it is out of book.
+        Entries with weight 0 are left out, as Polyglot books use them for moves not to play.
+        """
+        if self.book is None:
+            return []
+        key = chess.polyglot.zobrist_hash(board)
+        entries = self.book_cache.get(key, _MISSING)
+        if entries is _MISSING:
+            entries = [(entry.move, entry.weight) for entry in self.book.find_all(board)]
+            self.book_cache.put(key, entries)
+        return entries
+
+    def book_move(self, board: pychess.Board, rng: Optional[random.Random] = None) -> Optional[pychess.Move]:
+        """
+        :return: A book move drawn in proportion to its weight, or None out of book
+        """
+        entries = self.book_moves(board)
+        if not entries:
+            return None
+        rng = rng or random
+        moves = [move for move, _ in entries]
+        weights = [weight for _, weight in entries]
+        return rng.choices(moves, weights)[0]
+
+    def probe_wdl(self, board: pychess.Board) -> Optional[int]:
+        """
+        :return: Syzygy WDL for the side to move (2 win, 0 draw, -2 loss, +-1 for wins and
+        losses that the 50 move rule turns into draws), or None if there is no table for it
+        """
+        # Tables only exist for few pieces and no castling rights
+        if (
+            pychess.popcount(board.occupied) > self.max_tablebase_pieces
+            or board.castling_rights
+        ):
+            return None
+        key = chess.polyglot.zobrist_hash(board)
+        wdl = self.wdl_cache.get(key, _MISSING)
+        if wdl is _MISSING:
+            wdl = self.tablebase.get_wdl(board)
+            self.wdl_cache.put(key, wdl)
+        return wdl
@@ -3,6 +3,7 @@ import random
 from ...game_interface import GameInterface, PlayerInterface, GameParameterInterface
 from enum import Enum
 import attrs
+import numpy as np
 from importlib.resources import files
 from typing import List, Dict, Any
 from ...exceptions import PlaygroundInvalidActionException
@@ -62,6 +63,27 @@ BLUE_CARDS = 8
 
 card_list = None
 
+# Longest word (board word or clue) that fits in an observation
+MAX_WORD_LENGTH = 64
+
+# Schema of get_observation, same fields as get_state. Colors and roles are indices
+# into list(Color) and list(PlayerType), scores are [RED, BLUE], and words are
+# ASCII encoded.
+OBSERVATION_DTYPE = np.dtype(
+    [
+        ("player_moving_id", np.int8),
+        ("color", np.int8),
+        ("role", np.int8),
+        ("words", f"S{MAX_WORD_LENGTH}", (BOARD_SIZE,)),
+        ("guessed", np.int8, (BOARD_SIZE,)),
+        ("actual", np.int8, (BOARD_SIZE,)),
+        ("clue", f"S{MAX_WORD_LENGTH}"),
+        ("count", np.int8),
+        ("scores", np.int8, (2,)),
+    ]
+)
+COLOR_INDEX = {color: i for i, color in enumerate(Color)}
+
 
 def get_word_board():
     global card_list
@@ -96,6 +118,18 @@ def get_card_colors():
 
 
 class CodenamesGame(GameInterface):
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "guessed_colors",
+        "player_moving_idx",
+        "last_clue",
+        "last_count",
+        "guessed_count",
+        "winning_team",
+        "scores",
+        "rewards",
+        "is_game_over",
+    )
+
     def __init__(
         self,
         game_id,
@@ -354,6 +388,33 @@ class CodenamesGame(GameInterface):
         # Reward will be from previous round
         return json.dumps(state), self.reward[player_id]
 
+    def get_observation(self, player_sid="", player_id=-1):
+        if player_id == -1:
+            player_id = 0
+
+        player = self.players[player_id]
+        observation = np.zeros((), dtype=OBSERVATION_DTYPE)
+        observation["player_moving_id"] = self.player_moving.player_id
+        observation["color"] = COLOR_INDEX[player.color]
+        observation["role"] = list(PlayerType).index(player.type)
+        observation["words"] = [word.encode() for word in self.words]
+        observation["guessed"] = [COLOR_INDEX[color] for color in self.guessed_colors]
+        observation["actual"] = [
+            COLOR_INDEX[color]
+            for color in (
+                self.actual_colors
+                if player.type == PlayerType.GIVER
+                else self.guessed_colors
+            )
+        ]
+        observation["clue"] = self.last_clue.encode()
+        observation["count"] = self.last_count
+        observation["scores"] = [self.scores[Color.RED], self.scores[Color.BLUE]]
+        return observation, self.reward[player_id]
+
+    def get_observation_dtype(self):
+        return OBSERVATION_DTYPE
+
     @staticmethod
     def get_game_name():
         return "codenames"
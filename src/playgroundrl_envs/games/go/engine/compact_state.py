@@ -0,0 +1,129 @@
+"""
+Compact representation of a Go state.
+
+The legacy state is a float64 [NUM_CHNLS, SIZE, SIZE] tensor, in which the turn,
+pass and done channels are whole boards holding a single bit. CompactState keeps
+the stones and invalid moves as boolean planes and the rest as scalars. Indexing
+it with a channel number returns a zero-copy view with the same values as the
+legacy channel, and np.asarray(compact_state) builds the full legacy tensor.
+"""
+
+from typing import Optional
+
+import attrs
+import numpy as np
+
+from . import govars
+from . import zobrist
+
+
+@attrs.define
+class CompactState:
+    stones: np.ndarray
+    """ Boolean [2, SIZE, SIZE], black stones then white stones """
+
+    invalid: np.ndarray
+    """ Boolean [SIZE, SIZE], invalid moves for the player to move (including ko) """
+
+    turn: int = govars.BLACK
+    passed: bool = False
+    done: bool = False
+
+    ko: Optional[int] = None
+    """ Flat location protected by ko, if any """
+
+    position_hash: int = 0
+    """ Zobrist hash of the stones, see zobrist.py """
+
+    @classmethod
+    def empty(cls, size):
+        return cls(
+            stones=np.zeros((2, size, size), dtype=bool),
+            invalid=np.zeros((size, size), dtype=bool),
+        )
+
+    @classmethod
+    def from_tensor(cls, state, ko=None):
+        """
+        :param state: Legacy [NUM_CHNLS, SIZE, SIZE] state
+        :param ko: Flat ko location, since the legacy state only stores it inside the invalid channel
+        """
+        return cls(
+            position_hash=zobrist.position_hash(state),
+            stones=state[[govars.BLACK, govars.WHITE]] > 0,
+            invalid=state[govars.INVD_CHNL] > 0,
+            turn=int(np.max(state[govars.TURN_CHNL])),
+            passed=bool(np.max(state[govars.PASS_CHNL]) == 1),
+            done=bool(np.max(state[govars.DONE_CHNL]) == 1),
+            ko=ko,
+        )
+
+    @property
+    def size(self) -> int:
+        return self.invalid.shape[0]
+
+    @property
+    def shape(self):
+        return (govars.NUM_CHNLS, *self.invalid.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return self.stones.nbytes + self.invalid.nbytes
+
+    def copy(self):
+        return attrs.evolve(self, stones=self.stones.copy(), invalid=self.invalid.copy())
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.channel(int(key))
+        # Anything fancier than a single channel goes through the full tensor
+        return self.tensor()[key]
+
+    def channel(self, channel):
+        """
+        :return: A view with the same values as channel of the legacy tensor, without copying
+        """
+        if channel in (govars.BLACK, govars.WHITE):
+            return self.stones[channel]
+        if channel == govars.INVD_CHNL:
+            return self.invalid
+
+        if channel == govars.TURN_CHNL:
+            value = self.turn == govars.WHITE
+        elif channel == govars.PASS_CHNL:
+            value = self.passed
+        elif channel == govars.DONE_CHNL:
+            value = self.done
+        else:
+            raise IndexError(f"Channel {channel} out of range")
+        return np.broadcast_to(np.bool_(value), self.invalid.shape)
+
+    def tensor(self, dtype=np.float64):
+        """
+        :return: The legacy [NUM_CHNLS, SIZE, SIZE] tensor
+        """
+        state = np.zeros(self.shape, dtype=dtype)
+        state[govars.BLACK] = self.stones[govars.BLACK]
+        state[govars.WHITE] = self.stones[govars.WHITE]
+        state[govars.TURN_CHNL] = self.turn
+        state[govars.INVD_CHNL] = self.invalid
+        state[govars.PASS_CHNL] = self.passed
+        state[govars.DONE_CHNL] = self.done
+        return state
+
+    def __array__(self, dtype=None, copy=None):
+        return self.tensor(np.float64 if dtype is None else dtype)
+
+    def canonical(self):
+        """
+        :return: The state from the perspective of the player to move (always black),
+        sharing the stone and invalid planes with this state
+        """
+        if self.turn == govars.BLACK:
+            return self
+        canonical = attrs.evolve(self, stones=self.stones[::-1], turn=govars.BLACK)
+        canonical.position_hash = zobrist.position_hash(canonical)
+        return canonical
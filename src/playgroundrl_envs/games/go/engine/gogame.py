@@ -2,11 +2,16 @@
 Taken from: https://github.com/aigagror/GymGo
 """
 
+from functools import lru_cache
+
 import numpy as np
 from scipy import ndimage
-from sklearn import preprocessing
 from . import state_utils
 from . import govars
+from . import zobrist
+from .compact_state import CompactState
+from .group_tracker import GroupTracker
+from .transposition import TranspositionTable
 
 """
 The state of the game is a numpy array
@@ -23,8 +28,10 @@ The state of the game is a numpy array
 """
 
 
-def init_state(size):
+def init_state(size, compact=False):
     # return initial board (numpy board)
+    if compact:
+        return CompactState.empty(size)
     state = np.zeros((govars.NUM_CHNLS, size, size))
     return state
 
@@ -35,7 +42,24 @@ def batch_init_state(batch_size, board_size):
     return batch_state
 
 
-def next_state(state, action1d, canonical=False):
+def next_state(state, action1d, canonical=False, groups=None, cache=None):
+    """
+    :param groups: Optional GroupTracker matching state. If given, it is advanced
+    by the move in place and used instead of relabeling the whole board.
+    :param cache: Optional TranspositionTable memoizing results by state hash. Not used
+    together with groups, since the tracker has to see every move.
+
+    CompactStates always go through a GroupTracker and come back as CompactStates.
+    """
+    if cache is not None and groups is None:
+        key = ("next_state", cache_key(state), int(action1d), canonical)
+        return cached(cache, key, lambda: next_state(state, action1d, canonical))
+
+    if groups is None and isinstance(state, CompactState):
+        groups = GroupTracker.from_state(state)
+    if groups is not None:
+        return tracked_next_state(state, action1d, groups, canonical)
+
     # Deep copy the state to modify
     state = np.copy(state)
 
@@ -91,6 +115,54 @@ def next_state(state, action1d, canonical=False):
     return state
 
 
+def tracked_next_state(state, action1d, groups: GroupTracker, canonical=False):
+    """
+    Same result as next_state, but groups, liberties and invalid moves come from
+    the incrementally updated GroupTracker instead of full-board labeling.
+    """
+    if isinstance(state, CompactState):
+        if action1d != state.invalid.size:
+            assert not state.invalid.flat[action1d], ("Invalid move", divmod(action1d, state.size))
+        groups.play(action1d)
+        state = groups.compact_state()
+        return state.canonical() if canonical else state
+
+    state = np.copy(state)
+
+    board_shape = state.shape[1:]
+    pass_idx = np.prod(board_shape)
+    passed = action1d == pass_idx
+    player = turn(state)
+    previously_passed = prev_player_passed(state)
+
+    if passed:
+        state[govars.PASS_CHNL] = 1
+        if previously_passed:
+            state[govars.DONE_CHNL] = 1
+        groups.play(pass_idx)
+    else:
+        state[govars.PASS_CHNL] = 0
+
+        action2d = action1d // board_shape[0], action1d % board_shape[1]
+        assert state[govars.INVD_CHNL, action2d[0], action2d[1]] == 0, ("Invalid move", action2d)
+
+        captured = groups.play(action1d)
+        state[player, action2d[0], action2d[1]] = 1
+        state[1 - player].flat[captured] = 0
+
+    # Occupied points plus the suicide and ko points found by the tracker
+    invalid_moves = state[govars.BLACK] + state[govars.WHITE]
+    invalid_moves.flat[groups.invalid_empty_points()] = 1
+    state[govars.INVD_CHNL] = invalid_moves > 0
+
+    state_utils.set_turn(state)
+
+    if canonical:
+        state = canonical_form(state)
+
+    return state
+
+
 def batch_next_states(batch_states, batch_action1d, canonical=False):
     # Deep copy the state to modify
     batch_states = np.copy(batch_states)
@@ -107,7 +179,7 @@ def batch_next_states(batch_states, batch_action1d, canonical=False):
 
     batch_players = batch_turn(batch_states)
     batch_non_pass_players = batch_players[batch_non_pass]
-    batch_ko_protect = np.empty(len(batch_states), dtype=object)
+    batch_ko_protect = np.full((len(batch_states), 2), -1)
 
     # Pass moves
     batch_states[batch_pass, govars.PASS_CHNL] = 1
@@ -128,17 +200,16 @@ def batch_next_states(batch_states, batch_action1d, canonical=False):
                                                                   batch_non_pass_players)
 
     # Update pieces
-    batch_killed_groups = state_utils.batch_update_pieces(batch_non_pass, batch_states, batch_adj_locs,
-                                                          batch_non_pass_players)
+    batch_killed, batch_num_killed = state_utils.batch_update_pieces(batch_non_pass, batch_states, batch_adj_locs,
+                                                                     batch_non_pass_players)
 
     # Ko-protection
-    for i, (killed_groups, surrounded) in enumerate(zip(batch_killed_groups, batch_surrounded)):
-        # If only killed one group, and that one group was one piece, and piece set is surrounded,
-        # activate ko protection
-        if len(killed_groups) == 1 and surrounded:
-            killed_group = killed_groups[0]
-            if len(killed_group) == 1:
-                batch_ko_protect[batch_non_pass[i]] = killed_group[0]
+    # If only killed one group, and that one group was one piece, and piece set is surrounded,
+    # activate ko protection
+    batch_killed = batch_killed.reshape(len(batch_non_pass), -1)
+    batch_ko = (batch_num_killed == 1) & batch_surrounded & (np.sum(batch_killed, axis=1) == 1)
+    ko_locs = np.argmax(batch_killed[batch_ko], axis=1)
+    batch_ko_protect[batch_non_pass[batch_ko]] = np.stack(np.divmod(ko_locs, board_shape[1]), axis=1)
 
     # Update invalid moves
     batch_states[:, govars.INVD_CHNL] = state_utils.batch_compute_invalid_moves(batch_states, batch_players,
@@ -154,6 +225,23 @@ def batch_next_states(batch_states, batch_action1d, canonical=False):
     return batch_states
 
 
+def position_hash(state):
+    """
+    :return: Zobrist hash of the stones on the board (see zobrist.py). CompactStates carry
+    it already, for tensor states it is computed.
+    """
+    if isinstance(state, CompactState):
+        return state.position_hash
+    return zobrist.position_hash(state)
+
+
+def state_hash(state):
+    """
+    :return: Zobrist hash of the whole state, for transposition lookups
+    """
+    return zobrist.state_hash(state)
+
+
 def invalid_moves(state):
     # return a fixed size binary vector
     if game_ended(state):
@@ -161,7 +249,9 @@ def invalid_moves(state):
     return np.append(state[govars.INVD_CHNL].flatten(), 0)
 
 
-def valid_moves(state):
+def valid_moves(state, cache=None):
+    if cache is not None:
+        return cached(cache, ("valid_moves", cache_key(state)), lambda: valid_moves(state))
     return 1 - invalid_moves(state)
 
 
@@ -176,18 +266,42 @@ def batch_valid_moves(batch_state):
     return 1 - batch_invalid_moves(batch_state)
 
 
-def children(state, canonical=False, padded=True):
+def children(state, canonical=False, padded=True, cache=None):
+    if cache is not None:
+        key = ("children", cache_key(state), canonical, padded)
+        return cached(cache, key, lambda: children(state, canonical, padded))
+
     valid_moves_bool = valid_moves(state)
     n = len(valid_moves_bool)
     valid_move_idcs = np.argwhere(valid_moves_bool).flatten()
     batch_states = np.tile(state[np.newaxis], (len(valid_move_idcs), 1, 1, 1))
-    children = batch_next_states(batch_states, valid_move_idcs, canonical)
+    child_states = batch_next_states(batch_states, valid_move_idcs, canonical)
 
     if padded:
         padded_children = np.zeros((n, *state.shape))
-        padded_children[valid_move_idcs] = children
-        children = padded_children
-    return children
+        padded_children[valid_move_idcs] = child_states
+        child_states = padded_children
+    return child_states
+
+
+def cache_key(state):
+    """
+    Identifies a state in a TranspositionTable. Tensor and compact states are kept apart
+    since next_state returns the same type it was given.
+    """
+    return state.shape[1], isinstance(state, CompactState), state_hash(state)
+
+
+def cached(cache: TranspositionTable, key, compute):
+    """
+    Looks key up in cache, computing and storing it on a miss. Returns a copy, so
+    callers can modify the result without corrupting the cache.
+    """
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.put(key, result)
+    return result.copy()
 
 
 def action_size(state=None, board_size: int = None):
@@ -251,7 +365,7 @@ def turn(state):
 
 
 def batch_turn(batch_state):
-    return np.max(batch_state[:, govars.TURN_CHNL], axis=(1, 2)).astype(np.int)
+    return np.max(batch_state[:, govars.TURN_CHNL], axis=(1, 2)).astype(int)
 
 
 def liberties(state: np.ndarray):
@@ -276,68 +390,87 @@ def num_liberties(state: np.ndarray):
     return black_liberties, white_liberties
 
 
-def areas(state):
+def areas(state, groups=None):
     '''
     Return black area, white area
+
+    Empty regions are labeled once, and a region belongs to a color if only that
+    color's stones border it.
+    :param groups: Optional GroupTracker with track_territory, whose incrementally
+    scored regions are used instead
     '''
+    if groups is not None and groups.territory is not None:
+        return groups.areas()
 
-    all_pieces = np.sum(state[[govars.BLACK, govars.WHITE]], axis=0)
-    empties = 1 - all_pieces
+    if isinstance(state, CompactState):
+        black_areas, white_areas = stone_areas(state.stones[np.newaxis, govars.BLACK],
+                                               state.stones[np.newaxis, govars.WHITE])
+    else:
+        black_areas, white_areas = stone_areas(state[np.newaxis, govars.BLACK], state[np.newaxis, govars.WHITE])
+    return black_areas[0], white_areas[0]
 
-    empty_labels, num_empty_areas = ndimage.measurements.label(empties)
 
-    black_area, white_area = np.sum(state[govars.BLACK]), np.sum(state[govars.WHITE])
-    for label in range(1, num_empty_areas + 1):
-        empty_area = empty_labels == label
-        neighbors = ndimage.binary_dilation(empty_area)
-        black_claim = False
-        white_claim = False
-        if (state[govars.BLACK] * neighbors > 0).any():
-            black_claim = True
-        if (state[govars.WHITE] * neighbors > 0).any():
-            white_claim = True
-        if black_claim and not white_claim:
-            black_area += np.sum(empty_area)
-        elif white_claim and not black_claim:
-            white_area += np.sum(empty_area)
+def batch_areas(batch_state):
+    return stone_areas(batch_state[:, govars.BLACK], batch_state[:, govars.WHITE])
 
-    return black_area, white_area
 
+def stone_areas(batch_black, batch_white):
+    '''
+    :param batch_black: Black stones, shape (BATCH, SIZE, SIZE)
+    :param batch_white: White stones, shape (BATCH, SIZE, SIZE)
+    :return: Black areas, white areas, each of shape (BATCH,)
+    '''
+    batch_black = batch_black > 0
+    batch_white = batch_white > 0
 
-def batch_areas(batch_state):
-    black_areas, white_areas = [], []
+    # Label the empty regions of every board in one pass
+    empty_labels, num_empty_areas = ndimage.measurements.label(~(batch_black | batch_white), state_utils.group_struct)
+    neighbor_labels = state_utils.batch_neighbor_labels(empty_labels)
 
-    for state in batch_state:
-        ba, wa = areas(state)
-        black_areas.append(ba)
-        white_areas.append(wa)
-    return np.array(black_areas), np.array(white_areas)
+    # Regions next to each color's stones
+    black_claim = np.zeros(num_empty_areas + 1, dtype=bool)
+    white_claim = np.zeros(num_empty_areas + 1, dtype=bool)
+    black_claim[neighbor_labels[:, batch_black]] = True
+    white_claim[neighbor_labels[:, batch_white]] = True
+    black_claim[0] = white_claim[0] = False
+
+    black_territory = (black_claim & ~white_claim)[empty_labels]
+    white_territory = (white_claim & ~black_claim)[empty_labels]
+
+    black_areas = np.sum(batch_black, axis=(1, 2), dtype=np.float64) + np.sum(black_territory, axis=(1, 2))
+    white_areas = np.sum(batch_white, axis=(1, 2), dtype=np.float64) + np.sum(white_territory, axis=(1, 2))
+    return black_areas, white_areas
+
+
+# Channel order that swaps the black and white pieces
+swapped_channels = np.arange(govars.NUM_CHNLS)
+swapped_channels[[govars.BLACK, govars.WHITE]] = govars.WHITE, govars.BLACK
 
 
 def canonical_form(state):
-    state = np.copy(state)
+    """
+    :return: The state from the perspective of the player to move, who becomes black.
+    Tensor states are copied once (by the channel swap itself); CompactStates are not copied.
+    """
+    if isinstance(state, CompactState):
+        return state.canonical()
+
     if turn(state) == govars.WHITE:
-        channels = np.arange(govars.NUM_CHNLS)
-        channels[govars.BLACK] = govars.WHITE
-        channels[govars.WHITE] = govars.BLACK
-        state = state[channels]
+        state = state[swapped_channels]
         state_utils.set_turn(state)
-    return state
+        return state
+    return np.copy(state)
 
 
 def batch_canonical_form(batch_state):
-    batch_state = np.copy(batch_state)
+    """
+    Vectorized canonical_form: one gather picks the channel order of every board
+    """
     batch_player = batch_turn(batch_state)
-    white_players_idcs = np.nonzero(batch_player == govars.WHITE)[0]
-
-    channels = np.arange(govars.NUM_CHNLS)
-    channels[govars.BLACK] = govars.WHITE
-    channels[govars.WHITE] = govars.BLACK
-
-    for i in white_players_idcs:
-        batch_state[i] = batch_state[i, channels]
-        batch_state[i, govars.TURN_CHNL] = 1 - batch_player[i]
+    channel_orders = np.stack([np.arange(govars.NUM_CHNLS), swapped_channels])
 
+    batch_state = batch_state[np.arange(len(batch_state))[:, np.newaxis], channel_orders[batch_player]]
+    batch_state[:, govars.TURN_CHNL] = 0
     return batch_state
 
 
@@ -386,14 +519,72 @@ def all_symmetries(image):
     return symmetries
 
 
+@lru_cache(maxsize=None)
+def symmetry_indices(board_size):
+    """
+    Gather indices for the 8 symmetries, in the same order as all_symmetries
+    :return: Read-only (8, BOARD_SIZE * BOARD_SIZE + 1) int array. Row i maps each flat location
+    (plus the pass index, which maps to itself) of the transformed board to its location in the original.
+    """
+    locations = np.arange(board_size * board_size).reshape(1, board_size, board_size)
+    indices = np.empty((8, board_size * board_size + 1), dtype=np.intp)
+    for i, symmetry in enumerate(all_symmetries(locations)):
+        indices[i, :-1] = symmetry.flatten()
+    indices[:, -1] = board_size * board_size
+    indices.flags.writeable = False
+    return indices
+
+
+def batch_symmetries(batch_image):
+    """
+    :param batch_image: A (B, C, BOARD_SIZE, BOARD_SIZE) numpy array
+    :return: A contiguous (B, 8, C, BOARD_SIZE, BOARD_SIZE) array holding all_symmetries of every image
+    """
+    b, c, m, n = batch_image.shape
+    indices = symmetry_indices(m)[:, :-1]
+    flat = batch_image.reshape(b, c, m * n)
+    symmetries = flat[np.arange(b)[:, np.newaxis, np.newaxis, np.newaxis],
+                      np.arange(c)[np.newaxis, np.newaxis, :, np.newaxis],
+                      indices[np.newaxis, :, np.newaxis, :]]
+    return symmetries.reshape(b, 8, c, m, n)
+
+
+def batch_policy_symmetries(batch_policy):
+    """
+    :param batch_policy: A (B, BOARD_SIZE * BOARD_SIZE + 1) array of move probabilities (or any per-action values)
+    :return: A contiguous (B, 8, BOARD_SIZE * BOARD_SIZE + 1) array, where [:, i] matches the
+    ith output of batch_symmetries. The pass entry stays last.
+    """
+    board_size = int(np.sqrt(batch_policy.shape[1] - 1))
+    return batch_policy[:, symmetry_indices(board_size)]
+
+
+def batch_random_symmetry(batch_image, batch_policy=None):
+    """
+    Applies one random symmetry per image (and to its policy, if given) in a single gather
+    :param batch_image: A (B, C, BOARD_SIZE, BOARD_SIZE) numpy array
+    :param batch_policy: Optional (B, BOARD_SIZE * BOARD_SIZE + 1) array
+    :return: The transformed images, and the transformed policies if batch_policy was given
+    """
+    b, c, m, n = batch_image.shape
+    orientations = np.random.randint(0, 8, size=b)
+    indices = symmetry_indices(m)[orientations]
+
+    flat = batch_image.reshape(b, c, m * n)
+    images = np.take_along_axis(flat, indices[:, np.newaxis, :-1], axis=2).reshape(b, c, m, n)
+    if batch_policy is None:
+        return images
+    return images, np.take_along_axis(batch_policy, indices, axis=1)
+
+
 def random_weighted_action(move_weights):
     """
     Assumes all invalid moves have weight 0
     Action is 1D
     Expected shape is (NUM OF MOVES, )
     """
-    move_weights = preprocessing.normalize(move_weights[np.newaxis], norm='l1')
-    return np.random.choice(np.arange(len(move_weights[0])), p=move_weights[0])
+    move_weights = move_weights / np.sum(np.abs(move_weights))
+    return np.random.choice(len(move_weights), p=move_weights)
 
 
 def random_action(state):
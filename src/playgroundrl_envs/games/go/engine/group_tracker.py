@@ -0,0 +1,360 @@
+"""
+Incremental group and liberty tracking for the Go engine.
+
+The default engine relabels the whole board with ndimage on every move. The
+GroupTracker keeps a union-find forest of stone groups, with a liberty set per
+group, and only touches the placed stone, its neighbours and any captured
+groups. It reproduces the same invalid moves, captures and ko protection as
+gogame.next_state, so the two can be used interchangeably.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from . import govars
+from . import zobrist
+from .compact_state import CompactState
+from .territory import TerritoryTracker
+
+EMPTY = govars.NOONE
+
+neighbor_deltas = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(size):
+    """
+    :param size: Board size
+    :return: Tuple, indexed by flat location, of the flat locations of its on-board neighbors
+    """
+    table = []
+    for i in range(size):
+        for j in range(size):
+            neighbors = []
+            for di, dj in neighbor_deltas:
+                ni, nj = i + di, j + dj
+                if 0 <= ni < size and 0 <= nj < size:
+                    neighbors.append(ni * size + nj)
+            table.append(tuple(neighbors))
+    return tuple(table)
+
+
+class GroupTracker:
+    """
+    Mutable record of the stones on a board, grouped with union-find.
+
+    Every stone points (possibly indirectly) at the root of its group. Each root owns
+    the set of stones in the group and the set of empty points adjacent to it. The
+    tracker also mirrors the turn, pass, done and ko information stored in the
+    state channels so it can produce the invalid moves for the player to move.
+
+    With track_territory, it also keeps a TerritoryTracker so gogame.areas doesn't
+    have to relabel the empty regions after every move.
+
+    The Zobrist hash of the position (see zobrist.py) is updated with every stone
+    placed or captured, and each group keeps the XOR of its stones' keys. With
+    superko, every position reached is remembered, and moves that would recreate one
+    of them are invalid (positional superko), on top of the simple ko rule.
+    """
+
+    def __init__(self, size, track_territory=False, superko=False):
+        self.size = size
+        self.area = size * size
+        self.neighbors = neighbor_table(size)
+        self.keys = zobrist.stone_key_lists(size)
+
+        self.board = [EMPTY] * self.area
+        self.parent = list(range(self.area))
+        self.stones = {}
+        self.liberties = {}
+        self.group_hash = {}
+        self.position_hash = 0
+
+        # Empty points whose neighbors are all occupied, the only ones that can be suicide
+        self.empty_neighbors = [len(n) for n in self.neighbors]
+        self.enclosed = {loc for loc in range(self.area) if self.empty_neighbors[loc] == 0}
+
+        self.turn = govars.BLACK
+        self.passed = False
+        self.done = False
+        self.ko = None
+
+        self.territory = None
+        if track_territory:
+            self.territory = TerritoryTracker.from_board(self.board, size, self.neighbors)
+
+        # Position hashes seen so far, for superko
+        self.history = {self.position_hash} if superko else None
+
+    @property
+    def superko(self):
+        return self.history is not None
+
+    @classmethod
+    def from_state(cls, state, track_territory=False, superko=False):
+        """
+        Builds a tracker matching an existing [NUM_CHNLS, SIZE, SIZE] state or CompactState.
+        With superko, only the current position is known to have been played.
+        """
+        size = state.shape[1]
+        tracker = cls(size)
+        for color in (govars.BLACK, govars.WHITE):
+            for loc in np.flatnonzero(state[color]):
+                tracker._add_stone(int(loc), color)
+        if superko:
+            tracker.history = {tracker.position_hash}
+        if track_territory:
+            tracker.territory = TerritoryTracker.from_board(tracker.board, size, tracker.neighbors)
+
+        if isinstance(state, CompactState):
+            tracker.turn = state.turn
+            tracker.passed = state.passed
+            tracker.done = state.done
+            tracker.ko = state.ko
+            return tracker
+
+        tracker.turn = int(np.max(state[govars.TURN_CHNL]))
+        tracker.passed = bool(np.max(state[govars.PASS_CHNL]) == 1)
+        tracker.done = bool(np.max(state[govars.DONE_CHNL]) == 1)
+
+        # The ko point is the only invalid empty point that is not explained by suicide
+        invalid = np.flatnonzero(state[govars.INVD_CHNL].flatten() > 0)
+        suicides = set(tracker.invalid_empty_points())
+        for loc in invalid:
+            loc = int(loc)
+            if tracker.board[loc] == EMPTY and loc not in suicides:
+                tracker.ko = loc
+                break
+        return tracker
+
+    def copy(self):
+        tracker = GroupTracker.__new__(GroupTracker)
+        tracker.size = self.size
+        tracker.area = self.area
+        tracker.neighbors = self.neighbors
+        tracker.keys = self.keys
+        tracker.board = self.board.copy()
+        tracker.parent = self.parent.copy()
+        tracker.stones = {root: set(stones) for root, stones in self.stones.items()}
+        tracker.liberties = {root: set(libs) for root, libs in self.liberties.items()}
+        tracker.group_hash = self.group_hash.copy()
+        tracker.position_hash = self.position_hash
+        tracker.history = set(self.history) if self.history is not None else None
+        tracker.enclosed = set(self.enclosed)
+        tracker.empty_neighbors = self.empty_neighbors.copy()
+        tracker.turn = self.turn
+        tracker.passed = self.passed
+        tracker.done = self.done
+        tracker.ko = self.ko
+        tracker.territory = self.territory.copy() if self.territory is not None else None
+        return tracker
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def compact_state(self):
+        """
+        :return: CompactState of the tracked position
+        """
+        board = np.array(self.board, dtype=np.int8).reshape(self.size, self.size)
+        stones = np.stack([board == govars.BLACK, board == govars.WHITE])
+
+        invalid = board != EMPTY
+        invalid.flat[self.invalid_empty_points()] = True
+
+        return CompactState(
+            stones=stones,
+            invalid=invalid,
+            turn=self.turn,
+            passed=self.passed,
+            done=self.done,
+            ko=self.ko,
+            position_hash=self.position_hash,
+        )
+
+    def areas(self):
+        """
+        :return: black area, white area, from the territory tracker
+        """
+        return self.territory.areas(self.board)
+
+    def find(self, loc):
+        parent = self.parent
+        while parent[loc] != loc:
+            parent[loc] = parent[parent[loc]]
+            loc = parent[loc]
+        return loc
+
+    def num_liberties(self, loc):
+        return len(self.liberties[self.find(loc)])
+
+    def is_valid(self, loc):
+        """
+        Whether the player to move may place a stone at flat location loc
+        """
+        if self.board[loc] != EMPTY or loc == self.ko:
+            return False
+        if loc in self.enclosed and self._is_suicide(loc, self.turn):
+            return False
+        if self.history is not None and self._repeats_position(loc, self.turn):
+            return False
+        return True
+
+    def next_position_hash(self, loc, player):
+        """
+        :return: Position hash after player places a stone at loc, including any captures
+        """
+        position_hash = self.position_hash ^ self.keys[player][loc]
+        captured_roots = []
+        for neighbor in self.neighbors[loc]:
+            if self.board[neighbor] == 1 - player:
+                root = self.find(neighbor)
+                if root not in captured_roots and len(self.liberties[root]) == 1:
+                    captured_roots.append(root)
+                    position_hash ^= self.group_hash[root]
+        return position_hash
+
+    def _repeats_position(self, loc, player):
+        return self.next_position_hash(loc, player) in self.history
+
+    def _is_suicide(self, loc, player):
+        # Mirrors state_utils.compute_invalid_moves for a completely surrounded point
+        neighbors = self.neighbors[loc]
+        if not neighbors:
+            return False
+        for neighbor in neighbors:
+            num_libs = len(self.liberties[self.find(neighbor)])
+            if self.board[neighbor] == player:
+                if num_libs > 1:
+                    return False
+            elif num_libs == 1:
+                return False
+        return True
+
+    def invalid_empty_points(self):
+        """
+        :return: Flat locations of empty points the player to move cannot play,
+        (suicides and ko). Occupied points are always invalid and are not listed.
+        """
+        points = [loc for loc in self.enclosed if self._is_suicide(loc, self.turn)]
+        if self.ko is not None:
+            points.append(self.ko)
+        if self.history is not None:
+            skip = set(points)
+            board = self.board
+            points.extend(
+                loc
+                for loc in range(self.area)
+                if board[loc] == EMPTY and loc not in skip and self._repeats_position(loc, self.turn)
+            )
+        return points
+
+    def play(self, action1d):
+        """
+        Plays action1d (SIZE * SIZE is a pass) for the player to move.
+        :return: List of flat locations of the stones that were captured
+        """
+        captured = []
+        ko = None
+
+        if action1d == self.area:
+            if self.passed:
+                self.done = True
+            self.passed = True
+        else:
+            assert 0 <= action1d < self.area and self.is_valid(action1d), (
+                "Invalid move",
+                divmod(action1d, self.size),
+            )
+            self.passed = False
+
+            player = self.turn
+            opponent = 1 - player
+            board = self.board
+
+            surrounded = all(board[n] == opponent for n in self.neighbors[action1d])
+            self._add_stone(action1d, player)
+            if self.territory is not None:
+                self.territory.place(board, action1d)
+
+            killed_groups = []
+            for neighbor in self.neighbors[action1d]:
+                if board[neighbor] != opponent:
+                    continue
+                root = self.find(neighbor)
+                if not self.liberties[root]:
+                    killed_groups.append(self.stones[root])
+                    captured.extend(self._remove_group(root))
+                    if self.territory is not None:
+                        self.territory.capture(board, killed_groups[-1])
+
+            # Same ko rule as gogame.next_state
+            if len(killed_groups) == 1 and surrounded and len(killed_groups[0]) == 1:
+                ko = next(iter(killed_groups[0]))
+
+        self.ko = ko
+        self.turn = 1 - self.turn
+        if self.history is not None:
+            self.history.add(self.position_hash)
+        return captured
+
+    def _add_stone(self, loc, color):
+        board = self.board
+        board[loc] = color
+        self.parent[loc] = loc
+        self.stones[loc] = {loc}
+        self.liberties[loc] = set()
+        self.group_hash[loc] = self.keys[color][loc]
+        self.position_hash ^= self.keys[color][loc]
+
+        self.enclosed.discard(loc)
+        for neighbor in self.neighbors[loc]:
+            if board[neighbor] == EMPTY:
+                self.liberties[loc].add(neighbor)
+                self.empty_neighbors[neighbor] -= 1
+                if self.empty_neighbors[neighbor] == 0:
+                    self.enclosed.add(neighbor)
+            else:
+                root = self.find(neighbor)
+                self.liberties[root].discard(loc)
+
+        for neighbor in self.neighbors[loc]:
+            if board[neighbor] == color:
+                self._union(loc, neighbor)
+
+    def _union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if len(self.stones[root_a]) < len(self.stones[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.stones[root_a] |= self.stones.pop(root_b)
+        self.liberties[root_a] |= self.liberties.pop(root_b)
+        self.group_hash[root_a] ^= self.group_hash.pop(root_b)
+
+    def _remove_group(self, root):
+        board = self.board
+        stones = self.stones.pop(root)
+        del self.liberties[root]
+        self.position_hash ^= self.group_hash.pop(root)
+
+        for loc in stones:
+            board[loc] = EMPTY
+            self.parent[loc] = loc
+        for loc in stones:
+            empty_neighbors = 0
+            for neighbor in self.neighbors[loc]:
+                if board[neighbor] == EMPTY:
+                    empty_neighbors += 1
+                    if neighbor not in stones:
+                        if self.empty_neighbors[neighbor] == 0:
+                            self.enclosed.discard(neighbor)
+                        self.empty_neighbors[neighbor] += 1
+                else:
+                    self.liberties[self.find(neighbor)].add(loc)
+            self.empty_neighbors[loc] = empty_neighbors
+            if empty_neighbors == 0:
+                self.enclosed.add(loc)
+        return sorted(stones)
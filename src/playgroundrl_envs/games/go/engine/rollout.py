@@ -0,0 +1,120 @@
+"""
+Random playouts for Monte Carlo evaluation.
+
+gogame.random_action plus gogame.next_state copies and relabels the whole
+state for every move. A rollout instead plays on one mutable GroupTracker,
+keeps the list of empty points up to date as stones are placed and captured,
+and only checks the legality of the moves it actually draws. It plays until
+two passes in a row (or max_moves) and returns the final areas.
+"""
+
+import random
+
+import numpy as np
+
+from . import gogame
+from .group_tracker import EMPTY, GroupTracker
+
+
+def rollout(state, move_weights=None, max_moves=None, rng=None):
+    """
+    Plays one game to the end from state
+    :param state: [NUM_CHNLS, SIZE, SIZE] state, CompactState or GroupTracker. A GroupTracker is played on in place.
+    :param move_weights: Optional (SIZE * SIZE + 1,) non-negative weights, pass last. Moves are drawn
+    proportionally to their weights among the valid ones. By default every valid move (and pass) is equally
+    likely, like gogame.random_action.
+    :param max_moves: Stop after this many moves, even if the game hasn't ended. Defaults to 3 * SIZE * SIZE.
+    :param rng: Optional random.Random
+    :return: black area, white area of the final position
+    """
+    groups = state if isinstance(state, GroupTracker) else GroupTracker.from_state(state)
+    rng = rng or random.Random()
+    if max_moves is None:
+        max_moves = 3 * groups.area
+
+    if move_weights is None:
+        _play_uniform(groups, max_moves, rng)
+    else:
+        _play_weighted(groups, np.asarray(move_weights, dtype=float).tolist(), max_moves, rng)
+
+    board = np.array(groups.board).reshape(1, groups.size, groups.size)
+    black_areas, white_areas = gogame.stone_areas(board == 0, board == 1)
+    return black_areas[0], white_areas[0]
+
+
+def batch_rollouts(state, num_rollouts, move_weights=None, max_moves=None, seed=None):
+    """
+    Plays num_rollouts independent games from the same state
+    :return: Black areas and white areas, arrays of shape (num_rollouts,)
+    """
+    groups = state if isinstance(state, GroupTracker) else GroupTracker.from_state(state)
+    groups = groups.copy()
+    groups.territory = None
+    rng = random.Random(seed)
+
+    black_areas = np.empty(num_rollouts)
+    white_areas = np.empty(num_rollouts)
+    for i in range(num_rollouts):
+        black_areas[i], white_areas[i] = rollout(groups.copy(), move_weights, max_moves, rng)
+    return black_areas, white_areas
+
+
+def _play_uniform(groups: GroupTracker, max_moves, rng):
+    pass_idx = groups.area
+
+    # Empty points, with the position of each in the list for O(1) removal
+    empties = [loc for loc in range(groups.area) if groups.board[loc] == EMPTY]
+    positions = {loc: i for i, loc in enumerate(empties)}
+
+    for _ in range(max_moves):
+        if groups.done:
+            return
+
+        # Draw among the empty points and pass, dropping invalid points as they are drawn
+        candidates = empties.copy()
+        candidates.append(pass_idx)
+        while True:
+            i = rng.randrange(len(candidates))
+            action = candidates[i]
+            if action == pass_idx or groups.is_valid(action):
+                break
+            candidates[i] = candidates[-1]
+            candidates.pop()
+
+        captured = groups.play(action)
+        if action == pass_idx:
+            continue
+
+        _remove(empties, positions, action)
+        for loc in captured:
+            positions[loc] = len(empties)
+            empties.append(loc)
+
+
+def _play_weighted(groups: GroupTracker, move_weights, max_moves, rng):
+    pass_idx = groups.area
+    board = groups.board
+
+    for _ in range(max_moves):
+        if groups.done:
+            return
+
+        actions = [loc for loc in range(pass_idx) if board[loc] == EMPTY and move_weights[loc] > 0]
+        actions = [loc for loc in actions if groups.is_valid(loc)]
+        weights = [move_weights[loc] for loc in actions]
+        actions.append(pass_idx)
+        weights.append(move_weights[pass_idx])
+
+        if sum(weights) > 0:
+            action = rng.choices(actions, weights)[0]
+        else:
+            action = pass_idx
+        groups.play(action)
+
+
+def _remove(items, positions, item):
+    i = positions.pop(item)
+    last = items.pop()
+    if last != item:
+        items[i] = last
+        positions[last] = i
@@ -82,6 +82,35 @@ def compute_invalid_moves(state, player, ko_protect=None):
     return invalid_moves > 0
 
 
+def batch_neighbor_labels(batch_labels):
+    """
+    :param batch_labels: Labels of shape (BATCH, SIZE, SIZE)
+    :return: Labels of the up, down, left and right neighbor of every point, shape (4, BATCH, SIZE, SIZE).
+    Off-board neighbors have label 0.
+    """
+    padded = np.pad(batch_labels, ((0, 0), (1, 1), (1, 1)))
+    return np.stack([padded[:, :-2, 1:-1], padded[:, 2:, 1:-1], padded[:, 1:-1, :-2], padded[:, 1:-1, 2:]])
+
+
+def batch_liberty_counts(batch_labels, num_labels, batch_empties):
+    """
+    Counts the liberties of every labeled group in the batch at once
+    :param batch_labels: Group labels of shape (BATCH, SIZE, SIZE), unique across the batch
+    :param batch_empties: Boolean array of empty points, shape (BATCH, SIZE, SIZE)
+    :return: Liberty count indexed by label (index 0 is unused), and the neighbor labels
+    """
+    neighbor_labels = batch_neighbor_labels(batch_labels)
+    liberty_counts = np.zeros(num_labels + 1, dtype=int)
+    for direction in range(len(neighbor_labels)):
+        labels = neighbor_labels[direction]
+        # Count each (empty point, group) pair once, even if the group touches it from several sides
+        first_seen = batch_empties & (labels > 0)
+        for prev_direction in range(direction):
+            first_seen &= labels != neighbor_labels[prev_direction]
+        liberty_counts += np.bincount(labels[first_seen], minlength=num_labels + 1)
+    return liberty_counts, neighbor_labels
+
+
 def batch_compute_invalid_moves(batch_state, batch_player, batch_ko_protect):
     """
     Updates invalid moves in the OPPONENT's perspective
@@ -95,64 +124,61 @@ def batch_compute_invalid_moves(batch_state, batch_player, batch_ko_protect):
             not adjacent to other groups with more than one liberty and is completely surrounded
         ii.) If it's surrounded by our pieces and all of those corresponding groups
             move more than one liberty
+
+    Groups are labeled once for the whole batch and liberties are counted with bincount
+    over the labels, so there are no loops over boards or groups.
+
+    :param batch_ko_protect: (BATCH, 2) locations with -1 where there is no ko, or the
+    legacy object array holding a location or None per board
     """
     batch_idcs = np.arange(len(batch_state))
 
     # All pieces and empty spaces
     batch_all_pieces = np.sum(batch_state[:, [govars.BLACK, govars.WHITE]], axis=1)
-    batch_empties = 1 - batch_all_pieces
-
-    # Setup invalid and valid arrays
-    batch_possible_invalid_array = np.zeros(batch_state.shape[:1] + batch_state.shape[2:])
-    batch_definite_valids_array = np.zeros(batch_state.shape[:1] + batch_state.shape[2:])
+    batch_empties = batch_all_pieces == 0
 
     # Get all groups
-    batch_all_own_groups, _ = measurements.label(batch_state[batch_idcs, batch_player], group_struct)
-    batch_all_opp_groups, _ = measurements.label(batch_state[batch_idcs, 1 - batch_player], group_struct)
-
-    batch_data = enumerate(zip(batch_all_own_groups, batch_all_opp_groups, batch_empties))
-    for i, (all_own_groups, all_opp_groups, empties) in batch_data:
-        own_labels = np.unique(all_own_groups)
-        opp_labels = np.unique(all_opp_groups)
-        own_labels = own_labels[np.nonzero(own_labels)]
-        opp_labels = opp_labels[np.nonzero(opp_labels)]
-        expanded_own_groups = np.zeros((len(own_labels), *all_own_groups.shape))
-        expanded_opp_groups = np.zeros((len(opp_labels), *all_opp_groups.shape))
-
-        # Expand the groups such that each group is in its own channel
-        for j, label in enumerate(own_labels):
-            expanded_own_groups[j] = all_own_groups == label
-
-        for j, label in enumerate(opp_labels):
-            expanded_opp_groups[j] = all_opp_groups == label
-
-        # Get all liberties in the expanded form
-        all_own_liberties = empties[np.newaxis] * ndimage.binary_dilation(expanded_own_groups,
-                                                                          surround_struct[np.newaxis])
-        all_opp_liberties = empties[np.newaxis] * ndimage.binary_dilation(expanded_opp_groups,
-                                                                          surround_struct[np.newaxis])
-
-        own_liberty_counts = np.sum(all_own_liberties, axis=(1, 2))
-        opp_liberty_counts = np.sum(all_opp_liberties, axis=(1, 2))
-
-        # Possible invalids are on single liberties of opponent groups and on multi-liberties of own groups
-        # Definite valids are on single liberties of own groups, multi-liberties of opponent groups
-        # or you are not surrounded
-        batch_possible_invalid_array[i] += np.sum(all_own_liberties[own_liberty_counts > 1], axis=0)
-        batch_possible_invalid_array[i] += np.sum(all_opp_liberties[opp_liberty_counts == 1], axis=0)
-
-        batch_definite_valids_array[i] += np.sum(all_own_liberties[own_liberty_counts == 1], axis=0)
-        batch_definite_valids_array[i] += np.sum(all_opp_liberties[opp_liberty_counts > 1], axis=0)
+    batch_all_own_groups, num_own_groups = measurements.label(batch_state[batch_idcs, batch_player], group_struct)
+    batch_all_opp_groups, num_opp_groups = measurements.label(batch_state[batch_idcs, 1 - batch_player],
+                                                              group_struct)
+
+    own_liberty_counts, own_neighbors = batch_liberty_counts(batch_all_own_groups, num_own_groups, batch_empties)
+    opp_liberty_counts, opp_neighbors = batch_liberty_counts(batch_all_opp_groups, num_opp_groups, batch_empties)
+
+    # Liberty count of the group next to each point in each direction (0 if there is none)
+    own_neighbor_liberties = own_liberty_counts[own_neighbors]
+    opp_neighbor_liberties = opp_liberty_counts[opp_neighbors]
+
+    # Possible invalids are on single liberties of opponent groups and on multi-liberties of own groups
+    # Definite valids are on single liberties of own groups, multi-liberties of opponent groups
+    # or you are not surrounded
+    batch_possible_invalid_array = ((own_neighbor_liberties > 1) | (opp_neighbor_liberties == 1)).any(axis=0)
+    batch_definite_valids_array = ((own_neighbor_liberties == 1) | (opp_neighbor_liberties > 1)).any(axis=0)
 
     # All invalid moves are occupied spaces + (possible invalids minus the definite valids and it's surrounded)
     surrounded = ndimage.convolve(batch_all_pieces, surround_struct[np.newaxis], mode='constant', cval=1) == 4
-    invalid_moves = batch_all_pieces + batch_possible_invalid_array * (batch_definite_valids_array == 0) * surrounded
+    invalid_moves = (batch_all_pieces > 0) | (
+        batch_empties & batch_possible_invalid_array & ~batch_definite_valids_array & surrounded)
 
     # Ko-protection
+    batch_ko_protect = ko_protect_array(batch_ko_protect)
+    ko_idcs = np.nonzero(batch_ko_protect[:, 0] >= 0)[0]
+    invalid_moves[ko_idcs, batch_ko_protect[ko_idcs, 0], batch_ko_protect[ko_idcs, 1]] = True
+    return invalid_moves
+
+
+def ko_protect_array(batch_ko_protect):
+    """
+    Converts the legacy object array of ko locations (or None) into a (BATCH, 2) int array, -1 meaning no ko
+    """
+    batch_ko_protect = np.asarray(batch_ko_protect)
+    if batch_ko_protect.dtype != object:
+        return batch_ko_protect
+    ko_array = np.full((len(batch_ko_protect), 2), -1)
     for i, ko_protect in enumerate(batch_ko_protect):
         if ko_protect is not None:
-            invalid_moves[i, ko_protect[0], ko_protect[1]] = 1
-    return invalid_moves > 0
+            ko_array[i] = ko_protect
+    return ko_array
 
 
 def update_pieces(state, adj_locs, player):
@@ -180,34 +206,47 @@ def update_pieces(state, adj_locs, player):
 
 
 def batch_update_pieces(batch_non_pass, batch_state, batch_adj_locs, batch_player):
+    """
+    Removes the opponent groups left without liberties next to each placed stone
+    :param batch_non_pass: Indices of the boards in batch_state where a stone was placed
+    :param batch_adj_locs: (len(batch_non_pass), 4, 2) neighbor locations from batch_adj_data
+    :param batch_player: Player who placed the stone, for each of those boards
+    :return: Boolean (len(batch_non_pass), SIZE, SIZE) mask of the captured stones, and the number of
+    captured groups per board
+    """
     batch_opponent = 1 - batch_player
-    batch_killed_groups = []
+    board_shape = batch_state.shape[2:]
+    if len(batch_non_pass) == 0:
+        return np.zeros((0, *board_shape), dtype=bool), np.zeros(0, dtype=int)
 
-    batch_all_pieces = np.sum(batch_state[:, [govars.BLACK, govars.WHITE]], axis=1)
-    batch_empties = 1 - batch_all_pieces
+    batch_all_pieces = np.sum(batch_state[batch_non_pass][:, [govars.BLACK, govars.WHITE]], axis=1)
+    batch_empties = batch_all_pieces == 0
 
-    batch_all_opp_groups, _ = ndimage.measurements.label(batch_state[batch_non_pass, batch_opponent],
-                                                         group_struct)
+    batch_all_opp_groups, num_opp_groups = ndimage.measurements.label(batch_state[batch_non_pass, batch_opponent],
+                                                                      group_struct)
+    opp_liberty_counts, _ = batch_liberty_counts(batch_all_opp_groups, num_opp_groups, batch_empties)
 
-    batch_data = enumerate(zip(batch_all_opp_groups, batch_all_pieces, batch_empties, batch_adj_locs, batch_opponent))
-    for i, (all_opp_groups, all_pieces, empties, adj_locs, opponent) in batch_data:
-        killed_groups = []
+    # Opponent groups next to the placed stones
+    on_board = (batch_adj_locs >= 0).all(axis=2)
+    rows = np.arange(len(batch_non_pass))[:, np.newaxis]
+    adj_labels = batch_all_opp_groups[rows, batch_adj_locs[:, :, 0], batch_adj_locs[:, :, 1]] * on_board
 
-        # Go through opponent groups
-        all_adj_labels = all_opp_groups[adj_locs[:, 0], adj_locs[:, 1]]
-        all_adj_labels = np.unique(all_adj_labels)
-        for opp_group_idx in all_adj_labels[np.nonzero(all_adj_labels)]:
-            opp_group = all_opp_groups == opp_group_idx
-            liberties = empties * ndimage.binary_dilation(opp_group)
-            if np.sum(liberties) <= 0:
-                # Killed group
-                opp_group_locs = np.argwhere(opp_group)
-                batch_state[batch_non_pass[i], opponent, opp_group_locs[:, 0], opp_group_locs[:, 1]] = 0
-                killed_groups.append(opp_group_locs)
+    # Killed groups are the adjacent ones without liberties
+    killed_labels = np.zeros(num_opp_groups + 1, dtype=bool)
+    killed_labels[adj_labels] = opp_liberty_counts[adj_labels] == 0
+    killed_labels[0] = False
 
-        batch_killed_groups.append(killed_groups)
+    batch_killed = killed_labels[batch_all_opp_groups]
+    batch_state[batch_non_pass, batch_opponent] *= ~batch_killed
 
-    return batch_killed_groups
+    # Count distinct killed groups per board
+    first_seen = killed_labels[adj_labels]
+    for direction in range(1, adj_labels.shape[1]):
+        for prev_direction in range(direction):
+            first_seen[:, direction] &= adj_labels[:, direction] != adj_labels[:, prev_direction]
+    batch_num_killed = np.sum(first_seen, axis=1)
+
+    return batch_killed, batch_num_killed
 
 
 def adj_data(state, action2d, player):
@@ -223,11 +262,18 @@ def adj_data(state, action2d, player):
 
 
 def batch_adj_data(batch_state, batch_action2d, batch_player):
-    batch_neighbors, batch_surrounded = [], []
-    for state, action2d, player in zip(batch_state, batch_action2d, batch_player):
-        neighbors, surrounded = adj_data(state, action2d, player)
-        batch_neighbors.append(neighbors)
-        batch_surrounded.append(surrounded)
+    """
+    :return: (BATCH, 4, 2) neighbor locations of each action, with -1 for off-board neighbors,
+    and whether each placed piece is surrounded by opponent pieces
+    """
+    batch_neighbors = batch_action2d[:, np.newaxis] + neighbor_deltas[np.newaxis]
+    on_board = ((batch_neighbors >= 0) & (batch_neighbors < batch_state.shape[2])).all(axis=2)
+    batch_neighbors[~on_board] = -1
+
+    rows = np.arange(len(batch_state))[:, np.newaxis]
+    opp_pieces = batch_state[rows, (1 - batch_player)[:, np.newaxis], batch_neighbors[:, :, 0],
+                             batch_neighbors[:, :, 1]]
+    batch_surrounded = ((opp_pieces > 0) | ~on_board).all(axis=1)
     return batch_neighbors, batch_surrounded
 
 
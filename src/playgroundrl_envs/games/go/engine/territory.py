@@ -0,0 +1,135 @@
+"""
+Incremental area scoring for the Go engine.
+
+gogame.areas labels the empty regions of the whole board on every call. The
+TerritoryTracker keeps those regions between moves, along with how many times
+each region touches a black and a white stone. It is kept up to date by a
+GroupTracker, and only rescores the region a stone was played in (and only
+relabels it when the stone may have split it in two) and the regions opened
+up by captures.
+"""
+
+from . import govars
+
+EMPTY = govars.NOONE
+
+
+class TerritoryTracker:
+    def __init__(self, size, neighbors):
+        self.size = size
+        self.neighbors = neighbors
+
+        # Region id of every empty point (-1 for stones), the points of every region,
+        # and how many (region point, black stone) and (region point, white stone) pairs are adjacent
+        self.region = [-1] * (size * size)
+        self.points = {}
+        self.contacts = {}
+        self.next_region = 0
+
+    @classmethod
+    def from_board(cls, board, size, neighbors):
+        tracker = cls(size, neighbors)
+        for loc in range(len(board)):
+            if board[loc] == EMPTY and tracker.region[loc] == -1:
+                tracker._fill(board, loc)
+        return tracker
+
+    def copy(self):
+        tracker = TerritoryTracker(self.size, self.neighbors)
+        tracker.region = self.region.copy()
+        tracker.points = {region: set(points) for region, points in self.points.items()}
+        tracker.contacts = {region: list(contacts) for region, contacts in self.contacts.items()}
+        tracker.next_region = self.next_region
+        return tracker
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def areas(self, board):
+        """
+        :return: black area, white area, the same as gogame.areas
+        """
+        black_area = float(board.count(govars.BLACK))
+        white_area = float(board.count(govars.WHITE))
+        for region, (black_contacts, white_contacts) in self.contacts.items():
+            if black_contacts and not white_contacts:
+                black_area += len(self.points[region])
+            elif white_contacts and not black_contacts:
+                white_area += len(self.points[region])
+        return black_area, white_area
+
+    def place(self, board, loc):
+        """
+        Called once board[loc] holds the newly placed stone, before any captures are removed
+        """
+        region = self.region[loc]
+        points = self.points[region]
+        contacts = self.contacts[region]
+
+        points.discard(loc)
+        self.region[loc] = -1
+
+        empty_neighbors = []
+        for neighbor in self.neighbors[loc]:
+            if board[neighbor] == EMPTY:
+                empty_neighbors.append(neighbor)
+            else:
+                contacts[board[neighbor]] -= 1
+        contacts[board[loc]] += len(empty_neighbors)
+
+        if not points:
+            del self.points[region]
+            del self.contacts[region]
+        elif len(empty_neighbors) > 1 and not self._locally_connected(board, loc):
+            # The stone may have cut the region in two
+            del self.points[region]
+            del self.contacts[region]
+            for point in points:
+                self.region[point] = -1
+            for point in points:
+                if self.region[point] == -1:
+                    self._fill(board, point)
+
+    def capture(self, board, stones):
+        """
+        Called once the stones of a captured group have been removed from board.
+        A captured group had no liberties, so its points become a region of their own.
+        """
+        self._fill(board, next(iter(stones)))
+
+    def _locally_connected(self, board, loc):
+        # Whether the empty orthogonal neighbors of loc are connected through the 8 points around it.
+        # False doesn't mean the region split, only that it has to be relabeled to find out.
+        i, j = divmod(loc, self.size)
+        ring = [(i - 1, j), (i - 1, j + 1), (i, j + 1), (i + 1, j + 1),
+                (i + 1, j), (i + 1, j - 1), (i, j - 1), (i - 1, j - 1)]
+        empty = [
+            0 <= a < self.size and 0 <= b < self.size and board[a * self.size + b] == EMPTY
+            for a, b in ring
+        ]
+
+        num_sides = sum(empty[0::2])
+        num_links = sum(empty[k] and empty[k + 1] and empty[(k + 2) % 8] for k in range(0, 8, 2))
+        return num_sides - num_links <= 1
+
+    def _fill(self, board, start):
+        region = self.next_region
+        self.next_region += 1
+
+        points = {start}
+        contacts = [0, 0]
+        self.region[start] = region
+        frontier = [start]
+        while frontier:
+            loc = frontier.pop()
+            for neighbor in self.neighbors[loc]:
+                color = board[neighbor]
+                if color != EMPTY:
+                    contacts[color] += 1
+                elif self.region[neighbor] != region:
+                    self.region[neighbor] = region
+                    points.add(neighbor)
+                    frontier.append(neighbor)
+
+        self.points[region] = points
+        self.contacts[region] = contacts
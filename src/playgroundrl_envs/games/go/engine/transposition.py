@@ -0,0 +1,14 @@
+"""
+Bounded LRU cache of engine results, keyed by Zobrist state hash.
+
+Search on top of gogame (e.g. MCTS) reaches the same positions over and over.
+Passing a TranspositionTable as cache= to gogame.next_state, children or
+valid_moves memoizes their results. The hit, miss and eviction counters help
+choose a max_size for a given workload.
+"""
+
+from ....lru import LRUCache
+
+
+class TranspositionTable(LRUCache):
+    """ LRUCache of gogame results, filled through gogame.cached """
@@ -0,0 +1,87 @@
+"""
+Zobrist hashing for Go positions.
+
+Every (color, point) pair gets a fixed random 64 bit key, and the hash of a
+position is the XOR of the keys of its stones. Placing or removing a stone
+XORs a single key, so the GroupTracker keeps the hash up to date as moves are
+played. The keys come from a fixed seed, so hashes agree across processes and
+can be stored, e.g. to dedupe positions across games.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from . import govars
+
+SEED = 0x60BA5E
+
+_side_keys = np.random.default_rng(SEED).integers(0, 2 ** 63, size=3, dtype=np.uint64)
+TURN_KEY, PASS_KEY, DONE_KEY = (int(key) for key in _side_keys)
+
+
+@lru_cache(maxsize=None)
+def _board_keys(size):
+    keys = np.random.default_rng([SEED, size]).integers(0, 2 ** 63, size=(3, size * size), dtype=np.uint64)
+    keys.flags.writeable = False
+    return keys
+
+
+def stone_keys(size):
+    """
+    :return: uint64 array of shape (2, SIZE * SIZE), the keys of a black and a white stone on each point
+    """
+    return _board_keys(size)[:2]
+
+
+def invalid_keys(size):
+    """
+    :return: uint64 array of shape (SIZE * SIZE,), the keys of an empty point that is invalid to play
+    """
+    return _board_keys(size)[2]
+
+
+@lru_cache(maxsize=None)
+def stone_key_lists(size):
+    """
+    The keys from stone_keys as python ints, which are faster to XOR one at a time
+    """
+    return tuple(tuple(int(key) for key in color_keys) for color_keys in stone_keys(size))
+
+
+def _xor(keys):
+    return int(np.bitwise_xor.reduce(keys)) if len(keys) else 0
+
+
+def position_hash(state):
+    """
+    :param state: [NUM_CHNLS, SIZE, SIZE] state or CompactState
+    :return: Hash of the stones on the board only, as used for positional superko
+    """
+    size = state.shape[1]
+    keys = stone_keys(size)
+    return _xor(keys[govars.BLACK][np.asarray(state[govars.BLACK]).ravel() > 0]) ^ _xor(
+        keys[govars.WHITE][np.asarray(state[govars.WHITE]).ravel() > 0]
+    )
+
+
+def state_hash(state):
+    """
+    :param state: [NUM_CHNLS, SIZE, SIZE] state or CompactState
+    :return: Hash of everything in the state: stones, turn, pass and done flags, and the
+    empty points that are invalid (which covers ko). Equal states have equal hashes.
+    """
+    size = state.shape[1]
+    key = position_hash(state)
+
+    occupied = (np.asarray(state[govars.BLACK]) > 0) | (np.asarray(state[govars.WHITE]) > 0)
+    invalid_empty = (np.asarray(state[govars.INVD_CHNL]) > 0) & ~occupied
+    key ^= _xor(invalid_keys(size)[invalid_empty.ravel()])
+
+    if np.max(state[govars.TURN_CHNL]) == 1:
+        key ^= TURN_KEY
+    if np.max(state[govars.PASS_CHNL]) == 1:
+        key ^= PASS_KEY
+    if np.max(state[govars.DONE_CHNL]) == 1:
+        key ^= DONE_KEY
+    return key
@@ -1,14 +1,35 @@
+from collections import deque
 from enum import Enum
 from ...game_interface import GameInterface, GameParameterInterface, PlayerInterface
 import json
 from .engine import gogame as go_engine
 import numpy as np
 import attrs
+from typing import Optional
 from ...exceptions import PlaygroundInvalidActionException
 
 
 EMPTY_SQUARE = -1
 
+# In delta mode, a player gets a full snapshot at least this often (in iterations),
+# and moves older than this are dropped, so clients further behind get a full snapshot too
+FULL_SNAPSHOT_INTERVAL = 50
+
+
+def observation_dtype(board_size):
+    """
+    Schema of GoGame.get_observation. The board is EMPTY_SQUARE, 0 for black or 1 for
+    white on each point, and the other fields are the same as in get_state.
+    """
+    return np.dtype(
+        [
+            ("player_moving_id", np.int8),
+            ("board", np.int8, (board_size, board_size)),
+            ("invalid_moves", np.bool_, (board_size, board_size)),
+            ("last_move_was_pass", np.bool_),
+        ]
+    )
+
 
 class Color(Enum):
     WHITE = 0
@@ -22,9 +43,29 @@ class GoPlayer(PlayerInterface):
 @attrs.define(frozen=True)  # Makes it hashable, but not mutatable
 class GoParameters(GameParameterInterface):
     board_size: int = 15
+    superko: bool = False
+
+    adjudicate_margin: Optional[float] = None
+    """
+    End the game once one player's area (see gogame.areas) leads by at least this much,
+    after adjudicate_after_moves moves. None only ends games on two passes.
+    """
+    adjudicate_after_moves: int = 100
 
 
 class GoGame(GameInterface):
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "state",
+        "groups",
+        "player_moving",
+        "player_waiting",
+        "winning_player",
+        "is_game_over",
+        "deltas",
+        "acknowledged_iteration",
+        "last_snapshot_iteration",
+    )
+
     def __init__(
         self, game_id, players, game_type, parameters: GoParameters, self_training=False
     ):
@@ -41,30 +82,87 @@ class GoGame(GameInterface):
 
         self.board_size = parameters.board_size
 
-        # See engine/gogame.py for definition
-        self.state: np.Array = go_engine.init_state(self.board_size)
+        # See engine/compact_state.py for definition. Indexing it by channel
+        # gives the same values as the tensor described in engine/gogame.py
+        self.state: go_engine.CompactState = go_engine.init_state(
+            self.board_size, compact=True
+        )
+
+        # Groups, liberties and empty regions, carried between moves so they are never relabeled
+        self.groups = go_engine.GroupTracker(
+            self.board_size, track_territory=True, superko=parameters.superko
+        )
 
         self.is_game_over = False
+        self.observation_dtype = observation_dtype(self.board_size)
+
+        # For delta mode, see get_state. One entry per move, the oldest first
+        self.deltas = deque(maxlen=FULL_SNAPSHOT_INTERVAL)
+        # player_id -> last iteration the player acknowledged having
+        self.acknowledged_iteration = {}
+        # player_id -> iteration of the last full snapshot sent to the player
+        self.last_snapshot_iteration = {}
 
     def submit_action(self, action, player_sid=""):
         if self.player_moving.sid != player_sid:
             # Assert the socket has the right to make actions for this player
             raise PlaygroundInvalidActionException("It is not your turn.")
+        if self.is_game_over:
+            raise PlaygroundInvalidActionException("The game is over.")
 
         # Should be int representing action
         action = int(action)
 
+        previous_state = self.state
         try:
-            self.state = go_engine.next_state(self.state, action)
+            self.state = go_engine.next_state(self.state, action, groups=self.groups)
         except AssertionError:
             raise PlaygroundInvalidActionException("You cannot place a piece there.")
+        self._record_delta(previous_state, action)
+        # advance_game_state increments the iteration after submit_action
+        self._update_result(self.iteration + 1)
+
+        self.player_moving, self.player_waiting = (
+            self.player_waiting,
+            self.player_moving,
+        )
+        return True
 
-        black_area, white_area = go_engine.areas(self.state)
+    def submit_actions(self, actions):
+        """
+        Plays the moves on the GroupTracker only, then builds the state and the
+        rewards once, after the last one. The end of the game is still checked after
+        every move, from the tracker.
+        """
+        for action in actions:
+            if self.is_game_over:
+                raise PlaygroundInvalidActionException("The game is over.")
+            try:
+                self.groups.play(int(action))
+            except AssertionError:
+                raise PlaygroundInvalidActionException("You cannot place a piece there.")
+            self.iteration += 1
+            self.player_moving, self.player_waiting = (
+                self.player_waiting,
+                self.player_moving,
+            )
+            self.is_game_over = self.groups.done or self.is_decided(self.iteration)
+
+        self.state = self.groups.compact_state()
+        # There is no delta for these moves, so delta mode sends a full snapshot next
+        self.deltas.clear()
+        self._update_result(self.iteration)
+
+    def _update_result(self, num_moves):
+        """
+        Updates the rewards to the current areas, and ends the game if it is over
+        """
+        black_area, white_area = go_engine.areas(self.state, groups=self.groups)
 
         self.reward[0] = black_area
         self.reward[1] = white_area
 
-        if go_engine.game_ended(self.state) == 1:
+        if go_engine.game_ended(self.state) == 1 or self.is_decided(num_moves):
             self.is_game_over = True
             if self.reward[0] > self.reward[1]:
                 self.winning_player = 0
@@ -73,38 +171,138 @@ class GoGame(GameInterface):
             else:
                 self.winning_player = None
 
-        self.player_moving, self.player_waiting = (
-            self.player_waiting,
-            self.player_moving,
+    def is_decided(self, num_moves):
+        """
+        Whether the game can be adjudicated from the areas of the GroupTracker, after
+        num_moves moves, see GoParameters.adjudicate_margin
+        """
+        margin = self.parameters.adjudicate_margin
+        if margin is None or num_moves < self.parameters.adjudicate_after_moves:
+            return False
+        black_area, white_area = self.groups.areas()
+        return abs(black_area - white_area) >= margin
+
+    def _record_delta(self, previous_state, action):
+        """
+        Stores what action changed on the board, for get_state's delta mode
+        """
+        color = previous_state.turn
+        placed = None
+        if action != self.board_size ** 2:
+            placed = list(divmod(action, self.board_size))
+
+        opponent = 1 - color
+        captured = np.argwhere(previous_state.stones[opponent] & ~self.state.stones[opponent])
+        changed = np.argwhere(previous_state.invalid != self.state.invalid)
+        invalid_moves = [[int(r), int(c), float(self.state.invalid[r, c])] for r, c in changed]
+
+        self.deltas.append(
+            {
+                # advance_game_state increments the iteration after submit_action
+                "iteration": self.iteration + 1,
+                "color": color,
+                "placed": placed,
+                "captured": captured.tolist(),
+                "invalid_moves": invalid_moves,
+            }
+        )
+
+    def acknowledge_state(self, player_id, iteration):
+        """
+        Records that player_id has applied every update up to iteration, so the
+        next delta mode get_state for them only carries the moves after it.
+        """
+        if iteration > self.iteration:
+            raise PlaygroundInvalidActionException("Cannot acknowledge a future iteration.")
+        self.acknowledged_iteration[player_id] = max(
+            iteration, self.acknowledged_iteration.get(player_id, -1)
         )
-        return True
 
-    def get_state(self, player_sid="", player_id=-1):
+    def get_state(self, player_sid="", player_id=-1, delta=False):
+        """
+        :param delta: If True, returns only the moves since the last iteration player_id
+        acknowledged (see acknowledge_state), as
+        {"type": "delta", "from_iteration", "iteration", "moves": [...], ...}, where each move has
+        the color that moved, the placed [row, col] (None for a pass), the captured [row, col]s and
+        the [row, col, value] of every invalid_moves cell that changed. Every FULL_SNAPSHOT_INTERVAL
+        iterations, or when there is nothing acknowledged to build on, returns the usual full state
+        with "type": "full" and "iteration" added instead.
+        """
         if player_id == -1:
             player_id = self.player_moving.player_id
 
-        board = self.state[0] - 1
-        board += self.state[1] * 2
-
-        move_was_pass = bool(self.state[4][0][0] == 1)
-        invalid_moves = self.state[3]
-
-        # Return as JSON so it's very easy to parse
-        # TODO: Pot4entially an option
-        return (
-            json.dumps(
-                {
-                    "player_moving": self.player_moving.user_id,
-                    "model_name": self.player_moving.model_name,
-                    "player_moving_id": self.player_moving.player_id,
-                    "board": board.tolist(),
-                    "invalid_moves": invalid_moves.tolist(),
-                    "last_move_was_pass": move_was_pass,
-                }
-            ),
-            self.reward[player_id],
+        if delta:
+            return self._get_delta_state(player_id), self.reward[player_id]
+        return json.dumps(self._full_state()), self.reward[player_id]
+
+    def _get_delta_state(self, player_id):
+        acknowledged = self.acknowledged_iteration.get(player_id)
+        last_snapshot = self.last_snapshot_iteration.get(player_id)
+
+        # Only moves after acknowledged are needed. Each move is stored under the iteration it leads to
+        oldest_available = self.deltas[0]["iteration"] - 1 if self.deltas else self.iteration
+        if (
+            acknowledged is None
+            or last_snapshot is None
+            or acknowledged < oldest_available
+            or self.iteration - last_snapshot >= FULL_SNAPSHOT_INTERVAL
+        ):
+            self.last_snapshot_iteration[player_id] = self.iteration
+            message = self._full_state()
+            message["type"] = "full"
+            message["iteration"] = self.iteration
+            return json.dumps(message)
+
+        return json.dumps(
+            {
+                "type": "delta",
+                "from_iteration": acknowledged,
+                "iteration": self.iteration,
+                "player_moving": self.player_moving.user_id,
+                "model_name": self.player_moving.model_name,
+                "player_moving_id": self.player_moving.player_id,
+                "last_move_was_pass": self.state.passed,
+                "moves": [move for move in self.deltas if move["iteration"] > acknowledged],
+            }
         )
 
+    def _full_state(self):
+        # Floats, so the JSON matches the one built from the float tensor state
+        board = self.state[0] - 1.0
+        board += self.state[1] * 2.0
+
+        move_was_pass = self.state.passed
+        invalid_moves = self.state[3].astype(float)
+
+        # Returned as JSON so it's very easy to parse
+        return {
+            "player_moving": self.player_moving.user_id,
+            "model_name": self.player_moving.model_name,
+            "player_moving_id": self.player_moving.player_id,
+            "board": board.tolist(),
+            "invalid_moves": invalid_moves.tolist(),
+            "last_move_was_pass": move_was_pass,
+        }
+
+    def get_observation(self, player_sid="", player_id=-1):
+        if player_id == -1:
+            player_id = self.player_moving.player_id
+
+        observation = np.zeros((), dtype=self.observation_dtype)
+        observation["player_moving_id"] = self.player_moving.player_id
+
+        board = observation["board"]
+        board.fill(EMPTY_SQUARE)
+        board[self.state.stones[0]] = 0
+        board[self.state.stones[1]] = 1
+
+        observation["invalid_moves"] = self.state.invalid
+        observation["last_move_was_pass"] = self.state.passed
+        return observation, self.reward[player_id]
+
+    def get_observation_dtype(self):
+        return self.observation_dtype
+
     @staticmethod
     def get_game_name():
         return "go"
@@ -17,8 +17,27 @@ class MiningDecarbonizationParameters(GameParameterInterface):
 
 WORLD_SIZE = 8
 
+# Schema of get_observation, same fields as get_state
+OBSERVATION_DTYPE = np.dtype(
+    [
+        ("player_moving_id", np.int8),
+        ("mined_resources", np.float64, (WORLD_SIZE, WORLD_SIZE)),
+        ("emissions", np.float64, (WORLD_SIZE, WORLD_SIZE)),
+        ("time_step", np.int32),
+    ]
+)
+
 
 class MiningDecarbonizationGame(GameInterface):
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "_available_resources",
+        "_research_invested",
+        "mined_resources",
+        "emissions",
+        "final_score",
+        "is_game_over",
+    )
+
     def __init__(self, game_id, players, game_type, parameters, self_training=False):
         super().__init__(game_id, parameters, players, game_type, self_training)
 
@@ -123,6 +142,17 @@ class MiningDecarbonizationGame(GameInterface):
 
         return json.dumps(state), self.reward
 
+    def get_observation(self, player_sid="", player_id=0):
+        observation = np.zeros((), dtype=OBSERVATION_DTYPE)
+        observation["player_moving_id"] = self.player.player_id
+        observation["mined_resources"] = self.mined_resources
+        observation["emissions"] = self.emissions
+        observation["time_step"] = self.iteration
+        return observation, self.reward
+
+    def get_observation_dtype(self):
+        return OBSERVATION_DTYPE
+
     def get_is_game_over(self):
         return self.is_game_over
 
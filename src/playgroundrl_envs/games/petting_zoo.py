@@ -24,6 +24,13 @@ class PettingZooParameters(GameParameterInterface):
 
 
 class PettingZooGame(GameInterface):
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "env",
+        "state",
+        "player_moving_index",
+        "is_game_over",
+    )
+
     def __init__(
         self,
         game_id: str,
@@ -1,8 +1,13 @@
+import copy
+import functools
 import json
+import random
+import numpy as np
 from ..game_interface import GameInterface, PlayerInterface, GameParameterInterface
 from enum import Enum
 from texasholdem.game.game import TexasHoldEm, GameState
 from texasholdem.game.action_type import ActionType
+from texasholdem.game.hand_phase import HandPhase
 from texasholdem.game.player_state import PlayerState
 from texasholdem.card.card import Card
 from ..sid_util import SidSessionInfo
@@ -30,6 +35,66 @@ PLAYER_STATE_TO_STR = {
 }
 
 
+# Cards are sent as the suit plus the rank, see Poker._card_to_str. In
+# get_observation a card is rank * 4 + its index in CARD_SUITS, or -1 for none
+CARD_SUITS = "shdc"
+NUM_COMMUNAL_CARDS = 5
+
+
+def copy_holdem(game: TexasHoldEm) -> TexasHoldEm:
+    """
+    Copies a TexasHoldEm game, without the generator running its current hand
+    """
+    hand_gen = game._hand_gen
+    game._hand_gen = None
+    try:
+        copied = copy.deepcopy(game)
+    finally:
+        game._hand_gen = hand_gen
+
+    # The betting round handlers are lambdas that deepcopy leaves pointing at game
+    for hand_phase in [HandPhase.PREFLOP, HandPhase.FLOP, HandPhase.TURN, HandPhase.RIVER]:
+        copied._handstate_handler[hand_phase] = functools.partial(
+            copied._betting_round, hand_phase
+        )
+    return copied
+
+
+def card_code(card_str):
+    if card_str[0] not in CARD_SUITS:
+        return -1
+    return (int(card_str[1:]) - 2) * 4 + CARD_SUITS.index(card_str[0])
+
+
+def observation_dtype(num_players):
+    """
+    Schema of Poker.get_observation. Fields are the same as in get_state, with the cards
+    encoded by card_code, per-player values indexed by player_id, and status as an index
+    into PLAYER_STATE_TO_STR. last_round is split into last_round_hands (-1 for hands that
+    weren't shown) and last_round_winnings.
+    """
+    return np.dtype(
+        [
+            ("player_moving_id", np.int8),
+            ("last_round_hands", np.int8, (num_players, 2)),
+            ("last_round_winnings", np.float64, (num_players,)),
+            ("communal_cards", np.int8, (NUM_COMMUNAL_CARDS,)),
+            ("min_raise", np.int32),
+            ("bet_amount", np.int32),
+            ("chip_counts", np.int32, (num_players,)),
+            ("amounts_bet", np.int32, (num_players,)),
+            ("players_left_in_hand", np.int8),
+            ("can_raise", np.bool_),
+            ("hand_number", np.int32),
+            ("status", np.int8),
+            ("pot_size", np.int32),
+            ("chips_to_call", np.int32),
+            ("hole_cards", np.int8, (2,)),
+            ("position", np.int8),
+        ]
+    )
+
+
 class PokerPlayer(PlayerInterface):
     pass
 
@@ -40,6 +105,19 @@ class PokerParameters(GameParameterInterface):
 
 
 class Poker(GameInterface):
+    # The hand in progress lives in a generator inside TexasHoldEm, which can't be
+    # copied. Snapshots have the game as it was before the hand was dealt instead, and
+    # restore deals it again from the same random state and replays the actions taken since.
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "hand_setup",
+        "hand_start",
+        "hand_actions",
+        "chips_at_round_start",
+        "hands",
+        "last_round_state",
+        "hand_number",
+    )
+
     def __init__(
         self,
         game_id,
@@ -60,6 +138,8 @@ class Poker(GameInterface):
         self.game = TexasHoldEm(BUY_IN, BIG_BLIND, SMALL_BLIND, len(self.players))
 
         self.last_round_state = None
+        self.hands = {}
+        self.observation_dtype = observation_dtype(self.num_players)
 
         self.start_hand()
         self.hand_number = 0
@@ -69,8 +149,55 @@ class Poker(GameInterface):
 
         for player in self.game.players:
             self.chips_at_round_start[player.player_id] = player.chips
+
+        # See snapshot_attributes. Besides the chips, the deal only depends on these, so
+        # the game is only copied once a snapshot is taken
+        self.hand_setup = (
+            self.game.btn_loc,
+            self.game.num_hands,
+            self.game.game_state,
+            random.getstate(),
+        )
+        self.hand_start = None
+        self.hand_actions = []
+
         self.game.start_hand()
 
+    def copy_hand_start(self) -> TexasHoldEm:
+        """
+        Copies the game as it was before the current hand was dealt
+        """
+        game = copy_holdem(self.game)
+        game.btn_loc, game.num_hands, game.game_state, _ = self.hand_setup
+        game.hand_phase = HandPhase.PREHAND
+        # Everything else is reset by TexasHoldEm.start_hand
+        for player in game.players:
+            player.chips = self.chips_at_round_start[player.player_id]
+        return game
+
+    def snapshot(self):
+        if self.hand_start is None:
+            self.hand_start = self.copy_hand_start()
+        return super().snapshot()
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+
+        self.game = copy_holdem(self.hand_start)
+        # Deals the same cards again, leaving the random state as it was
+        random_state = random.getstate()
+        random.setstate(self.hand_setup[-1])
+        try:
+            self.game.start_hand()
+        finally:
+            random.setstate(random_state)
+
+        for type, total in self.hand_actions:
+            if type == ActionType.RAISE:
+                self.game.take_action(type, total=total)
+            else:
+                self.game.take_action(type)
+
     def after_hand_end(self):
         self.hand_number += 1
         self.hands = {}
@@ -133,6 +260,7 @@ class Poker(GameInterface):
             raise PlaygroundInvalidActionException(
                 f"Raise must be at least {self.game.min_raise()}."
             )
+        self.hand_actions.append((type, action.get("total")))
 
         # Start next round if necessary
         if not self.game.is_hand_running():
@@ -141,6 +269,55 @@ class Poker(GameInterface):
         return True  # Success
 
     def get_state(self, player_sid="", player_id=-1):
+        state, player_id = self._get_state_dict(player_sid, player_id)
+
+        # Reward will be from previous round
+        return json.dumps(state), self.reward[player_id]
+
+    def get_observation(self, player_sid="", player_id=-1):
+        state, player_id = self._get_state_dict(player_sid, player_id)
+
+        observation = np.zeros((), dtype=self.observation_dtype)
+        observation["player_moving_id"] = state["player_moving_id"]
+
+        observation["last_round_hands"] = -1
+        if state["last_round"] is not None:
+            for hand_player_id, cards in state["last_round"]["hands"].items():
+                observation["last_round_hands"][hand_player_id] = [card_code(c) for c in cards]
+            for winner_id, winnings in state["last_round"]["winnings"].items():
+                observation["last_round_winnings"][winner_id] = winnings
+
+        communal_cards = [card_code(c) for c in state["communal_cards"]]
+        observation["communal_cards"] = -1
+        observation["communal_cards"][: len(communal_cards)] = communal_cards
+
+        for key in ["chip_counts", "amounts_bet"]:
+            for other_player_id, amount in state[key].items():
+                observation[key][other_player_id] = amount
+
+        for key in [
+            "min_raise",
+            "bet_amount",
+            "players_left_in_hand",
+            "can_raise",
+            "hand_number",
+            "pot_size",
+            "chips_to_call",
+            "position",
+        ]:
+            observation[key] = state[key]
+
+        observation["status"] = list(PLAYER_STATE_TO_STR.values()).index(state["status"])
+        observation["hole_cards"] = [card_code(c) for c in state["hole_cards"]]
+        return observation, self.reward[player_id]
+
+    def get_observation_dtype(self):
+        return self.observation_dtype
+
+    def _get_state_dict(self, player_sid, player_id):
+        """
+        The state shared by get_state and get_observation, and the player_id it is for
+        """
         # TODO: Smarter
         if player_id == -1:
             player_id = self.game.current_player
@@ -229,9 +406,7 @@ class Poker(GameInterface):
             "hole_cards": hole_cards,
             "position": position,
         }
-
-        # Reward will be from previous round
-        return json.dumps(state), self.reward[player_id]
+        return state, player_id
 
     @staticmethod
     def get_game_name():
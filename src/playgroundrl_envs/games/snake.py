@@ -1,22 +1,37 @@
 from ..game_interface import GameInterface, PlayerInterface, GameParameterInterface
+from collections import deque
 import random
 import json
 import attrs
+import numpy as np
 from ..exceptions import PlaygroundInvalidActionException
 
 NUM_TILES_PER_SIDE = 10
 
+# Random cells drawn for a new apple before falling back to listing the free ones
+APPLE_DRAWS = 8
 
-# Static function
-def is_within_screen(_snake):
-    head_x, head_y = _snake[-1]
-    return 0 <= head_x < NUM_TILES_PER_SIDE and 0 <= head_y < NUM_TILES_PER_SIDE
 
+def observation_dtype(board_size):
+    """
+    Schema of SnakeGame.get_observation. snake holds the (x, y) of each segment, tail first like
+    in get_state, followed by padding up to the longest possible snake (the head can
+    overlap the body on the last move). Only the first snake_length entries are used.
+    """
+    return np.dtype(
+        [
+            ("player_moving_id", np.int8),
+            ("apple", np.int16, (2,)),
+            ("snake_length", np.int32),
+            ("snake", np.int16, (board_size**2 + 1, 2)),
+        ]
+    )
 
-def is_not_overlapping(_snake):
-    head = _snake[-1]
-    tail = _snake[:-1]
-    return head not in tail
+
+# Static function
+def is_within_screen(_snake, board_size=NUM_TILES_PER_SIDE):
+    head_x, head_y = _snake[-1]
+    return 0 <= head_x < board_size and 0 <= head_y < board_size
 
 
 class SnakePlayer(PlayerInterface):
@@ -25,10 +40,18 @@ class SnakePlayer(PlayerInterface):
 
 @attrs.define(frozen=True)
 class SnakeParameters(GameParameterInterface):
-    pass
+    board_size: int = NUM_TILES_PER_SIDE
 
 
 class SnakeGame(GameInterface):
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "snake",
+        "occupied",
+        "orient",
+        "apple",
+        "is_game_over",
+    )
+
     def __init__(
         self,
         game_id,
@@ -46,10 +69,15 @@ class SnakeGame(GameInterface):
         # self.player_uid = players[0].user_id
         # self.model_name = players[0].model_name
 
-        self.snake = [(1, 1)]
+        self.board_size = parameters.board_size
+        self.observation_dtype = observation_dtype(self.board_size)
+
+        # Tail first, with the cells it covers for O(1) collision checks
+        self.snake = deque([(1, 1)])
+        self.occupied = {(1, 1)}
         self.moves = ["N", "S", "E", "W"]
         self.orient = "E"
-        self.apple = (NUM_TILES_PER_SIDE // 4, NUM_TILES_PER_SIDE // 4)
+        self.apple = (self.board_size // 4, self.board_size // 4)
 
         self.reward = 0
 
@@ -79,20 +107,20 @@ class SnakeGame(GameInterface):
         self.orient = action
         self.reward = -0.01  # cost of existence
 
-        if self.snake[-1] == self.apple:
-            self.move_snake(True)
-            self.apple = (
-                random.randint(0, NUM_TILES_PER_SIDE - 1),
-                random.randint(0, NUM_TILES_PER_SIDE - 1),
-            )
+        grow = self.snake[-1] == self.apple
+        if grow:
             self.reward = 1
-        else:
-            self.move_snake()
+        collided = self.move_snake(grow)
 
-        if not is_within_screen(self.snake) or not is_not_overlapping(self.snake):
+        if not is_within_screen(self.snake, self.board_size) or collided:
             score = len(self.snake)  # TODO: do something with the score
             self.reward = -1
             self.is_game_over = True
+        elif grow:
+            self.apple = self.random_free_cell()
+            if self.apple is None:
+                # The snake fills the board
+                self.is_game_over = True
         return True
 
     def get_state(self, player_sid="", player_id=0):
@@ -101,24 +129,64 @@ class SnakeGame(GameInterface):
             "model_name": self.player.model_name,
             "player_moving_id": self.player.player_id,
             "apple": self.apple,
-            "snake": self.snake,
+            "snake": list(self.snake),
         }
         return json.dumps(state), self.reward
 
+    def get_observation(self, player_sid="", player_id=0):
+        observation = np.zeros((), dtype=self.observation_dtype)
+        observation["player_moving_id"] = self.player.player_id
+        observation["apple"] = self.apple
+        observation["snake_length"] = len(self.snake)
+        observation["snake"][: len(self.snake)] = list(self.snake)
+        return observation, self.reward
+
+    def get_observation_dtype(self):
+        return self.observation_dtype
+
     def move_snake(self, grow=False):
-        new_snake = self.snake.copy()
-        last_x, last_y = new_snake[-1]
+        """
+        Moves the head one cell towards orient, and the tail too unless grow
+        :return: Whether the head ran into the body
+        """
+        last_x, last_y = self.snake[-1]
         if self.orient == "E":
-            new_snake.append((last_x + 1, last_y))
+            head = (last_x + 1, last_y)
         elif self.orient == "S":
-            new_snake.append((last_x, last_y + 1))
+            head = (last_x, last_y + 1)
         elif self.orient == "W":
-            new_snake.append((last_x - 1, last_y))
-        elif self.orient == "N":
-            new_snake.append((last_x, last_y - 1))
+            head = (last_x - 1, last_y)
+        else:
+            head = (last_x, last_y - 1)
+
+        # The tail moves out of the way first
         if not grow:
-            new_snake.pop(0)
-        self.snake = new_snake
+            self.occupied.discard(self.snake.popleft())
+        collided = head in self.occupied
+        self.snake.append(head)
+        self.occupied.add(head)
+        return collided
+
+    def random_free_cell(self):
+        """
+        :return: A cell not covered by the snake, drawn uniformly, or None if there are none
+        """
+        # Most of the board is free unless the snake is long, so a few draws usually do
+        for _ in range(APPLE_DRAWS):
+            cell = (
+                random.randint(0, self.board_size - 1),
+                random.randint(0, self.board_size - 1),
+            )
+            if cell not in self.occupied:
+                return cell
+
+        free = [
+            (x, y)
+            for x in range(self.board_size)
+            for y in range(self.board_size)
+            if (x, y) not in self.occupied
+        ]
+        return random.choice(free) if free else None
 
     def get_player_moving(self):
         return self.player
@@ -0,0 +1,123 @@
+"""
+Batched Snake engine, stepping many boards at once with NumPy.
+
+Each board keeps its snake in a ring buffer of (x, y) positions, so a move
+writes the new head and advances the tail index instead of copying the body,
+and an occupancy grid, so self collisions are a single lookup. Every step is
+a handful of array operations over all the boards.
+
+The rules are the ones of SnakeGame: the snake grows on the move after its
+head reached the apple, a move costs -0.01, growing is worth 1, and leaving
+the board or running into the body ends the game with -1. The tail moves out
+of the way before the head moves in, unless the snake is growing. New apples
+only land on free cells, and the game ends once there are none left.
+"""
+
+import numpy as np
+
+from .snake import NUM_TILES_PER_SIDE
+
+# Actions, in the format of SnakeGame.submit_action, and the (x, y) step of each
+MOVES = ["N", "S", "E", "W"]
+DELTAS = np.array([[0, -1], [0, 1], [1, 0], [-1, 0]])
+
+START = (1, 1)
+
+
+class BatchSnake:
+    def __init__(self, num_boards, size=NUM_TILES_PER_SIDE, seed=None):
+        self.num_boards = num_boards
+        self.size = size
+        # The head can overlap the body on the last move, hence the extra slot
+        self.capacity = size * size + 1
+        self.rng = np.random.default_rng(seed)
+
+        self.bodies = np.zeros((num_boards, self.capacity, 2), dtype=np.int16)
+        """ Ring buffer of positions, the head at heads and the tail lengths - 1 before it """
+        self.heads = np.zeros(num_boards, dtype=np.int64)
+        self.lengths = np.zeros(num_boards, dtype=np.int64)
+        self.occupancy = np.zeros((num_boards, size, size), dtype=np.int16)
+        """ Number of body segments on each [x, y] """
+        self.apples = np.zeros((num_boards, 2), dtype=np.int16)
+        self.done = np.zeros(num_boards, dtype=bool)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Starts new games on the boards in mask (a boolean array), or on all of them
+        """
+        boards = np.arange(self.num_boards) if mask is None else np.flatnonzero(mask)
+        self.heads[boards] = 0
+        self.lengths[boards] = 1
+        self.bodies[boards, 0] = START
+        self.occupancy[boards] = 0
+        self.occupancy[boards, START[0], START[1]] = 1
+        self.apples[boards] = (self.size // 4, self.size // 4)
+        self.done[boards] = False
+
+    def head_positions(self):
+        return self.bodies[np.arange(self.num_boards), self.heads]
+
+    def step(self, actions):
+        """
+        Moves every snake whose game isn't over
+        :param actions: (num_boards,) indices into MOVES
+        :return: rewards, and whether each game is over. Boards that were already over get 0.
+        """
+        actions = np.asarray(actions)
+        rewards = np.zeros(self.num_boards)
+        boards = np.flatnonzero(~self.done)
+
+        heads = self.bodies[boards, self.heads[boards]]
+        grow = (heads == self.apples[boards]).all(axis=1)
+        new_heads = heads + DELTAS[actions[boards]]
+        inside = ((new_heads >= 0) & (new_heads < self.size)).all(axis=1)
+
+        # The tail moves on, unless the snake is growing
+        moving = boards[~grow]
+        tails = self.bodies[moving, (self.heads[moving] - self.lengths[moving] + 1) % self.capacity]
+        self.occupancy[moving, tails[:, 0], tails[:, 1]] -= 1
+        self.lengths[boards[grow]] += 1
+
+        # The head moves in. Off the board it is still added to the body, like in SnakeGame
+        collided = np.zeros(len(boards), dtype=bool)
+        placed = boards[inside]
+        xs, ys = new_heads[inside, 0], new_heads[inside, 1]
+        collided[inside] = self.occupancy[placed, xs, ys] > 0
+        self.occupancy[placed, xs, ys] += 1
+        self.heads[boards] = (self.heads[boards] + 1) % self.capacity
+        self.bodies[boards, self.heads[boards]] = new_heads
+
+        lost = ~inside | collided
+        board_rewards = np.full(len(boards), -0.01)
+        board_rewards[grow] = 1
+        board_rewards[lost] = -1
+        rewards[boards] = board_rewards
+        self.done[boards[lost]] = True
+
+        # New apples on a uniformly drawn free cell, the highest random score among them
+        grown = boards[grow & ~lost]
+        free = self.occupancy[grown].reshape(len(grown), self.size * self.size) == 0
+        scores = np.where(free, self.rng.random(free.shape), -1)
+        self.apples[grown] = np.stack(np.divmod(scores.argmax(axis=1), self.size), axis=1)
+        # The snake fills the board
+        self.done[grown[~free.any(axis=1)]] = True
+        return rewards, self.done.copy()
+
+    def snakes(self):
+        """
+        :return: (num_boards, capacity, 2) positions of each snake, tail first like
+        SnakeGame.snake, padded with zeros after the first lengths[i] entries
+        """
+        offsets = np.arange(self.capacity)
+        indices = (self.heads - self.lengths + 1)[:, None] + offsets
+        snakes = self.bodies[np.arange(self.num_boards)[:, None], indices % self.capacity]
+        snakes[offsets >= self.lengths[:, None]] = 0
+        return snakes
+
+    def snake(self, board):
+        """
+        :return: The snake on board as a list of (x, y), tail first, like SnakeGame.snake
+        """
+        return [tuple(position) for position in self.snakes()[board, : self.lengths[board]].tolist()]
@@ -1,37 +1,24 @@
 from ..game_interface import GameInterface, PlayerInterface, GameParameterInterface
 import json
 import attrs
+import numpy as np
+from . import tic_tac_toe_engine
+from ..exceptions import PlaygroundInvalidActionException
 
 EMPTY_SQUARE = -1
 
+# Schema of get_observation, same fields as get_state
+OBSERVATION_DTYPE = np.dtype(
+    [
+        ("player_moving_id", np.int8),
+        ("board", np.int8, (3, 3)),
+    ]
+)
+
 
 def check_winning_board(board):
-    for i in range(3):
-        if (
-            board[i][0] == board[i][1]
-            and board[i][1] == board[i][2]
-            and board[i][0] != EMPTY_SQUARE
-        ):
-            return True
-        if (
-            board[0][i] == board[1][i]
-            and board[1][i] == board[2][i]
-            and board[0][i] != EMPTY_SQUARE
-        ):
-            return True
-    if (
-        board[0][0] == board[1][1]
-        and board[1][1] == board[2][2]
-        and board[0][0] != EMPTY_SQUARE
-    ):
-        return True
-    if (
-        board[0][2] == board[1][1]
-        and board[1][1] == board[2][0]
-        and board[0][2] != EMPTY_SQUARE
-    ):
-        return True
-    return False
+    mask0, mask1 = tic_tac_toe_engine.from_board(board, EMPTY_SQUARE)
+    return tic_tac_toe_engine.has_won(mask0) or tic_tac_toe_engine.has_won(mask1)
 
 
 board_squares = [(a, b) for a in range(3) for b in range(3)]
@@ -47,6 +34,15 @@ class TicTacToeParameters(GameParameterInterface):
 
 
 class TicTacToeGame(GameInterface):
+    snapshot_attributes = GameInterface.snapshot_attributes + (
+        "board",
+        "masks",
+        "player_moving",
+        "player_waiting",
+        "winning_player",
+        "is_game_over",
+    )
+
     def __init__(
         self,
         game_id,
@@ -60,6 +56,8 @@ class TicTacToeGame(GameInterface):
 
         # -1 empty, 0 for player 1, 1 for player 2
         self.board = [[EMPTY_SQUARE for i in range(3)] for j in range(3)]
+        # Bitboards of each player's squares, see tic_tac_toe_engine
+        self.masks = [0, 0]
 
         self.reward = {player.player_id: 0 for player in players}
         self.player_moving, self.player_waiting = players[0], players[1]
@@ -71,7 +69,10 @@ class TicTacToeGame(GameInterface):
             return False
 
         # action should be a string "0" to "8" for the possible squares
-        x, y = board_squares[int(action)]
+        square = int(action)
+        if not 0 <= square < len(board_squares):
+            raise PlaygroundInvalidActionException("Square must be between 0 and 8")
+        x, y = board_squares[square]
         if self.board[x][y] != EMPTY_SQUARE:
             return False
 
@@ -80,8 +81,9 @@ class TicTacToeGame(GameInterface):
 
         # Player IDs are zero indexed, but on the board it's 1-indexed
         self.board[x][y] = player_id
+        self.masks[player_id] |= 1 << (3 * x + y)
 
-        if check_winning_board(self.board):
+        if tic_tac_toe_engine.has_won(self.masks[player_id]):
             self.reward[player_id] = 1
             self.reward[self.player_waiting.player_id] = -1
             self.is_game_over = True
@@ -114,6 +116,25 @@ class TicTacToeGame(GameInterface):
             self.reward[player_id],
         )
 
+    def get_move_values(self):
+        """
+        :return: action -> value (1 win, 0 draw, -1 loss) of each legal move for the player
+        moving, with perfect play after it. Useful to grade bots.
+        """
+        return tic_tac_toe_engine.move_values(*self.masks)
+
+    def get_observation(self, player_sid="", player_id=-1):
+        if player_id == -1:
+            player_id = self.player_moving.player_id
+
+        observation = np.zeros((), dtype=OBSERVATION_DTYPE)
+        observation["player_moving_id"] = self.player_moving.player_id
+        observation["board"] = self.board
+        return observation, self.reward[player_id]
+
+    def get_observation_dtype(self):
+        return OBSERVATION_DTYPE
+
     @staticmethod
     def get_game_name():
         return "tic_tac_toe"
@@ -0,0 +1,147 @@
+"""
+Bitboards and a solved game table for tic-tac-toe.
+
+A position is two 9 bit masks, the squares of player 0 and of player 1, with
+square i (action "i", row i // 3, column i % 3) at bit i. A line is won when
+a mask covers one of the 8 WIN_MASKS, looked up in a table of all 512 masks.
+
+solve walks every position reachable from the empty board (5478 of them)
+once and records its minimax value, so the value of a position and of each
+move are dictionary lookups. That gives a perfect-play opponent
+(perfect_play_policy) and a way to grade moves (move_values).
+
+Player 0 always moves first, so the player to move follows from the number
+of stones on the board.
+"""
+
+import json
+import random
+from functools import lru_cache
+from typing import Dict, List
+
+FULL_BOARD = 0b111111111
+
+WIN_MASKS = (
+    # Rows
+    0b000000111,
+    0b000111000,
+    0b111000000,
+    # Columns
+    0b001001001,
+    0b010010010,
+    0b100100100,
+    # Diagonals
+    0b100010001,
+    0b001010100,
+)
+
+# WINNING[mask] is whether the squares in mask complete a line
+WINNING = bytes(any(mask & line == line for line in WIN_MASKS) for mask in range(FULL_BOARD + 1))
+
+# Values, for the player to move
+WIN, DRAW, LOSS = 1, 0, -1
+
+
+def from_board(board, empty_square=-1):
+    """
+    :param board: 3x3 nested list of player ids, like TicTacToeGame.board
+    :return: The masks of player 0 and player 1
+    """
+    masks = [0, 0]
+    for i in range(9):
+        player_id = board[i // 3][i % 3]
+        if player_id != empty_square:
+            masks[player_id] |= 1 << i
+    return masks[0], masks[1]
+
+
+def has_won(mask):
+    return WINNING[mask] == 1
+
+
+def key(mask0, mask1):
+    return mask0 | mask1 << 9
+
+
+def player_to_move(mask0, mask1):
+    return bin(mask0 | mask1).count("1") % 2
+
+
+def is_over(mask0, mask1):
+    return has_won(mask0) or has_won(mask1) or (mask0 | mask1) == FULL_BOARD
+
+
+def legal_moves(mask0, mask1) -> List[int]:
+    if is_over(mask0, mask1):
+        return []
+    occupied = mask0 | mask1
+    return [i for i in range(9) if not occupied >> i & 1]
+
+
+def play(mask0, mask1, action):
+    """
+    :return: The masks after the player to move takes square action
+    """
+    if player_to_move(mask0, mask1) == 0:
+        return mask0 | 1 << action, mask1
+    return mask0, mask1 | 1 << action
+
+
+@lru_cache(maxsize=None)
+def solve() -> Dict[int, int]:
+    """
+    :return: key(mask0, mask1) -> value for the player to move with perfect play on both
+    sides, for every position reachable from the empty board
+    """
+    values = {}
+
+    def visit(mask0, mask1):
+        position = key(mask0, mask1)
+        if position in values:
+            return values[position]
+
+        if has_won(mask0) or has_won(mask1):
+            # Only the player who just moved can have a line
+            value = LOSS
+        elif (mask0 | mask1) == FULL_BOARD:
+            value = DRAW
+        else:
+            value = max(-visit(*play(mask0, mask1, action)) for action in legal_moves(mask0, mask1))
+        values[position] = value
+        return value
+
+    visit(0, 0)
+    return values
+
+
+def position_value(mask0, mask1):
+    """
+    :return: WIN, DRAW or LOSS for the player to move, with perfect play on both sides
+    """
+    return solve()[key(mask0, mask1)]
+
+
+def move_values(mask0, mask1) -> Dict[int, int]:
+    """
+    :return: action -> value of playing it, for the player to move. A move is a
+    mistake if its value is below position_value.
+    """
+    return {
+        action: -position_value(*play(mask0, mask1, action))
+        for action in legal_moves(mask0, mask1)
+    }
+
+
+def best_moves(mask0, mask1) -> List[int]:
+    values = move_values(mask0, mask1)
+    best = max(values.values(), default=None)
+    return [action for action, value in values.items() if value == best]
+
+
+def perfect_play_policy(state, player_id, rng: random.Random):
+    """
+    Self play policy (see self_play.Policy) that picks one of the best moves at random
+    :param state: TicTacToeGame.get_state output
+    """
+    mask0, mask1 = from_board(json.loads(state)["board"])
+    return str(rng.choice(best_moves(mask0, mask1)))
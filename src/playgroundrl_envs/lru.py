@@ -0,0 +1,66 @@
+"""
+Bounded least recently used cache, with hit, miss and eviction counters.
+
+Shared by the game engines that memoize results by position hash, e.g. the
+Go TranspositionTable and the chess tablebase prober. The counters help choose
+a max_size for a given workload.
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, max_size=100_000):
+        assert max_size > 0, "max_size must be positive"
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored for key (marking it as recently used), or default
+        """
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores value for key, evicting the least recently used entry if the table is full
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
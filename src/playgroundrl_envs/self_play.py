@@ -0,0 +1,162 @@
+"""
+Parallel self-play for any GameInterface implementation (e.g. GoGame, ChessGame, TicTacToeGame).
+
+Games are independent, so they are sharded across a process pool. Each game
+plays every seat with the same policy and is sent back to the parent as a
+Trajectory as soon as it finishes. Each game is seeded from the base seed and
+its index, so results don't depend on which worker played it.
+
+Example:
+
+    def random_tic_tac_toe(state, player_id, rng):
+        board = json.loads(state)["board"]
+        return str(rng.choice([i for i in range(9) if board[i // 3][i % 3] == -1]))
+
+    for trajectory in self_play(
+        TicTacToeGame, TicTacToePlayer, TicTacToeParameters(), random_tic_tac_toe, num_games=1000
+    ):
+        ...
+
+The policy, game, player and parameter classes are sent to the workers, so they
+must be picklable (defined at module level).
+"""
+
+import multiprocessing
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+
+import attrs
+import numpy as np
+
+from .game_interface import GameInterface, GameParameterInterface, PlayerInterface
+from .sid_util import SidSessionInfo
+
+# Model-only pool, see GameInterface.get_game_type
+SELF_PLAY_GAME_TYPE = 1
+
+Policy = Callable[[Any, int, random.Random], Any]
+"""
+Called as policy(state, player_id, rng) with the state returned by get_state for the
+moving player, and returns the action to pass to advance_game_state.
+"""
+
+
+@attrs.define
+class Trajectory:
+    game_index: int
+    seed: int
+
+    player_ids: List[int] = attrs.Factory(list)
+    """ The player moving at each step """
+
+    states: List[Any] = attrs.Factory(list)
+    """ get_state output seen by the moving player at each step """
+
+    actions: List[Any] = attrs.Factory(list)
+    rewards: List[float] = attrs.Factory(list)
+    """ get_state reward of the moving player at each step, before acting """
+
+    final_rewards: Dict[int, float] = attrs.Factory(dict)
+    outcomes: Dict[int, Optional[float]] = attrs.Factory(dict)
+    finished: bool = False
+    """ False if the game was cut off by max_moves """
+
+    def __len__(self):
+        return len(self.actions)
+
+
+@attrs.define(frozen=True)
+class _SelfPlayTask:
+    game_class: Type[GameInterface]
+    player_class: Type[PlayerInterface]
+    parameters: GameParameterInterface
+    policy: Policy
+    game_index: int
+    seed: int
+    max_moves: int
+
+
+def create_game(
+    game_class: Type[GameInterface],
+    player_class: Type[PlayerInterface],
+    parameters: GameParameterInterface,
+    game_id: str,
+) -> GameInterface:
+    """
+    Creates a model-only game, with placeholder sessions for its players
+    """
+    players = [
+        player_class(SidSessionInfo(f"self-play-{i}", i, False), i)
+        for i in range(game_class.get_num_players())
+    ]
+    return game_class(
+        game_id=game_id,
+        players=players,
+        game_type=SELF_PLAY_GAME_TYPE,
+        parameters=parameters,
+        self_training=True,
+    )
+
+
+def play_game(task: _SelfPlayTask) -> Trajectory:
+    """
+    Plays one game to the end. Runs inside the worker processes.
+    """
+    random.seed(task.seed)
+    np.random.seed(task.seed % 2**32)
+    rng = random.Random(task.seed)
+
+    game = create_game(
+        task.game_class, task.player_class, task.parameters, f"self-play-{task.game_index}"
+    )
+    players = list(game.get_players().values())
+
+    trajectory = Trajectory(game_index=task.game_index, seed=task.seed)
+    while not game.get_is_game_over() and len(trajectory) < task.max_moves:
+        player = game.get_player_moving()
+        state, reward = game.get_state(player.sid, player.player_id)
+        action = task.policy(state, player.player_id, rng)
+
+        trajectory.player_ids.append(player.player_id)
+        trajectory.states.append(state)
+        trajectory.rewards.append(reward)
+        trajectory.actions.append(action)
+
+        game.advance_game_state(action, player.sid)
+
+    trajectory.finished = game.get_is_game_over()
+    for player in players:
+        trajectory.final_rewards[player.player_id] = game.get_state(player.sid, player.player_id)[1]
+        trajectory.outcomes[player.player_id] = game.get_outcome(player.player_id)
+    return trajectory
+
+
+def self_play(
+    game_class: Type[GameInterface],
+    player_class: Type[PlayerInterface],
+    parameters: GameParameterInterface,
+    policy: Policy,
+    num_games: int,
+    num_workers: Optional[int] = None,
+    seed: int = 0,
+    max_moves: int = 10_000,
+) -> Iterator[Trajectory]:
+    """
+    Plays num_games games of game_class with policy in every seat, yielding each
+    Trajectory as soon as it is done (so not necessarily in game_index order).
+
+    :param num_workers: Size of the process pool, defaults to the number of CPUs.
+    0 plays every game in this process, which is handy for debugging.
+    :param seed: Game i is seeded with seed + i
+    """
+    tasks = (
+        _SelfPlayTask(game_class, player_class, parameters, policy, i, seed + i, max_moves)
+        for i in range(num_games)
+    )
+
+    if num_workers == 0:
+        yield from map(play_game, tasks)
+        return
+
+    with multiprocessing.Pool(num_workers) as pool:
+        yield from pool.imap_unordered(play_game, tasks)
@@ -0,0 +1,141 @@
+"""
+A hashed timer wheel, shared by all games for their move timeouts.
+
+Timers are put in one of num_slots buckets by the tick they expire on, so
+scheduling, resetting and cancelling a timer are O(1) dict operations. A single
+green thread wakes up every tick, collects the timers of the ticks that have
+passed, and calls their callbacks in one batch, ordered by deadline. Timers
+further away than one rotation of the wheel stay in their bucket until the
+rotation they expire on.
+
+Callbacks never fire early, but may fire up to one tick late.
+"""
+
+import math
+import time
+import traceback
+
+import attrs
+
+# If we change from eventlet, we need to change this
+import eventlet
+
+
+@attrs.define(eq=False)  # Hashed by identity, so it can be a key in its slot
+class WheelTimer:
+    deadline: float
+    """ Time, in seconds since epoch, when the callback is due """
+
+    callback: object
+    args: tuple
+
+    expiry_tick: int = 0
+    slot: dict = None
+    """ The slot the timer is in, None once it has fired or been cancelled """
+
+    @property
+    def pending(self):
+        return self.slot is not None
+
+
+class TimerWheel:
+    def __init__(self, tick=1.0, num_slots=1024, clock=time.time, autostart=True):
+        """
+        :param tick: Resolution of the wheel, in seconds
+        :param clock: Returns the current time, in seconds
+        :param autostart: Spawn the green thread that calls advance every tick
+        whenever timers are pending. Without it, advance has to be called by hand.
+        """
+        self.tick = tick
+        self.slots = [{} for _ in range(num_slots)]
+        self.clock = clock
+        self.autostart = autostart
+
+        self.current_tick = self._tick_of(clock())
+        self.num_pending = 0
+        self.driver = None
+
+    def __len__(self):
+        return self.num_pending
+
+    def _tick_of(self, timestamp):
+        return math.floor(timestamp / self.tick)
+
+    def schedule(self, delay, callback, args=()) -> WheelTimer:
+        """
+        Calls callback(*args) once delay seconds have passed
+        """
+        timer = WheelTimer(self.clock() + delay, callback, tuple(args))
+        self._insert(timer)
+        return timer
+
+    def reset(self, timer: WheelTimer, delay):
+        """
+        Moves timer to delay seconds from now, whether it is pending or not
+        """
+        self.cancel(timer)
+        timer.deadline = self.clock() + delay
+        self._insert(timer)
+
+    def cancel(self, timer: WheelTimer):
+        if timer.slot is None:
+            return
+        del timer.slot[timer]
+        timer.slot = None
+        self.num_pending -= 1
+
+    def _insert(self, timer: WheelTimer):
+        if self.num_pending == 0:
+            # Nothing was pending, so the wheel may not have been advanced in a while
+            self.current_tick = max(self.current_tick, self._tick_of(self.clock()))
+
+        # Rounded up so it never fires early
+        timer.expiry_tick = max(math.ceil(timer.deadline / self.tick), self.current_tick + 1)
+        timer.slot = self.slots[timer.expiry_tick % len(self.slots)]
+        timer.slot[timer] = None
+        self.num_pending += 1
+
+        if self.autostart and self.driver is None:
+            self.driver = eventlet.spawn(self._run)
+
+    def advance(self, now=None):
+        """
+        Fires every pending timer whose deadline has passed
+        :return: The number of timers fired
+        """
+        now_tick = self._tick_of(self.clock() if now is None else now)
+        if now_tick <= self.current_tick:
+            return 0
+
+        # Past a full rotation, every slot has to be looked at once
+        num_ticks = min(now_tick - self.current_tick, len(self.slots))
+        expired = []
+        for tick in range(now_tick - num_ticks + 1, now_tick + 1):
+            slot = self.slots[tick % len(self.slots)]
+            due = [timer for timer in slot if timer.expiry_tick <= now_tick]
+            for timer in due:
+                del slot[timer]
+                timer.slot = None
+            expired.extend(due)
+
+        self.current_tick = now_tick
+        self.num_pending -= len(expired)
+
+        # Callbacks can schedule and cancel timers, the wheel is consistent by now
+        expired.sort(key=lambda timer: timer.deadline)
+        for timer in expired:
+            try:
+                timer.callback(*timer.args)
+            except Exception:
+                traceback.print_exc()
+        return len(expired)
+
+    def _run(self):
+        while self.num_pending > 0:
+            eventlet.sleep(self.tick)
+            self.advance()
+        self.driver = None
+
+
+# Shared by every game, see GameInterface.reset_timeout
+timer_wheel = TimerWheel()
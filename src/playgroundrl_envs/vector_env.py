@@ -0,0 +1,230 @@
+"""
+Steps a batch of games of the same kind in lockstep, for training.
+
+A VectorEnv owns num_envs games and exchanges stacked arrays with the
+trainer instead of one JSON string per game. Observations are the structured
+arrays from GameInterface.get_observation, stacked into an array of shape
+(num_envs,), always for the player moving next (see its player_moving_id
+field). Finished games are replaced by new ones right away.
+
+Example:
+
+    env = VectorEnv(GoGame, GoPlayer, GoParameters(board_size=9), num_envs=256)
+    observations = env.reset()
+    while training:
+        actions = policy(observations)
+        observations, rewards, dones, infos = env.step(actions)
+
+Go games are stepped all at once with gogame.batch_next_states on one
+(num_envs, NUM_CHNLS, SIZE, SIZE) tensor, instead of one GoGame per env, and
+Snake games with the BatchSnake engine.
+"""
+
+from typing import Any, Dict, List, Sequence, Type
+
+import numpy as np
+
+from .exceptions import PlaygroundInvalidActionException
+from .game_interface import GameInterface, GameParameterInterface, PlayerInterface
+from .games.go.engine import gogame, govars
+from .games.go.go import GoGame
+from .games.snake import SnakeGame
+from .games.snake_engine import MOVES, BatchSnake
+from .self_play import create_game
+
+
+class VectorEnv:
+    def __init__(
+        self,
+        game_class: Type[GameInterface],
+        player_class: Type[PlayerInterface],
+        parameters: GameParameterInterface,
+        num_envs: int,
+        fast_path: bool = True,
+    ):
+        """
+        :param fast_path: Use the batched engine for games that have one (GoGame
+        without superko or adjudication, SnakeGame). False always steps the game objects one by one.
+        """
+        self.game_class = game_class
+        self.player_class = player_class
+        self.parameters = parameters
+        self.num_envs = num_envs
+        self.num_games_created = 0
+
+        self.batched_go = (
+            fast_path
+            and issubclass(game_class, GoGame)
+            and not parameters.superko
+            and parameters.adjudicate_margin is None
+        )
+
+        self.batched_snake = fast_path and issubclass(game_class, SnakeGame)
+
+        # The games, or for batched Go their [NUM_CHNLS, SIZE, SIZE] states
+        self.games: List[GameInterface] = []
+        self.states: np.ndarray = None
+        self.snakes: BatchSnake = None
+
+        example = self._create_game()
+        self.observation_dtype = example.get_observation_dtype()
+
+    def _create_game(self) -> GameInterface:
+        game = create_game(
+            self.game_class,
+            self.player_class,
+            self.parameters,
+            f"vector-env-{self.num_games_created}",
+        )
+        self.num_games_created += 1
+        return game
+
+    def reset(self) -> np.ndarray:
+        """
+        Starts num_envs new games
+        :return: Their observations
+        """
+        if self.batched_go:
+            self.states = gogame.batch_init_state(self.num_envs, self.parameters.board_size)
+            return self._go_observations(self.states)
+        if self.batched_snake:
+            self.snakes = BatchSnake(self.num_envs, self.parameters.board_size)
+            return self._snake_observations()
+
+        self.games = [self._create_game() for _ in range(self.num_envs)]
+        return self._stack([self._observe(game) for game in self.games])
+
+    def step(self, actions: Sequence[Any]):
+        """
+        Submits actions[i] for the player moving in game i
+        :return: observations, rewards, dones, infos.
+        rewards[i] is the reward of the player who just moved in game i, as get_observation
+        reports it. Where dones[i] is set, the game ended, observations[i] is the first
+        observation of the game that replaced it, and infos[i] has the "final_observation"
+        and the "outcomes" (player_id -> get_outcome) of the game that ended. Other infos are empty.
+        """
+        if len(actions) != self.num_envs:
+            raise PlaygroundInvalidActionException(
+                f"Expected {self.num_envs} actions, got {len(actions)}."
+            )
+        if self.batched_go:
+            return self._step_go(np.asarray(actions, dtype=int))
+        if self.batched_snake:
+            return self._step_snake(actions)
+
+        observations = np.zeros(self.num_envs, dtype=self.observation_dtype)
+        rewards = np.zeros(self.num_envs)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+
+        # Invalid actions raise, leaving the games before them stepped
+        for i, action in enumerate(actions):
+            game = self.games[i]
+            player = game.get_player_moving()
+            game.advance_game_state(action, player.sid)
+            _, rewards[i] = game.get_observation(player.sid, player.player_id)
+
+            if game.get_is_game_over():
+                dones[i] = True
+                infos[i]["final_observation"] = self._observe(game)
+                infos[i]["outcomes"] = {
+                    player_id: game.get_outcome(player_id) for player_id in game.get_players()
+                }
+                game = self.games[i] = self._create_game()
+            observations[i] = self._observe(game)
+
+        return observations, rewards, dones, infos
+
+    def _observe(self, game: GameInterface) -> np.ndarray:
+        player = game.get_player_moving()
+        return game.get_observation(player.sid, player.player_id)[0]
+
+    def _stack(self, observations) -> np.ndarray:
+        stacked = np.zeros(len(observations), dtype=self.observation_dtype)
+        for i, observation in enumerate(observations):
+            stacked[i] = observation
+        return stacked
+
+    def _step_go(self, actions: np.ndarray):
+        states = self.states
+        size = states.shape[-1]
+        pass_idx = size * size
+        if ((actions < 0) | (actions > pass_idx)).any():
+            raise PlaygroundInvalidActionException("You cannot place a piece there.")
+
+        # Validated up front, so no game is stepped if any action is invalid
+        (non_pass,) = np.nonzero(actions != pass_idx)
+        rows, cols = np.divmod(actions[non_pass], size)
+        if states[non_pass, govars.INVD_CHNL, rows, cols].any():
+            raise PlaygroundInvalidActionException("You cannot place a piece there.")
+
+        movers = gogame.batch_turn(states)
+        states = gogame.batch_next_states(states, actions)
+
+        # Same rewards as GoGame, each player's area
+        black_areas, white_areas = gogame.batch_areas(states)
+        rewards = np.where(movers == govars.BLACK, black_areas, white_areas)
+        dones = gogame.batch_game_ended(states) == 1
+
+        observations = self._go_observations(states)
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(dones):
+            infos[i]["final_observation"] = observations[i].copy()
+            infos[i]["outcomes"] = _go_outcomes(black_areas[i], white_areas[i])
+
+        # Black (player 0) always moves first in GoGame
+        states[dones] = 0
+        observations[dones] = self._go_observations(states[dones])
+
+        self.states = states
+        return observations, rewards, dones, infos
+
+    def _go_observations(self, states: np.ndarray) -> np.ndarray:
+        """
+        The GoGame observations of a batch of states, see go.observation_dtype
+        """
+        observations = np.zeros(len(states), dtype=self.observation_dtype)
+        observations["player_moving_id"] = states[:, govars.TURN_CHNL, 0, 0]
+        observations["board"] = states[:, govars.BLACK] - 1 + 2 * states[:, govars.WHITE]
+        observations["invalid_moves"] = states[:, govars.INVD_CHNL] > 0
+        observations["last_move_was_pass"] = states[:, govars.PASS_CHNL, 0, 0] > 0
+        return observations
+
+    def _step_snake(self, actions: Sequence[str]):
+        if any(action not in MOVES for action in actions):
+            raise PlaygroundInvalidActionException(r'Move must be one of "N", "E", "S", or "W"')
+
+        snakes = self.snakes
+        rewards, dones = snakes.step([MOVES.index(action) for action in actions])
+
+        observations = self._snake_observations()
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(dones):
+            infos[i]["final_observation"] = observations[i].copy()
+            infos[i]["outcomes"] = {0: int(snakes.lengths[i])}
+
+        if dones.any():
+            snakes.reset(dones)
+            observations[dones] = self._snake_observations()[dones]
+        return observations, rewards, dones, infos
+
+    def _snake_observations(self) -> np.ndarray:
+        """
+        The SnakeGame observations of every board, see snake.observation_dtype
+        """
+        observations = np.zeros(self.num_envs, dtype=self.observation_dtype)
+        observations["apple"] = self.snakes.apples
+        observations["snake_length"] = self.snakes.lengths
+        observations["snake"] = self.snakes.snakes()
+        return observations
+
+
+def _go_outcomes(black_area, white_area):
+    """
+    GoGame.get_outcome for both players
+    """
+    if black_area > white_area:
+        return {0: 1, 1: 0}
+    if white_area > black_area:
+        return {0: 0, 1: 1}
+    return {0: 0.5, 1: 0.5}
@@ -0,0 +1,69 @@
+import unittest
+import json
+import random
+
+import chess as pychess
+
+from playgroundrl_envs.exceptions import PlaygroundInvalidActionException
+from playgroundrl_envs.games.chess import ChessGame, ChessParameters, ChessPlayer
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game():
+    players = [ChessPlayer(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+    return ChessGame(game_id=0, players=players, game_type=0, parameters=ChessParameters())
+
+
+def play(game, uci):
+    player = game.get_player_moving()
+    game.advance_game_state(json.dumps({"uci": uci}), player.sid)
+
+
+class TestChessOutcome(unittest.TestCase):
+    def test_random_games_match_board_outcome(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            game = create_game()
+            while not game.get_is_game_over():
+                play(game, rng.choice(list(game.board.legal_moves)).uci())
+                self.assertEqual(game.outcome, game.board.outcome())
+            self.assertIsNotNone(game.get_outcome(0))
+
+    def test_checkmate(self):
+        game = create_game()
+        for uci in ["f2f3", "e7e5", "g2g4", "d8h4"]:
+            play(game, uci)
+        self.assertEqual(game.outcome.termination, pychess.Termination.CHECKMATE)
+        self.assertEqual(game.get_outcome(0), 0)
+        self.assertEqual(game.get_outcome(1), 1)
+
+    def test_fivefold_repetition(self):
+        game = create_game()
+        for _ in range(4):
+            for uci in ["g1f3", "g8f6", "f3g1", "f6g8"]:
+                self.assertIsNone(game.outcome)
+                play(game, uci)
+        self.assertEqual(game.outcome.termination, pychess.Termination.FIVEFOLD_REPETITION)
+        self.assertEqual(game.get_outcome(0), 0.5)
+
+    def test_insufficient_material_after_promotion(self):
+        game = create_game()
+        game.board.set_fen("8/4P3/8/8/8/2k5/8/K7 w - - 0 1")
+        play(game, "e7e8n")
+        self.assertEqual(game.outcome, game.board.outcome())
+        self.assertEqual(game.outcome.termination, pychess.Termination.INSUFFICIENT_MATERIAL)
+
+    def test_illegal_moves(self):
+        game = create_game()
+        for uci in ["e2e4", "e7e5", "d2d3", "f8b4"]:
+            play(game, uci)
+        # Pseudo-legal, but leaves the king in check
+        with self.assertRaises(PlaygroundInvalidActionException):
+            play(game, "g1f3")
+        with self.assertRaises(PlaygroundInvalidActionException):
+            play(game, "c2c3a")
+        play(game, "c2c3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import json
+import random
+
+import chess as pychess
+import numpy as np
+
+from playgroundrl_envs.games import chess
+from playgroundrl_envs.games.chess import ChessGame, ChessParameters, ChessPlayer
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game():
+    players = [ChessPlayer(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+    return ChessGame(
+        game_id=0,
+        players=players,
+        game_type=0,
+        parameters=ChessParameters(tensor_observation=True),
+    )
+
+
+def play(game, move):
+    player = game.get_player_moving()
+    game.advance_game_state(json.dumps({"uci": move.uci()}), player.sid)
+
+
+class TestChessTensorObservation(unittest.TestCase):
+    def assert_matches_board(self, observation, board):
+        planes = observation["planes"]
+        for square in pychess.SQUARES:
+            piece = board.piece_at(square)
+            rank, file = pychess.square_rank(square), pychess.square_file(square)
+            expected = np.zeros(chess.NUM_PIECE_PLANES, dtype=bool)
+            if piece is not None:
+                expected[(0 if piece.color else 6) + piece.piece_type - 1] = True
+            np.testing.assert_array_equal(planes[: chess.NUM_PIECE_PLANES, rank, file], expected)
+
+        self.assertEqual(planes[chess.TURN_PLANE].all(), board.turn)
+        self.assertEqual(planes[chess.TURN_PLANE].any(), board.turn)
+        self.assertEqual(
+            planes[chess.CASTLING_PLANES, 0, 0].tolist(),
+            [
+                board.has_kingside_castling_rights(pychess.WHITE),
+                board.has_queenside_castling_rights(pychess.WHITE),
+                board.has_kingside_castling_rights(pychess.BLACK),
+                board.has_queenside_castling_rights(pychess.BLACK),
+            ],
+        )
+
+        legal = {chess.move_index(move) for move in board.legal_moves}
+        self.assertEqual(set(np.flatnonzero(observation["legal_moves"])), legal)
+
+    def test_random_games(self):
+        rng = random.Random(0)
+        for _ in range(3):
+            game = create_game()
+            self.assertEqual(game.get_observation_dtype(), chess.TENSOR_OBSERVATION_DTYPE)
+            while not game.get_is_game_over():
+                observation, _ = game.get_observation()
+                self.assert_matches_board(observation, game.board)
+                for move in game.board.legal_moves:
+                    self.assertEqual(chess.index_move(chess.move_index(move), game.board), move)
+                play(game, rng.choice(list(game.board.legal_moves)))
+            self.assertFalse(game.get_observation()[0]["legal_moves"].any())
+
+    def test_promotions_and_en_passant(self):
+        game = create_game()
+        # White can take en passant on d6, and promote on b8 or by taking on c8
+        game.board.set_fen("2r1k3/1P6/8/3pP3/8/8/8/4K3 w - d6 0 2")
+        observation, _ = game.get_observation()
+        self.assert_matches_board(observation, game.board)
+        self.assertEqual(np.flatnonzero(observation["planes"][chess.EP_PLANE]).tolist(), [pychess.D6])
+
+        promotions = [move for move in game.board.legal_moves if move.promotion]
+        self.assertEqual(len(promotions), 8)
+        indices = {chess.move_index(move) for move in promotions}
+        self.assertEqual(len(indices), 8)
+        for move in promotions:
+            self.assertEqual(chess.index_move(chess.move_index(move), game.board), move)
+
+    def test_mask_computed_once_per_ply(self):
+        game = create_game()
+        mask = game.get_observation(player_id=0)[0]["legal_moves"]
+        cached = game.legal_move_mask
+        game.get_observation(player_id=1)
+        self.assertIs(game.legal_move_mask, cached)
+        self.assertEqual(mask.sum(), 20)
+
+        play(game, pychess.Move.from_uci("e2e4"))
+        self.assertIsNone(game.legal_move_mask)
+        self.assertEqual(game.get_observation()[0]["legal_moves"].sum(), 20)
+
+    def test_default_observation(self):
+        players = [ChessPlayer(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+        game = ChessGame(game_id=0, players=players, game_type=0, parameters=ChessParameters())
+        self.assertEqual(game.get_observation()[0].dtype, chess.OBSERVATION_DTYPE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import json
+import os
+import random
+import struct
+import tempfile
+
+import chess as pychess
+import chess.polyglot
+
+from playgroundrl_envs.games.chess import ChessGame, ChessParameters, ChessPlayer
+from playgroundrl_envs.games.chess_probe import ChessProber
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game(parameters):
+    players = [ChessPlayer(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+    return ChessGame(game_id=0, players=players, game_type=0, parameters=parameters)
+
+
+def play(game, uci):
+    player = game.get_player_moving()
+    game.advance_game_state(json.dumps({"uci": uci}), player.sid)
+
+
+def write_book(path, entries):
+    """
+    Writes a Polyglot book of (board, uci, weight) entries
+    """
+    records = []
+    for board, uci, weight in entries:
+        move = pychess.Move.from_uci(uci)
+        raw_move = (
+            pychess.square_file(move.to_square)
+            | pychess.square_rank(move.to_square) << 3
+            | pychess.square_file(move.from_square) << 6
+            | pychess.square_rank(move.from_square) << 9
+        )
+        records.append((chess.polyglot.zobrist_hash(board), raw_move, weight))
+    with open(path, "wb") as f:
+        for record in sorted(records):
+            f.write(struct.pack(">QHHI", *record, 0))
+
+
+class FakeTablebase:
+    """
+    Claims the side with the queen wins every KQvK position
+    """
+
+    wdl = {"KQvK": None}
+
+    def __init__(self):
+        self.num_probes = 0
+
+    def get_wdl(self, board):
+        self.num_probes += 1
+        return 2 if board.pieces(pychess.QUEEN, board.turn) else -2
+
+    def close(self):
+        pass
+
+
+class TestChessProbe(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.directory.name, "book.bin")
+        start = pychess.Board()
+        after_e4 = pychess.Board()
+        after_e4.push_uci("e2e4")
+        write_book(
+            self.book_path,
+            [
+                (start, "e2e4", 10),
+                (start, "d2d4", 0),
+                (after_e4, "c7c5", 3),
+                (after_e4, "e7e5", 1),
+            ],
+        )
+
+    def tearDown(self):
+        ChessGame.prober = None
+        self.directory.cleanup()
+
+    def test_book_moves(self):
+        prober = ChessProber.open(book_path=self.book_path)
+        board = pychess.Board()
+        # d2d4 has weight 0, so is never played
+        self.assertEqual(prober.book_moves(board), [(pychess.Move.from_uci("e2e4"), 10)])
+        rng = random.Random(0)
+        self.assertEqual({prober.book_move(board, rng).uci() for _ in range(20)}, {"e2e4"})
+        self.assertEqual(prober.book_cache.stats()["misses"], 1)
+
+        board.push_uci("e2e4")
+        self.assertEqual({prober.book_move(board, rng).uci() for _ in range(20)}, {"c7c5", "e7e5"})
+        board.push_uci("c7c5")
+        self.assertIsNone(prober.book_move(board, rng))
+        prober.close()
+
+    def test_game_book_move(self):
+        game = create_game(ChessParameters())
+        self.assertIsNone(game.get_book_move())
+
+        ChessGame.prober = ChessProber.open(book_path=self.book_path)
+        self.assertEqual(game.get_book_move(), "e2e4")
+        play(game, "e2e4")
+        self.assertIn(game.get_book_move(), ["c7c5", "e7e5"])
+        play(game, "a7a6")
+        self.assertIsNone(game.get_book_move())
+
+    def test_empty_tablebase(self):
+        prober = ChessProber.open(tablebase_dir=self.directory.name)
+        self.assertEqual(prober.max_tablebase_pieces, 0)
+        self.assertIsNone(prober.probe_wdl(pychess.Board("8/8/8/8/8/2k5/8/KQ6 w - - 0 1")))
+
+    def test_probes_only_small_endgames(self):
+        tablebase = FakeTablebase()
+        prober = ChessProber(tablebase=tablebase)
+        self.assertIsNone(prober.probe_wdl(pychess.Board()))
+        self.assertEqual(tablebase.num_probes, 0)
+
+        board = pychess.Board("8/8/8/8/8/2k5/8/KQ6 b - - 0 1")
+        self.assertEqual(prober.probe_wdl(board), -2)
+        self.assertEqual(prober.probe_wdl(board), -2)
+        self.assertEqual(tablebase.num_probes, 1)
+
+    def test_adjudication(self):
+        ChessGame.prober = ChessProber(tablebase=FakeTablebase())
+
+        game = create_game(ChessParameters())
+        game.board.set_fen("8/8/8/8/8/2k5/8/KQ6 w - - 0 1")
+        play(game, "a1a2")
+        self.assertFalse(game.get_is_game_over())
+
+        game = create_game(ChessParameters(adjudicate_endgames=True))
+        game.board.set_fen("8/8/8/8/8/2k5/8/KQ6 w - - 0 1")
+        play(game, "a1a2")
+        self.assertTrue(game.get_is_game_over())
+        self.assertEqual(game.outcome.winner, pychess.WHITE)
+        self.assertEqual(game.get_outcome(0), 1)
+        self.assertEqual(game.get_outcome(1), 0)
+        self.assertEqual(game.reward, {0: 1, 1: -1})
+
+
+if __name__ == "__main__":
+    unittest.main()
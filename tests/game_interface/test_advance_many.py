@@ -0,0 +1,162 @@
+import unittest
+import json
+import random
+
+import numpy as np
+
+from playgroundrl_envs.exceptions import PlaygroundInvalidActionException
+from playgroundrl_envs.games.chess import ChessGame, ChessParameters, ChessPlayer
+from playgroundrl_envs.games.go.engine import gogame
+from playgroundrl_envs.games.go.go import GoGame, GoParameters, GoPlayer
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game(game_class, player_class, parameters):
+    players = [player_class(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+    return game_class(game_id=0, players=players, game_type=0, parameters=parameters)
+
+
+def play_randomly(game, choose_action, num_moves, rng):
+    """
+    Plays num_moves moves one by one
+    :return: The actions played
+    """
+    actions = []
+    while not game.get_is_game_over() and len(actions) < num_moves:
+        action = choose_action(game, rng)
+        game.advance_game_state(action, game.get_player_moving().sid)
+        actions.append(action)
+    return actions
+
+
+def random_go_action(game, rng):
+    valid = np.flatnonzero(gogame.valid_moves(game.state))
+    # Pass now and then
+    if rng.random() < 0.05:
+        return str(valid[-1])
+    return str(rng.choice(valid[:-1] if len(valid) > 1 else valid))
+
+
+def random_chess_action(game, rng):
+    move = rng.choice(list(game.board.legal_moves))
+    return json.dumps({"uci": move.uci()})
+
+
+class TestAdvanceMany(unittest.TestCase):
+    def assert_replays(self, game_class, player_class, parameters, choose_action, num_moves):
+        rng = random.Random(0)
+        for _ in range(3):
+            played = create_game(game_class, player_class, parameters)
+            actions = play_randomly(played, choose_action, num_moves, rng)
+
+            replayed = create_game(game_class, player_class, parameters)
+            self.assertEqual(replayed.advance_many(actions), len(actions))
+
+            self.assertEqual(replayed.get_iteration(), played.get_iteration())
+            self.assertEqual(replayed.get_is_game_over(), played.get_is_game_over())
+            self.assertEqual(replayed.get_player_moving().player_id, played.get_player_moving().player_id)
+            for player_id in played.get_players():
+                self.assertEqual(replayed.get_state(player_id=player_id), played.get_state(player_id=player_id))
+                self.assertEqual(replayed.get_outcome(player_id), played.get_outcome(player_id))
+
+    def test_go(self):
+        self.assert_replays(GoGame, GoPlayer, GoParameters(board_size=5), random_go_action, 200)
+
+    def test_go_adjudication(self):
+        parameters = GoParameters(board_size=5, adjudicate_margin=15, adjudicate_after_moves=20)
+        self.assert_replays(GoGame, GoPlayer, parameters, random_go_action, 200)
+
+    def test_chess(self):
+        self.assert_replays(ChessGame, ChessPlayer, ChessParameters(), random_chess_action, 60)
+
+    def test_chess_checkmate(self):
+        game = create_game(ChessGame, ChessPlayer, ChessParameters())
+        game.advance_many(json.dumps({"uci": uci}) for uci in ["f2f3", "e7e5", "g2g4", "d8h4"])
+        self.assertTrue(game.get_is_game_over())
+        self.assertEqual(game.get_outcome(1), 1)
+        self.assertEqual(game.reward, {0: -1, 1: 1})
+
+    def test_go_delta_state_after_advance_many(self):
+        game = create_game(GoGame, GoPlayer, GoParameters(board_size=5))
+        game.get_state(player_id=0, delta=True)
+        game.acknowledge_state(0, 0)
+        game.advance_many(["0", "1"])
+        message = json.loads(game.get_state(player_id=0, delta=True)[0])
+        self.assertEqual(message["type"], "full")
+        self.assertEqual(message["iteration"], 2)
+
+    def test_invalid_action_rolls_back(self):
+        game = create_game(GoGame, GoPlayer, GoParameters(board_size=5))
+        game.advance_many(["0"])
+        state = game.get_state()
+        with self.assertRaises(PlaygroundInvalidActionException):
+            game.advance_many(["1", "2", "1"])
+        self.assertEqual(game.get_iteration(), 1)
+        self.assertEqual(game.get_state(), state)
+
+        # Games whose submit_action returns False for invalid actions
+        game = create_game(TicTacToeGame, TicTacToePlayer, TicTacToeParameters())
+        with self.assertRaises(PlaygroundInvalidActionException):
+            game.advance_many(["4", "0", "4"])
+        self.assertEqual(game.get_iteration(), 0)
+        self.assertEqual(game.masks, [0, 0])
+
+    def assert_stops_at_end(self, game_class, player_class, parameters, log):
+        """
+        log goes on after the end of the game. Both ways of replaying it have to stop there.
+        """
+        one_by_one = create_game(game_class, player_class, parameters)
+        with self.assertRaises(PlaygroundInvalidActionException):
+            for action in log:
+                one_by_one.advance_game_state(action, one_by_one.get_player_moving().sid)
+        self.assertTrue(one_by_one.get_is_game_over())
+        num_moves = one_by_one.get_iteration()
+        self.assertLess(num_moves, len(log))
+
+        bulk = create_game(game_class, player_class, parameters)
+        with self.assertRaises(PlaygroundInvalidActionException):
+            bulk.advance_many(log)
+        self.assertEqual(bulk.get_iteration(), 0)
+
+        bulk.advance_many(log[:num_moves])
+        self.assertEqual(bulk.get_iteration(), num_moves)
+        self.assertTrue(bulk.get_is_game_over())
+        for player_id in one_by_one.get_players():
+            self.assertEqual(bulk.get_state(player_id=player_id), one_by_one.get_state(player_id=player_id))
+            self.assertEqual(bulk.get_outcome(player_id), one_by_one.get_outcome(player_id))
+
+    def test_go_log_past_end(self):
+        # Two passes, then more moves
+        self.assert_stops_at_end(
+            GoGame, GoPlayer, GoParameters(board_size=5), ["0", "6", "25", "25", "1", "2"]
+        )
+        # Black owns the board after its second stone, which is the fourth move
+        parameters = GoParameters(board_size=5, adjudicate_margin=20, adjudicate_after_moves=4)
+        self.assert_stops_at_end(GoGame, GoPlayer, parameters, ["0", "25", "1", "25", "2", "25"])
+
+    def test_chess_log_past_end(self):
+        def log(ucis):
+            return [json.dumps({"uci": uci}) for uci in ucis]
+
+        # Fivefold repetition, moves stay legal after it
+        shuffle = ["g1f3", "g8f6", "f3g1", "f6g8"] * 5
+        self.assert_stops_at_end(ChessGame, ChessPlayer, ChessParameters(), log(shuffle))
+        # Checkmate
+        mate = ["f2f3", "e7e5", "g2g4", "d8h4", "e1f2"]
+        self.assert_stops_at_end(ChessGame, ChessPlayer, ChessParameters(), log(mate))
+
+    def test_tic_tac_toe(self):
+        game = create_game(TicTacToeGame, TicTacToePlayer, TicTacToeParameters())
+        game.advance_many(["0", "3", "1", "4", "2"])
+        self.assertTrue(game.get_is_game_over())
+        self.assertEqual(game.get_outcome(0), 1)
+        self.assertEqual(game.get_iteration(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+import contextlib
+import io
+import json
+import random
+
+import numpy as np
+
+from playgroundrl_envs.games.catan.catan import CatanGame, CatanParameters, CatanPlayer
+from playgroundrl_envs.games.chess import ChessGame, ChessParameters, ChessPlayer
+from playgroundrl_envs.games.go.engine import gogame
+from playgroundrl_envs.games.go.go import GoGame, GoParameters, GoPlayer
+from playgroundrl_envs.games.mining_decarbonization import (
+    MiningDecarbonizationGame,
+    MiningDecarbonizationParameters,
+    MiningDecarbonizationPlayer,
+)
+from playgroundrl_envs.games.poker import Poker, PokerParameters, PokerPlayer
+from playgroundrl_envs.games.snake import SnakeGame, SnakeParameters, SnakePlayer
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game(game_class, player_class, parameters, num_players=None):
+    num_players = num_players or game_class.get_num_players()
+    players = [player_class(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(num_players)]
+    return game_class(game_id=0, players=players, game_type=0, parameters=parameters)
+
+
+def random_go_action(game, rng):
+    valid = np.flatnonzero(gogame.valid_moves(game.state))
+    return rng.choice(valid[:-1] if len(valid) > 1 else valid)
+
+
+def random_chess_action(game, rng):
+    move = rng.choice(list(game.board.legal_moves))
+    return json.dumps({"uci": move.uci()})
+
+
+def random_poker_action(game, rng):
+    return json.dumps({"action_type": rng.choice(["CALL", "CHECK", "FOLD"])})
+
+
+def random_catan_action(game, rng):
+    return rng.choice(json.loads(game.get_state()[0])["playable_actions"])
+
+
+def play(game, choose_action, rng, num_moves):
+    """
+    Plays num_moves random moves, skipping invalid ones, and returns the states seen
+    """
+    states = []
+    while len(states) < num_moves and not game.get_is_game_over():
+        player = game.get_player_moving()
+        try:
+            game.advance_game_state(choose_action(game, rng), player.sid)
+        except Exception:
+            continue
+        states.append(game.get_state(player.sid, player.player_id))
+    return states
+
+
+class TestSnapshot(unittest.TestCase):
+    def assert_replays(self, game, choose_action, num_moves=10, seed=0):
+        """
+        Restoring a snapshot and replaying the same moves gives the same states, any number of times
+        """
+        play(game, choose_action, random.Random(seed), num_moves)
+        snapshot = game.snapshot()
+        iteration = game.get_iteration()
+
+        random.seed(seed)
+        expected = play(game, choose_action, random.Random(seed + 1), num_moves)
+        for _ in range(2):
+            game.restore(snapshot)
+            self.assertEqual(game.get_iteration(), iteration)
+            random.seed(seed)
+            self.assertEqual(play(game, choose_action, random.Random(seed + 1), num_moves), expected)
+
+    def test_go(self):
+        game = create_game(GoGame, GoPlayer, GoParameters(board_size=7))
+        self.assert_replays(game, random_go_action, num_moves=30)
+
+        # Players are shared, not copied
+        snapshot = game.snapshot()
+        self.assertIn(snapshot["player_moving"], game.players.values())
+
+    def test_rollback(self):
+        game = create_game(GoGame, GoPlayer, GoParameters(board_size=7))
+        snapshot = game.snapshot()
+        before = game.get_state()
+
+        game.advance_game_state(0, "sid-0")
+        self.assertNotEqual(game.get_state(), before)
+        game.restore(snapshot)
+        self.assertEqual(game.get_state(), before)
+        self.assertEqual(game.get_player_moving().player_id, 0)
+
+    def test_tic_tac_toe(self):
+        game = create_game(TicTacToeGame, TicTacToePlayer, TicTacToeParameters())
+
+        def choose_action(game, rng):
+            return str(rng.randrange(9))
+
+        self.assert_replays(game, choose_action, num_moves=3, seed=1)
+
+    def test_chess(self):
+        game = create_game(ChessGame, ChessPlayer, ChessParameters())
+        self.assert_replays(game, random_chess_action, num_moves=20)
+
+    def test_snake(self):
+        game = create_game(SnakeGame, SnakePlayer, SnakeParameters())
+
+        def choose_action(game, rng):
+            return rng.choice(["S", "E"])
+
+        self.assert_replays(game, choose_action, num_moves=4)
+
+    def test_mining(self):
+        game = create_game(
+            MiningDecarbonizationGame,
+            MiningDecarbonizationPlayer,
+            MiningDecarbonizationParameters(),
+        )
+
+        def choose_action(game, rng):
+            budget = [[rng.random() for _ in range(8)] for _ in range(8)]
+            return json.dumps({"mining": budget, "exploration": budget, "research": budget})
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assert_replays(game, choose_action, num_moves=3)
+
+    def test_poker(self):
+        game = create_game(Poker, PokerPlayer, PokerParameters())
+        self.assert_replays(game, random_poker_action, num_moves=30)
+
+    def test_poker_mid_hand(self):
+        game = create_game(Poker, PokerPlayer, PokerParameters())
+        play(game, random_poker_action, random.Random(0), 2)
+        # Nothing is copied until a snapshot is taken
+        self.assertIsNone(game.hand_start)
+
+        snapshot = game.snapshot()
+        before = [game.get_state(player.sid, player.player_id) for player in game.player_list]
+        play(game, random_poker_action, random.Random(1), 20)
+
+        random_state = random.getstate()
+        game.restore(snapshot)
+        self.assertEqual(random.getstate(), random_state)
+        after = [game.get_state(player.sid, player.player_id) for player in game.player_list]
+        self.assertEqual(after, before)
+
+    def test_catan(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = create_game(CatanGame, CatanPlayer, CatanParameters(), num_players=3)
+            self.assert_replays(game, random_catan_action, num_moves=30)
+
+
+if __name__ == "__main__":
+    unittest.main()
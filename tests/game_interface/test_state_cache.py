@@ -0,0 +1,79 @@
+import unittest
+import json
+
+from playgroundrl_envs.games.go.go import GoGame, GoParameters, GoPlayer
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+class CountingTicTacToeGame(TicTacToeGame):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.num_get_state_calls = 0
+
+    def get_state(self, player_sid="", player_id=-1):
+        self.num_get_state_calls += 1
+        return super().get_state(player_sid, player_id)
+
+
+class UncachedTicTacToeGame(CountingTicTacToeGame):
+    cache_state = False
+
+
+def create_game(game_class, player_class=TicTacToePlayer, parameters=TicTacToeParameters()):
+    players = [player_class(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+    return game_class(game_id=0, players=players, game_type=0, parameters=parameters)
+
+
+class TestStateCache(unittest.TestCase):
+    def test_repeated_reads_are_cached(self):
+        game = create_game(CountingTicTacToeGame)
+        first = game.get_state("sid-0", 0)
+        self.assertIs(game.get_state("sid-0", 0), first)
+        self.assertIs(game.get_state("sid-0", player_id=0), first)
+        self.assertIs(game.get_state(player_sid="sid-0", player_id=0), first)
+        self.assertEqual(game.num_get_state_calls, 1)
+
+        # Each player gets their own entry
+        game.get_state("sid-1", 1)
+        game.get_state("sid-1", 1)
+        self.assertEqual(game.num_get_state_calls, 2)
+
+    def test_advance_invalidates(self):
+        game = create_game(CountingTicTacToeGame)
+        before = game.get_state("sid-0", 0)
+        game.advance_game_state("4", "sid-0")
+        after = game.get_state("sid-0", 0)
+
+        self.assertEqual(game.num_get_state_calls, 2)
+        self.assertNotEqual(before, after)
+        self.assertEqual(json.loads(after[0])["board"][1][1], 0)
+
+    def test_submit_action_invalidates(self):
+        game = create_game(CountingTicTacToeGame)
+        game.get_state()
+        game.submit_action("0", "sid-0")
+        self.assertEqual(json.loads(game.get_state()[0])["board"][0][0], 0)
+        self.assertEqual(game.num_get_state_calls, 2)
+
+    def test_opt_out(self):
+        game = create_game(UncachedTicTacToeGame)
+        game.get_state("sid-0", 0)
+        game.get_state("sid-0", 0)
+        self.assertEqual(game.num_get_state_calls, 2)
+
+    def test_extra_arguments_are_not_cached(self):
+        game = create_game(GoGame, GoPlayer, GoParameters(board_size=5))
+        self.assertEqual(json.loads(game.get_state(player_id=0, delta=True)[0])["type"], "full")
+        game.acknowledge_state(0, 0)
+        game.advance_game_state(0, "sid-0")
+        game.get_state(player_id=0)
+        self.assertEqual(json.loads(game.get_state(player_id=0, delta=True)[0])["type"], "delta")
+
+
+if __name__ == "__main__":
+    unittest.main()
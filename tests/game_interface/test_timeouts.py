@@ -0,0 +1,86 @@
+import unittest
+
+import attrs
+
+from playgroundrl_envs import game_interface
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs.sid_util import SidSessionInfo
+from playgroundrl_envs.timer_wheel import TimerWheel
+
+
+@attrs.define(frozen=True)
+class BlitzParameters(TicTacToeParameters):
+    def get_timeout(self, game_type):
+        return 5 if game_type == 1 else None
+
+
+class SlowTicTacToeGame(TicTacToeGame):
+    timeouts = {0: 600}
+
+
+def create_game(game_type=0, parameters=TicTacToeParameters(), game_class=TicTacToeGame):
+    players = [TicTacToePlayer(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+    return game_class(0, players, game_type, parameters)
+
+
+class TestTimeouts(unittest.TestCase):
+    def test_defaults(self):
+        self.assertEqual(create_game(game_type=0).timeout, game_interface.TIMEOUT)
+        self.assertEqual(create_game(game_type=1).timeout, game_interface.GAME_TYPE_TIMEOUTS[1])
+        self.assertEqual(create_game(game_type=2).timeout, game_interface.TIMEOUT)
+
+    def test_game_class_timeouts(self):
+        self.assertEqual(create_game(game_type=0, game_class=SlowTicTacToeGame).timeout, 600)
+        self.assertEqual(
+            create_game(game_type=1, game_class=SlowTicTacToeGame).timeout, game_interface.TIMEOUT
+        )
+
+    def test_parameters_timeout(self):
+        self.assertEqual(create_game(game_type=1, parameters=BlitzParameters()).timeout, 5)
+        self.assertEqual(
+            create_game(game_type=0, parameters=BlitzParameters()).timeout, game_interface.TIMEOUT
+        )
+
+    def test_timeout_fires_and_is_counted(self):
+        now = [1000.0]
+        game = create_game(game_type=1, parameters=BlitzParameters())
+        game.timers = TimerWheel(clock=lambda: now[0], autostart=False)
+
+        fired = []
+        game.reset_timeout(fired.append, ["timed out"])
+        self.assertAlmostEqual(game.timeout_timestamp, int(game.time_last_updated + 5))
+
+        now[0] += 4
+        game.timers.advance()
+        self.assertEqual(fired, [])
+        now[0] += 1
+        game.timers.advance()
+        self.assertEqual(fired, ["timed out"])
+        self.assertEqual(game.num_timeouts, 1)
+
+    def test_first_reset_updates_timestamp(self):
+        game = create_game()
+        game.timers = TimerWheel(autostart=False)
+        game.time_last_updated = 0
+        game.reset_timeout(print, [])
+        self.assertGreater(game.timeout_timestamp, game_interface.TIMEOUT)
+
+    def test_move_times(self):
+        game = create_game()
+        for action, player_id in [("0", 0), ("4", 1), ("8", 0)]:
+            game.advance_game_state(action, f"sid-{player_id}")
+
+        self.assertEqual(game.move_times[0].num_moves, 2)
+        self.assertEqual(game.move_times[1].num_moves, 1)
+        for times in game.move_times.values():
+            self.assertGreaterEqual(times.longest, times.mean)
+            self.assertGreaterEqual(times.mean, 0)
+            self.assertAlmostEqual(times.total, times.mean * times.num_moves)
+
+
+if __name__ == "__main__":
+    unittest.main()
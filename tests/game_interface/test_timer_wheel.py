@@ -0,0 +1,145 @@
+import unittest
+
+import eventlet
+
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs import game_interface
+from playgroundrl_envs.sid_util import SidSessionInfo
+from playgroundrl_envs.timer_wheel import TimerWheel
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def create_wheel(num_slots=8):
+    clock = FakeClock()
+    return TimerWheel(tick=1.0, num_slots=num_slots, clock=clock, autostart=False), clock
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_fires_at_deadline(self):
+        wheel, clock = create_wheel()
+        fired = []
+        wheel.schedule(2.5, fired.append, ["a"])
+
+        clock.now += 2
+        self.assertEqual(wheel.advance(), 0)
+        clock.now += 0.5
+        self.assertEqual(wheel.advance(), 0)
+        clock.now += 0.5
+        self.assertEqual(wheel.advance(), 1)
+        self.assertEqual(fired, ["a"])
+        self.assertEqual(len(wheel), 0)
+
+    def test_batched_in_deadline_order(self):
+        wheel, clock = create_wheel()
+        fired = []
+        for delay in [5, 1, 3, 2, 4]:
+            wheel.schedule(delay, fired.append, [delay])
+
+        clock.now += 10
+        self.assertEqual(wheel.advance(), 5)
+        self.assertEqual(fired, [1, 2, 3, 4, 5])
+
+    def test_longer_than_a_rotation(self):
+        wheel, clock = create_wheel(num_slots=8)
+        fired = []
+        wheel.schedule(20, fired.append, ["late"])
+        wheel.schedule(4, fired.append, ["early"])
+
+        for _ in range(19):
+            clock.now += 1
+            wheel.advance()
+        self.assertEqual(fired, ["early"])
+
+        clock.now += 1
+        wheel.advance()
+        self.assertEqual(fired, ["early", "late"])
+
+    def test_cancel_and_reset(self):
+        wheel, clock = create_wheel()
+        fired = []
+        cancelled = wheel.schedule(1, fired.append, ["cancelled"])
+        reset = wheel.schedule(1, fired.append, ["reset"])
+        wheel.cancel(cancelled)
+        wheel.cancel(cancelled)
+        self.assertFalse(cancelled.pending)
+
+        clock.now += 0.5
+        wheel.reset(reset, 3)
+        clock.now += 1
+        wheel.advance()
+        self.assertEqual(fired, [])
+
+        clock.now += 3
+        wheel.advance()
+        self.assertEqual(fired, ["reset"])
+
+    def test_callback_can_reschedule(self):
+        wheel, clock = create_wheel()
+        fired = []
+
+        def callback():
+            fired.append(clock.now)
+            if len(fired) < 3:
+                wheel.schedule(2, callback)
+
+        wheel.schedule(2, callback)
+        for _ in range(10):
+            clock.now += 1
+            wheel.advance()
+        self.assertEqual(fired, [1002.0, 1004.0, 1006.0])
+
+    def test_driver_thread(self):
+        wheel = TimerWheel(tick=0.01)
+        fired = []
+        wheel.schedule(0.02, fired.append, ["a"])
+        wheel.schedule(0.03, fired.append, ["b"])
+        eventlet.sleep(0.2)
+        self.assertEqual(fired, ["a", "b"])
+        self.assertIsNone(wheel.driver)
+
+
+class TestGameTimeout(unittest.TestCase):
+    def setUp(self):
+        players = [TicTacToePlayer(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+        self.game = TicTacToeGame(0, players, 0, TicTacToeParameters())
+        self.game.timers, self.clock = create_wheel()
+
+    def test_reset_timeout(self):
+        fired = []
+        self.game.reset_timeout(fired.append, ["first"])
+        self.clock.now += game_interface.TIMEOUT - 1
+        self.game.reset_timeout(fired.append, ["second"])
+
+        self.clock.now += 2
+        self.game.timers.advance()
+        self.assertEqual(fired, [])
+        self.assertEqual(len(self.game.timers), 1)
+
+        self.clock.now += game_interface.TIMEOUT
+        self.game.timers.advance()
+        self.assertEqual(fired, ["second"])
+
+    def test_cancel_timeout(self):
+        fired = []
+        self.game.cancel_timeout()
+        self.game.reset_timeout(fired.append, ["first"])
+        self.game.cancel_timeout()
+
+        self.clock.now += 2 * game_interface.TIMEOUT
+        self.game.timers.advance()
+        self.assertEqual(fired, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
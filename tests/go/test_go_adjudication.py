@@ -0,0 +1,60 @@
+import unittest
+
+from playgroundrl_envs.games.go import go
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game(parameters):
+    players = [
+        go.GoPlayer(
+            session_info=SidSessionInfo(sid=f"sid-{i}", user_id=i, is_human=False),
+            player_id=i,
+        )
+        for i in range(2)
+    ]
+    return go.GoGame(game_id=0, players=players, game_type=0, parameters=parameters)
+
+
+def play(game, actions):
+    for action in actions:
+        player = game.get_player_moving()
+        game.advance_game_state(str(action), player.sid)
+
+
+class TestGoAdjudication(unittest.TestCase):
+    # Black places stones while white passes, so black owns the whole board
+    ACTIONS = [0, 25, 1, 25, 2, 25]
+
+    def test_disabled_by_default(self):
+        game = create_game(go.GoParameters(board_size=5))
+        play(game, self.ACTIONS)
+        self.assertFalse(game.get_is_game_over())
+        self.assertEqual(game.reward, {0: 25, 1: 0})
+
+    def test_waits_for_move_threshold(self):
+        parameters = go.GoParameters(board_size=5, adjudicate_margin=20, adjudicate_after_moves=5)
+        game = create_game(parameters)
+        play(game, self.ACTIONS[:4])
+        self.assertFalse(game.get_is_game_over())
+
+        play(game, self.ACTIONS[4:5])
+        self.assertTrue(game.get_is_game_over())
+        self.assertEqual(game.winning_player, 0)
+        self.assertEqual(game.get_outcome(0), 1)
+        self.assertEqual(game.get_outcome(1), 0)
+
+    def test_margin(self):
+        parameters = go.GoParameters(board_size=5, adjudicate_margin=20, adjudicate_after_moves=2)
+        game = create_game(parameters)
+        play(game, [0, 25])
+        self.assertTrue(game.get_is_game_over())
+
+        # A white stone in the middle leaves both players with only their stones
+        game = create_game(parameters)
+        play(game, [0, 12, 1, 13])
+        self.assertEqual(game.reward, {0: 2, 1: 2})
+        self.assertFalse(game.get_is_game_over())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+from scipy import ndimage
+
+from playgroundrl_envs.games.go.engine import gogame, govars
+from playgroundrl_envs.games.go.engine.group_tracker import GroupTracker
+
+
+def reference_areas(state):
+    """
+    Region-by-region scoring, as gogame.areas used to do it
+    """
+    all_pieces = np.sum(state[[govars.BLACK, govars.WHITE]], axis=0)
+    empty_labels, num_empty_areas = ndimage.label(1 - all_pieces)
+
+    black_area, white_area = np.sum(state[govars.BLACK]), np.sum(state[govars.WHITE])
+    for label in range(1, num_empty_areas + 1):
+        empty_area = empty_labels == label
+        neighbors = ndimage.binary_dilation(empty_area)
+        black_claim = (state[govars.BLACK] * neighbors > 0).any()
+        white_claim = (state[govars.WHITE] * neighbors > 0).any()
+        if black_claim and not white_claim:
+            black_area += np.sum(empty_area)
+        elif white_claim and not black_claim:
+            white_area += np.sum(empty_area)
+    return black_area, white_area
+
+
+def random_game(size, seed):
+    rng = np.random.RandomState(seed)
+    state = gogame.init_state(size)
+    groups = GroupTracker(size, track_territory=True)
+    while not gogame.game_ended(state):
+        valid = np.flatnonzero(gogame.valid_moves(state))
+        if len(valid) > 1 and rng.rand() < 0.97:
+            valid = valid[:-1]
+        state = gogame.next_state(state, rng.choice(valid), groups=groups)
+        yield state, groups
+
+
+class TestAreas(unittest.TestCase):
+    def test_matches_reference(self):
+        for size, seed in [(5, 0), (9, 1), (13, 2)]:
+            for state, _ in random_game(size, seed):
+                self.assertEqual(gogame.areas(state), reference_areas(state))
+
+    def test_incremental_matches_reference(self):
+        for size, seed in [(5, 3), (9, 4), (19, 5)]:
+            for state, groups in random_game(size, seed):
+                self.assertEqual(gogame.areas(state, groups=groups), reference_areas(state))
+
+            copied = groups.copy()
+            self.assertEqual(copied.areas(), groups.areas())
+
+    def test_batch_areas(self):
+        states = np.array([state for state, _ in random_game(9, 6)])
+        black_areas, white_areas = gogame.batch_areas(states)
+        for state, black_area, white_area in zip(states, black_areas, white_areas):
+            self.assertEqual((black_area, white_area), reference_areas(state))
+
+    def test_from_state_tracks_territory(self):
+        for state, _ in random_game(7, 7):
+            pass
+        groups = GroupTracker.from_state(state, track_territory=True)
+        self.assertEqual(groups.areas(), reference_areas(state))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+
+from playgroundrl_envs.games.go.engine import gogame
+
+
+def random_states(size, num_states, seed):
+    """
+    States sampled along random games, so the batch holds a mix of captures, kos and passes
+    """
+    rng = np.random.RandomState(seed)
+    states = []
+    state = gogame.init_state(size)
+    while len(states) < num_states:
+        valid = np.flatnonzero(gogame.valid_moves(state))
+        if len(valid) > 1 and rng.rand() < 0.95:
+            valid = valid[:-1]
+        state = gogame.next_state(state, rng.choice(valid))
+        if gogame.game_ended(state):
+            state = gogame.init_state(size)
+        states.append(state)
+    return np.array(states)
+
+
+class TestBatchNextStates(unittest.TestCase):
+    def test_matches_single_next_state(self):
+        rng = np.random.RandomState(0)
+        for size in [5, 7, 9]:
+            batch_states = random_states(size, 300, seed=size)
+            batch_actions = np.array(
+                [rng.choice(np.flatnonzero(gogame.valid_moves(state))) for state in batch_states]
+            )
+
+            batch_next = gogame.batch_next_states(batch_states, batch_actions)
+            for state, action, next_state in zip(batch_states, batch_actions, batch_next):
+                np.testing.assert_array_equal(next_state, gogame.next_state(state, action))
+
+    def test_children_match_single_next_state(self):
+        state = random_states(7, 40, seed=1)[-1]
+        children = gogame.children(state)
+        for action in np.flatnonzero(gogame.valid_moves(state)):
+            np.testing.assert_array_equal(children[action], gogame.next_state(state, action))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+
+from playgroundrl_envs.games.go.engine import gogame, govars
+
+
+def reference_canonical_form(state):
+    state = np.copy(state)
+    if gogame.turn(state) == govars.WHITE:
+        channels = np.arange(govars.NUM_CHNLS)
+        channels[govars.BLACK] = govars.WHITE
+        channels[govars.WHITE] = govars.BLACK
+        state = state[channels]
+        state[govars.TURN_CHNL] = 1 - state[govars.TURN_CHNL]
+    return state
+
+
+class TestCanonicalForm(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.states = []
+        state = gogame.init_state(7)
+        for _ in range(30):
+            state = gogame.next_state(state, rng.choice(np.flatnonzero(gogame.valid_moves(state))[:-1]))
+            self.states.append(state)
+
+    def test_canonical_form(self):
+        for state in self.states:
+            canonical = gogame.canonical_form(state)
+            np.testing.assert_array_equal(canonical, reference_canonical_form(state))
+            self.assertFalse(np.shares_memory(canonical, state))
+
+    def test_batch_canonical_form(self):
+        batch = np.array(self.states)
+        expected = np.array([reference_canonical_form(state) for state in batch])
+        np.testing.assert_array_equal(gogame.batch_canonical_form(batch), expected)
+
+    def test_compact_canonical_form_is_a_view(self):
+        compact = gogame.init_state(7, compact=True)
+        compact = gogame.next_state(compact, 3)
+        canonical = gogame.canonical_form(compact)
+        self.assertTrue(np.shares_memory(canonical.stones, compact.stones))
+        np.testing.assert_array_equal(canonical.tensor(), reference_canonical_form(compact.tensor()))
+
+
+if __name__ == "__main__":
+    unittest.main()
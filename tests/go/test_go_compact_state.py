@@ -0,0 +1,77 @@
+import unittest
+import json
+import numpy as np
+
+from playgroundrl_envs.games.go.go import GoGame, GoParameters, GoPlayer
+from playgroundrl_envs.games.go.engine import gogame, govars
+from playgroundrl_envs.games.go.engine.compact_state import CompactState
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_default_game(board_size=9):
+    players = [
+        GoPlayer(
+            session_info=SidSessionInfo(sid=f"sid-{i}", user_id=i, is_human=False),
+            player_id=i,
+        )
+        for i in range(2)
+    ]
+    return GoGame(
+        game_id=0,
+        players=players,
+        game_type=0,
+        parameters=GoParameters(board_size=board_size),
+    )
+
+
+class TestCompactState(unittest.TestCase):
+    def test_matches_tensor_state(self):
+        rng = np.random.RandomState(0)
+        state = gogame.init_state(9)
+        compact = gogame.init_state(9, compact=True)
+
+        while not gogame.game_ended(state):
+            valid = np.flatnonzero(gogame.valid_moves(state))
+            if len(valid) > 1 and rng.rand() < 0.95:
+                valid = valid[:-1]
+            action = rng.choice(valid)
+
+            state = gogame.next_state(state, action)
+            compact = gogame.next_state(compact, action)
+            self.assertIsInstance(compact, CompactState)
+
+            np.testing.assert_array_equal(np.asarray(compact), state)
+            for channel in range(govars.NUM_CHNLS):
+                np.testing.assert_array_equal(compact[channel], state[channel])
+            np.testing.assert_array_equal(
+                gogame.canonical_form(compact).tensor(), gogame.canonical_form(state)
+            )
+
+    def test_channel_views_do_not_copy(self):
+        compact = gogame.init_state(19, compact=True)
+        self.assertTrue(np.shares_memory(compact[govars.BLACK], compact.stones))
+        self.assertTrue(np.shares_memory(compact[govars.INVD_CHNL], compact.invalid))
+        self.assertEqual(compact[govars.TURN_CHNL].strides, (0, 0))
+        self.assertLess(compact.nbytes, gogame.init_state(19).nbytes // 10)
+
+    def test_round_trip(self):
+        state = gogame.init_state(5)
+        for action in [1, 2, 5, 8, 11, 12, 25, 6, 7]:
+            state = gogame.next_state(state, action)
+        compact = CompactState.from_tensor(state)
+        np.testing.assert_array_equal(compact.tensor(), state)
+
+    def test_game_state_json(self):
+        game = create_default_game()
+        game.advance_game_state("40", "sid-0")
+        game.advance_game_state("81", "sid-1")
+
+        state = json.loads(game.get_state()[0])
+        self.assertEqual(state["board"][4][4], 0.0)
+        self.assertEqual(state["board"][0][0], -1.0)
+        self.assertEqual(state["invalid_moves"][4][4], 1.0)
+        self.assertTrue(state["last_move_was_pass"])
+
+
+if __name__ == "__main__":
+    unittest.main()
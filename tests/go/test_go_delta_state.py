@@ -0,0 +1,123 @@
+import unittest
+import json
+import numpy as np
+
+from playgroundrl_envs.games.go import go
+from playgroundrl_envs.games.go.engine import gogame
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_default_game(board_size=9):
+    players = [
+        go.GoPlayer(
+            session_info=SidSessionInfo(sid=f"sid-{i}", user_id=i, is_human=False),
+            player_id=i,
+        )
+        for i in range(2)
+    ]
+    return go.GoGame(
+        game_id=0,
+        players=players,
+        game_type=0,
+        parameters=go.GoParameters(board_size=board_size),
+    )
+
+
+class DeltaClient:
+    """
+    Rebuilds the full state from delta mode messages, the way a client would
+    """
+
+    def __init__(self):
+        self.board = None
+        self.invalid_moves = None
+        self.iteration = None
+
+    def apply(self, message):
+        if message["type"] == "full":
+            self.board = np.array(message["board"])
+            self.invalid_moves = np.array(message["invalid_moves"])
+        else:
+            self.assert_from(message["from_iteration"])
+            for move in message["moves"]:
+                if move["placed"] is not None:
+                    self.board[tuple(move["placed"])] = move["color"]
+                for r, c in move["captured"]:
+                    self.board[r, c] = go.EMPTY_SQUARE
+                for r, c, value in move["invalid_moves"]:
+                    self.invalid_moves[r, c] = value
+        self.iteration = message["iteration"]
+
+    def assert_from(self, iteration):
+        assert iteration == self.iteration, (iteration, self.iteration)
+
+
+def play_random_game(game, seed, on_move):
+    rng = np.random.RandomState(seed)
+    while not game.get_is_game_over():
+        valid = np.flatnonzero(gogame.valid_moves(game.state))
+        if len(valid) > 1 and rng.rand() < 0.97:
+            valid = valid[:-1]
+        player = game.get_player_moving()
+        game.advance_game_state(rng.choice(valid), player.sid)
+        on_move(rng)
+
+
+class TestDeltaState(unittest.TestCase):
+    def test_deltas_rebuild_full_state(self):
+        game = create_default_game(board_size=9)
+        clients = {player_id: DeltaClient() for player_id in range(2)}
+        kinds = []
+
+        def on_move(rng):
+            for player_id, client in clients.items():
+                # Clients sometimes miss a few updates before acknowledging
+                if rng.rand() < 0.3:
+                    continue
+                message = json.loads(game.get_state(player_id=player_id, delta=True)[0])
+                kinds.append(message["type"])
+                client.apply(message)
+                game.acknowledge_state(player_id, client.iteration)
+
+                full = json.loads(game.get_state(player_id=player_id)[0])
+                np.testing.assert_array_equal(client.board, full["board"])
+                np.testing.assert_array_equal(client.invalid_moves, full["invalid_moves"])
+                self.assertEqual(message["last_move_was_pass"], full["last_move_was_pass"])
+                self.assertEqual(message["iteration"], game.iteration)
+
+        play_random_game(game, 0, on_move)
+        self.assertIn("delta", kinds)
+        self.assertIn("full", kinds)
+
+    def test_first_message_is_full(self):
+        game = create_default_game()
+        message = json.loads(game.get_state(player_id=0, delta=True)[0])
+        self.assertEqual(message["type"], "full")
+        self.assertEqual(message["iteration"], 0)
+
+    def test_periodic_snapshot(self):
+        game = create_default_game(board_size=9)
+        snapshots = []
+
+        def on_move(rng):
+            message = json.loads(game.get_state(player_id=0, delta=True)[0])
+            if message["type"] == "full":
+                snapshots.append(message["iteration"])
+            game.acknowledge_state(0, message["iteration"])
+
+        play_random_game(game, 1, on_move)
+        self.assertGreater(len(snapshots), 1)
+        for previous, current in zip(snapshots, snapshots[1:]):
+            self.assertEqual(current - previous, go.FULL_SNAPSHOT_INTERVAL)
+
+    def test_default_state_unchanged(self):
+        game = create_default_game()
+        message = json.loads(game.get_state()[0])
+        self.assertEqual(
+            set(message),
+            {"player_moving", "model_name", "player_moving_id", "board", "invalid_moves", "last_move_was_pass"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+
+from playgroundrl_envs.games.go.engine import gogame, govars
+from playgroundrl_envs.games.go.engine.group_tracker import GroupTracker
+
+
+def play_random_game(size, seed, max_moves=400):
+    """
+    Plays the same random game through the reference engine and the tracked
+    engine, yielding both states after every move.
+    """
+    rng = np.random.RandomState(seed)
+    state = gogame.init_state(size)
+    tracked = gogame.init_state(size)
+    groups = GroupTracker(size)
+
+    for _ in range(max_moves):
+        valid = np.flatnonzero(gogame.valid_moves(state))
+        # Make passes rare so games get crowded and captures happen
+        if len(valid) > 1 and rng.rand() < 0.97:
+            valid = valid[:-1]
+        action = rng.choice(valid)
+
+        state = gogame.next_state(state, action)
+        tracked = gogame.next_state(tracked, action, groups=groups)
+        yield state, tracked, groups
+
+        if gogame.game_ended(state):
+            break
+
+
+class TestGroupTracker(unittest.TestCase):
+    def test_matches_reference_engine(self):
+        for size, seed in [(5, 0), (7, 1), (9, 2), (9, 3), (13, 4)]:
+            for state, tracked, _ in play_random_game(size, seed):
+                np.testing.assert_array_equal(state, tracked)
+
+    def test_liberties_match_board(self):
+        for state, _, groups in play_random_game(7, 5):
+            black_libs, white_libs = gogame.liberties(state)
+            tracked_libs = [np.zeros(49, dtype=bool), np.zeros(49, dtype=bool)]
+            for root, libs in groups.liberties.items():
+                tracked_libs[groups.board[root]][list(libs)] = True
+            np.testing.assert_array_equal(black_libs.flatten(), tracked_libs[0])
+            np.testing.assert_array_equal(white_libs.flatten(), tracked_libs[1])
+
+    def test_from_state_recovers_ko(self):
+        # Black captures a white stone in a ko shape
+        state = gogame.init_state(5)
+        for action in [1, 2, 5, 8, 11, 12, 25, 6, 7]:
+            state = gogame.next_state(state, action)
+
+        groups = GroupTracker.from_state(state)
+        self.assertEqual(groups.ko, 6)
+        self.assertFalse(groups.is_valid(6))
+
+        # Both engines should agree from here on
+        tracked = gogame.next_state(state, 20, groups=groups)
+        np.testing.assert_array_equal(tracked, gogame.next_state(state, 20))
+
+    def test_invalid_move_leaves_tracker_untouched(self):
+        groups = GroupTracker(5)
+        state = gogame.next_state(gogame.init_state(5), 0, groups=groups)
+        board = list(groups.board)
+
+        with self.assertRaises(AssertionError):
+            gogame.next_state(state, 0, groups=groups)
+        self.assertEqual(groups.board, board)
+        self.assertEqual(groups.turn, govars.WHITE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import random
+import numpy as np
+
+from playgroundrl_envs.games.go.engine import gogame, rollout
+from playgroundrl_envs.games.go.engine.group_tracker import GroupTracker
+
+
+class TestRollout(unittest.TestCase):
+    def test_rollout_plays_to_the_end(self):
+        groups = GroupTracker(9)
+        black_area, white_area = rollout.rollout(groups, rng=random.Random(0))
+
+        self.assertTrue(groups.done)
+        self.assertEqual((black_area, white_area), gogame.areas(groups.compact_state()))
+        self.assertLessEqual(black_area + white_area, 81)
+
+    def test_batch_rollouts_are_seeded(self):
+        state = gogame.init_state(7)
+        for action in [24, 10, 30]:
+            state = gogame.next_state(state, action)
+
+        first = rollout.batch_rollouts(state, 20, seed=1)
+        second = rollout.batch_rollouts(state, 20, seed=1)
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(first[0].shape, (20,))
+
+        # The starting state is left alone
+        self.assertEqual(np.sum(state[:2]), 3)
+
+    def test_weighted_rollout(self):
+        # Only passing has weight, so the game ends right away
+        weights = np.zeros(26)
+        weights[-1] = 1
+        self.assertEqual(rollout.rollout(gogame.init_state(5), move_weights=weights), (0.0, 0.0))
+
+        # Only the first row and passing are ever played
+        weights[:5] = 1
+        groups = GroupTracker(5)
+        rollout.rollout(groups, move_weights=weights, rng=random.Random(2))
+        stones = [loc for loc, color in enumerate(groups.board) if color != -1]
+        self.assertTrue(all(loc < 5 for loc in stones))
+
+
+if __name__ == "__main__":
+    unittest.main()
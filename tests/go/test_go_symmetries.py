@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+
+from playgroundrl_envs.games.go.engine import gogame
+
+
+class TestSymmetries(unittest.TestCase):
+    def test_batch_symmetries_match_all_symmetries(self):
+        batch = np.random.rand(4, 3, 7, 7)
+        symmetries = gogame.batch_symmetries(batch)
+        self.assertEqual(symmetries.shape, (4, 8, 3, 7, 7))
+        self.assertTrue(symmetries.flags.c_contiguous)
+
+        for image, image_symmetries in zip(batch, symmetries):
+            for expected, actual in zip(gogame.all_symmetries(image), image_symmetries):
+                np.testing.assert_array_equal(expected, actual)
+
+    def test_policy_symmetries_follow_board(self):
+        state = gogame.next_state(gogame.init_state(5), 7)
+        policy = np.zeros((1, 26))
+        policy[0, 7] = 0.75
+        policy[0, 25] = 0.25
+
+        state_symmetries = gogame.batch_symmetries(state[np.newaxis])[0]
+        policy_symmetries = gogame.batch_policy_symmetries(policy)[0]
+        for state_symmetry, policy_symmetry in zip(state_symmetries, policy_symmetries):
+            # The stone and the probability of playing there move together; pass stays put
+            self.assertEqual(np.argmax(state_symmetry[0]), np.argmax(policy_symmetry[:-1]))
+            self.assertEqual(policy_symmetry[-1], 0.25)
+
+    def test_random_symmetry_is_one_of_all(self):
+        batch = np.random.rand(16, 2, 5, 5)
+        policy = np.random.rand(16, 26)
+        images, policies = gogame.batch_random_symmetry(batch, policy)
+
+        all_images = gogame.batch_symmetries(batch)
+        all_policies = gogame.batch_policy_symmetries(policy)
+        for i in range(16):
+            matches = [k for k in range(8) if np.array_equal(all_images[i, k], images[i])]
+            self.assertTrue(any(np.array_equal(all_policies[i, k], policies[i]) for k in matches))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+
+from playgroundrl_envs.games.go.engine import gogame
+from playgroundrl_envs.games.go.engine.transposition import TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_cached_results_match(self):
+        cache = TranspositionTable()
+        state = gogame.init_state(5)
+        for action in [6, 7, 12, 13]:
+            state = gogame.next_state(state, action)
+
+        for _ in range(3):
+            np.testing.assert_array_equal(
+                gogame.next_state(state, 0, cache=cache), gogame.next_state(state, 0)
+            )
+            np.testing.assert_array_equal(gogame.valid_moves(state, cache=cache), gogame.valid_moves(state))
+            np.testing.assert_array_equal(gogame.children(state, cache=cache), gogame.children(state))
+
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.hits, 6)
+        self.assertEqual(cache.stats()["size"], 3)
+
+    def test_results_are_copies(self):
+        cache = TranspositionTable()
+        state = gogame.init_state(5)
+        gogame.next_state(state, 0, cache=cache)[:] = 7
+        self.assertEqual(gogame.next_state(state, 0, cache=cache).max(), 1)
+
+    def test_compact_and_tensor_states_kept_apart(self):
+        cache = TranspositionTable()
+        gogame.next_state(gogame.init_state(5), 0, cache=cache)
+        result = gogame.next_state(gogame.init_state(5, compact=True), 0, cache=cache)
+        self.assertIsInstance(result, gogame.CompactState)
+        self.assertEqual(cache.hits, 0)
+
+    def test_eviction(self):
+        cache = TranspositionTable(max_size=2)
+        state = gogame.init_state(5)
+        for action in range(4):
+            gogame.next_state(state, action, cache=cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 2)
+
+        # Most recently used entries survive
+        gogame.next_state(state, 3, cache=cache)
+        self.assertEqual(cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+
+from playgroundrl_envs.games.go.engine import gogame, zobrist
+from playgroundrl_envs.games.go.engine.group_tracker import GroupTracker
+
+
+def random_tracked_game(size, seed, superko=False, max_moves=300):
+    rng = np.random.RandomState(seed)
+    state = gogame.init_state(size, compact=True)
+    groups = GroupTracker(size, superko=superko)
+    for _ in range(max_moves):
+        if state.done:
+            break
+        valid = np.flatnonzero(gogame.valid_moves(state))
+        if len(valid) > 1 and rng.rand() < 0.95:
+            valid = valid[:-1]
+        state = gogame.next_state(state, rng.choice(valid), groups=groups)
+        yield state, groups
+
+
+class TestZobrist(unittest.TestCase):
+    def test_incremental_hash_matches_full_hash(self):
+        for state, groups in random_tracked_game(7, 0):
+            self.assertEqual(state.position_hash, zobrist.position_hash(state))
+            self.assertEqual(gogame.position_hash(state.tensor()), state.position_hash)
+
+    def test_hash_is_deterministic(self):
+        state = gogame.next_state(gogame.init_state(9), 40)
+        self.assertEqual(gogame.position_hash(state), int(zobrist.stone_keys(9)[0, 40]))
+        self.assertNotEqual(gogame.state_hash(state), gogame.state_hash(gogame.next_state(state, 81)))
+
+    def test_superko_forbids_repeated_positions(self):
+        for seed in range(5):
+            seen = {0}
+            for state, groups in random_tracked_game(3, seed, superko=True):
+                if not state.passed:
+                    self.assertNotIn(state.position_hash, seen)
+                seen.add(state.position_hash)
+
+                # Every empty point left valid must lead to a new position
+                for loc in np.flatnonzero(~state.invalid):
+                    self.assertNotIn(groups.next_position_hash(loc, groups.turn), groups.history)
+
+    def test_superko_matches_played_positions(self):
+        for state, groups in random_tracked_game(3, 0, superko=True):
+            for loc in np.flatnonzero(state.invalid.ravel() & ~state.stones.any(axis=0).ravel()):
+                if loc == groups.ko or loc in groups.enclosed:
+                    continue
+                # Not suicide or ko, so it must be a repeat: check by playing it out
+                copied = groups.copy()
+                copied.history = None
+                copied.play(int(loc))
+                self.assertIn(copied.position_hash, groups.history)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import json
+import numpy as np
+
+from playgroundrl_envs.games.chess import ChessGame, ChessPlayer, ChessParameters
+from playgroundrl_envs.games.go.go import GoGame, GoParameters, GoPlayer
+from playgroundrl_envs.games.go.engine import gogame
+from playgroundrl_envs.games.snake import SnakeGame, SnakeParameters, SnakePlayer
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game(game_class, player_class, parameters):
+    players = [
+        player_class(SidSessionInfo(f"sid-{i}", i, False), i)
+        for i in range(game_class.get_num_players())
+    ]
+    return game_class(
+        game_id=0, players=players, game_type=0, parameters=parameters
+    )
+
+
+class TestObservations(unittest.TestCase):
+    def assert_round_trips(self, game, observation):
+        dtype = game.get_observation_dtype()
+        self.assertEqual(observation.dtype, dtype)
+        self.assertEqual(observation.shape, ())
+        unpacked = np.frombuffer(observation.tobytes(), dtype)[0]
+        self.assertEqual(unpacked.tobytes(), observation.tobytes())
+
+    def test_go(self):
+        game = create_game(GoGame, GoPlayer, GoParameters(board_size=9))
+        rng = np.random.RandomState(0)
+        while not game.get_is_game_over():
+            player = game.get_player_moving()
+            state, reward = game.get_state(player.sid, player.player_id)
+            observation, observation_reward = game.get_observation(player.sid, player.player_id)
+            state = json.loads(state)
+
+            self.assert_round_trips(game, observation)
+            self.assertEqual(observation_reward, reward)
+            self.assertEqual(observation["player_moving_id"], state["player_moving_id"])
+            np.testing.assert_array_equal(observation["board"], state["board"])
+            np.testing.assert_array_equal(observation["invalid_moves"], state["invalid_moves"])
+            self.assertEqual(observation["last_move_was_pass"], state["last_move_was_pass"])
+
+            valid = np.flatnonzero(gogame.valid_moves(game.state))
+            if len(valid) > 1 and rng.rand() < 0.97:
+                valid = valid[:-1]
+            game.advance_game_state(rng.choice(valid), player.sid)
+
+    def test_tic_tac_toe(self):
+        game = create_game(TicTacToeGame, TicTacToePlayer, TicTacToeParameters())
+        for action in [4, 0, 8, 2]:
+            player = game.get_player_moving()
+            game.advance_game_state(str(action), player.sid)
+
+            state = json.loads(game.get_state()[0])
+            observation, _ = game.get_observation()
+            self.assert_round_trips(game, observation)
+            self.assertEqual(observation["player_moving_id"], state["player_moving_id"])
+            np.testing.assert_array_equal(observation["board"], state["board"])
+
+    def test_snake(self):
+        game = create_game(SnakeGame, SnakePlayer, SnakeParameters())
+        for action in ["E", "S", "E", "S", "W"]:
+            game.advance_game_state(action)
+
+            state = json.loads(game.get_state()[0])
+            observation, reward = game.get_observation()
+            self.assert_round_trips(game, observation)
+            self.assertEqual(reward, game.get_state()[1])
+            self.assertEqual(observation["apple"].tolist(), state["apple"])
+            length = observation["snake_length"]
+            self.assertEqual(observation["snake"][:length].tolist(), state["snake"])
+
+    def test_chess(self):
+        game = create_game(ChessGame, ChessPlayer, ChessParameters())
+        # Includes a legal en passant capture, and loses castling rights on both sides
+        for uci in ["e2e4", "a7a6", "e4e5", "d7d5", "e1e2", "a8a7"]:
+            player = game.get_player_moving()
+            game.advance_game_state(json.dumps({"uci": uci}), player.sid)
+
+            observation, _ = game.get_observation()
+            self.assert_round_trips(game, observation)
+
+            # Rebuild the FEN from the observation
+            rows = []
+            for rank in reversed(range(8)):
+                row = ""
+                for code in observation["board"][rank]:
+                    if code == 0:
+                        row += "1"
+                    else:
+                        symbol = "_pnbrqk"[abs(code)]
+                        row += symbol.upper() if code > 0 else symbol
+                rows.append(row)
+            placement = "/".join(rows)
+            for empties in range(8, 1, -1):
+                placement = placement.replace("1" * empties, str(empties))
+
+            castling = "".join(
+                symbol for symbol, right in zip("KQkq", observation["castling"]) if right
+            )
+            ep_square = observation["ep_square"]
+            fen = " ".join(
+                [
+                    placement,
+                    "w" if observation["turn"] else "b",
+                    castling or "-",
+                    "-" if ep_square == -1 else "abcdefgh"[ep_square % 8] + str(ep_square // 8 + 1),
+                    str(observation["halfmove_clock"]),
+                    str(observation["fullmove_number"]),
+                ]
+            )
+            self.assertEqual(fen, json.loads(game.get_state()[0])["fen"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import json
+import numpy as np
+
+from playgroundrl_envs.self_play import self_play
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs.games.go.go import GoGame, GoParameters, GoPlayer
+
+
+def random_tic_tac_toe(state, player_id, rng):
+    board = json.loads(state)["board"]
+    return str(rng.choice([i for i in range(9) if board[i // 3][i % 3] == -1]))
+
+
+def random_go(state, player_id, rng):
+    invalid_moves = np.array(json.loads(state)["invalid_moves"]).flatten()
+    valid = [i for i in range(len(invalid_moves)) if invalid_moves[i] == 0]
+    # Pass a tenth of the time so games end
+    if not valid or rng.random() < 0.1:
+        return str(len(invalid_moves))
+    return str(rng.choice(valid))
+
+
+class TestSelfPlay(unittest.TestCase):
+    def test_tic_tac_toe_in_process(self):
+        trajectories = list(
+            self_play(
+                TicTacToeGame,
+                TicTacToePlayer,
+                TicTacToeParameters(),
+                random_tic_tac_toe,
+                num_games=10,
+                num_workers=0,
+            )
+        )
+        self.assertEqual([t.game_index for t in trajectories], list(range(10)))
+        for trajectory in trajectories:
+            self.assertTrue(trajectory.finished)
+            self.assertEqual(trajectory.player_ids[:2], [0, 1])
+            self.assertIn(trajectory.outcomes[0], [0, 0.5, 1])
+            self.assertEqual(trajectory.outcomes[0] + trajectory.outcomes[1], 1)
+
+    def test_pool_matches_in_process(self):
+        args = (GoGame, GoPlayer, GoParameters(board_size=5), random_go)
+        in_process = list(self_play(*args, num_games=6, num_workers=0, seed=3))
+        pooled = sorted(self_play(*args, num_games=6, num_workers=2, seed=3), key=lambda t: t.game_index)
+
+        for expected, actual in zip(in_process, pooled):
+            self.assertEqual(expected.actions, actual.actions)
+            self.assertEqual(expected.final_rewards, actual.final_rewards)
+
+    def test_max_moves(self):
+        trajectory = next(
+            self_play(
+                GoGame,
+                GoPlayer,
+                GoParameters(board_size=5),
+                random_go,
+                num_games=1,
+                num_workers=0,
+                max_moves=3,
+            )
+        )
+        self.assertEqual(len(trajectory), 3)
+        self.assertFalse(trajectory.finished)
+        self.assertIsNone(trajectory.outcomes[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
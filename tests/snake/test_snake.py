@@ -0,0 +1,73 @@
+import unittest
+import json
+import random
+
+from playgroundrl_envs.games.snake import SnakeGame, SnakeParameters, SnakePlayer
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_snake_game(board_size=10):
+    player = SnakePlayer(SidSessionInfo("sid-0", 0, False), 0)
+    return SnakeGame(
+        game_id=0, players=[player], game_type=0, parameters=SnakeParameters(board_size=board_size)
+    )
+
+
+class TestSnakeGame(unittest.TestCase):
+    def test_board_size(self):
+        game = create_snake_game(board_size=40)
+        self.assertEqual(game.apple, (10, 10))
+        self.assertEqual(game.get_observation_dtype()["snake"].shape, (40 * 40 + 1, 2))
+
+        for _ in range(37):
+            game.submit_action("E")
+        self.assertFalse(game.get_is_game_over())
+        self.assertEqual(json.loads(game.get_state()[0])["snake"], [[38, 1]])
+
+        game.submit_action("E")
+        self.assertFalse(game.get_is_game_over())
+        game.submit_action("E")
+        self.assertTrue(game.get_is_game_over())
+        self.assertEqual(game.reward, -1)
+
+    def test_tail_moves_out_of_the_way(self):
+        game = create_snake_game()
+        game.apple = (9, 9)
+        game.snake.extendleft([(2, 1), (2, 2), (1, 2)])
+        game.occupied.update(game.snake)
+
+        for action in "SEN":
+            game.submit_action(action)
+            self.assertFalse(game.get_is_game_over())
+        self.assertEqual(list(game.snake), [(1, 1), (1, 2), (2, 2), (2, 1)])
+        self.assertEqual(game.occupied, set(game.snake))
+
+        # Into the body, not the tail
+        game.submit_action("S")
+        self.assertTrue(game.get_is_game_over())
+        self.assertEqual(game.reward, -1)
+
+    def test_apples_land_on_free_cells(self):
+        random.seed(0)
+        game = create_snake_game(board_size=3)
+        game.snake.extend([(2, 1), (2, 2), (1, 2), (0, 2), (0, 1), (0, 0)])
+        game.occupied.update(game.snake)
+
+        cells = {game.random_free_cell() for _ in range(50)}
+        self.assertEqual(cells, {(1, 0), (2, 0)})
+
+    def test_full_board_ends_game(self):
+        game = create_snake_game(board_size=2)
+        game.snake.clear()
+        game.snake.extend([(1, 0), (1, 1), (0, 1)])
+        game.occupied = set(game.snake)
+        game.apple = (0, 1)
+
+        game.submit_action("N")
+        self.assertEqual(game.reward, 1)
+        self.assertTrue(game.get_is_game_over())
+        self.assertEqual(game.get_outcome(0), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import random
+
+import numpy as np
+
+from playgroundrl_envs.games.snake import SnakeGame, SnakeParameters, SnakePlayer
+from playgroundrl_envs.games.snake_engine import MOVES, BatchSnake
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_snake_game():
+    player = SnakePlayer(SidSessionInfo("sid-0", 0, False), 0)
+    return SnakeGame(game_id=0, players=[player], game_type=0, parameters=SnakeParameters())
+
+
+class TestBatchSnake(unittest.TestCase):
+    def test_matches_snake_game(self):
+        num_boards = 32
+        engine = BatchSnake(num_boards, seed=0)
+        games = [create_snake_game() for _ in range(num_boards)]
+        rng = random.Random(0)
+
+        num_grown = 0
+        for _ in range(200):
+            actions = [rng.choice(MOVES) for _ in range(num_boards)]
+            rewards, dones = engine.step([MOVES.index(action) for action in actions])
+
+            for i, game in enumerate(games):
+                if game.get_is_game_over():
+                    self.assertEqual(rewards[i], 0)
+                    continue
+                game.submit_action(actions[i])
+                # Apples are random, the engine places them where the game did
+                engine.apples[i] = game.apple
+
+                self.assertEqual(rewards[i], game.reward)
+                self.assertEqual(dones[i], game.get_is_game_over())
+                self.assertEqual(engine.snake(i), list(game.snake))
+                num_grown += game.reward == 1
+
+            if dones.all():
+                break
+        self.assertTrue(dones.all())
+        self.assertGreater(num_grown, 0)
+
+    def test_tail_moves_out_of_the_way(self):
+        engine = BatchSnake(1)
+        engine.apples[0] = (9, 9)
+        # Grow to four segments in a square, then follow the tail around
+        engine.lengths[0] = 4
+        engine.heads[0] = 3
+        engine.bodies[0, :4] = [(1, 1), (2, 1), (2, 2), (1, 2)]
+        engine.occupancy[0] = 0
+        engine.occupancy[0, [1, 2, 2, 1], [1, 1, 2, 2]] = 1
+
+        for action in "NESW":
+            rewards, dones = engine.step([MOVES.index(action)])
+            self.assertFalse(dones[0])
+            self.assertEqual(rewards[0], -0.01)
+        self.assertEqual(engine.snake(0), [(1, 1), (2, 1), (2, 2), (1, 2)])
+        self.assertEqual(engine.occupancy[0].sum(), 4)
+
+    def test_apples_land_on_free_cells(self):
+        engine = BatchSnake(64, size=3, seed=0)
+        # Three segments along the top row, the head on the apple
+        engine.lengths[:] = 3
+        engine.heads[:] = 2
+        engine.bodies[:, :3] = [(0, 0), (1, 0), (2, 0)]
+        engine.occupancy[:] = 0
+        engine.occupancy[:, :, 0] = 1
+        engine.apples[:] = (2, 0)
+
+        rewards, dones = engine.step(np.full(64, MOVES.index("S")))
+        self.assertTrue((rewards == 1).all())
+        self.assertFalse(dones.any())
+        apples = engine.apples
+        self.assertFalse(engine.occupancy[np.arange(64), apples[:, 0], apples[:, 1]].any())
+        # All five free cells come up
+        self.assertEqual(len({tuple(apple) for apple in apples.tolist()}), 5)
+
+    def test_full_board_ends_game(self):
+        engine = BatchSnake(1, size=2)
+        engine.lengths[0] = 3
+        engine.heads[0] = 2
+        engine.bodies[0, :3] = [(1, 0), (1, 1), (0, 1)]
+        engine.occupancy[0] = [[0, 1], [1, 1]]
+        engine.apples[0] = (0, 1)
+
+        rewards, dones = engine.step([MOVES.index("N")])
+        self.assertEqual(rewards[0], 1)
+        self.assertTrue(dones[0])
+        self.assertEqual(engine.lengths[0], 4)
+
+    def test_reset(self):
+        engine = BatchSnake(2)
+        rewards, dones = engine.step([MOVES.index("N"), MOVES.index("E")])
+        self.assertEqual(dones.tolist(), [False, False])
+        rewards, dones = engine.step([MOVES.index("N"), MOVES.index("E")])
+        self.assertEqual(dones.tolist(), [True, False])
+        self.assertEqual(rewards[0], -1)
+
+        engine.reset(dones)
+        self.assertEqual(engine.snake(0), [(1, 1)])
+        self.assertEqual(engine.snake(1), [(3, 1)])
+        self.assertEqual(engine.occupancy[0].sum(), 1)
+        self.assertFalse(engine.done.any())
+
+
+if __name__ == "__main__":
+    unittest.main()
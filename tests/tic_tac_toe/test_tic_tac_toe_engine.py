@@ -0,0 +1,114 @@
+import unittest
+import itertools
+import json
+
+from playgroundrl_envs.exceptions import PlaygroundInvalidActionException
+from playgroundrl_envs.games import tic_tac_toe_engine as engine
+from playgroundrl_envs.games.tic_tac_toe import (
+    EMPTY_SQUARE,
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+    check_winning_board,
+)
+from playgroundrl_envs.self_play import self_play
+from playgroundrl_envs.sid_util import SidSessionInfo
+
+
+def create_game():
+    players = [TicTacToePlayer(SidSessionInfo(f"sid-{i}", i, False), i) for i in range(2)]
+    return TicTacToeGame(game_id=0, players=players, game_type=0, parameters=TicTacToeParameters())
+
+
+def perfect_against_random(state, player_id, rng):
+    # Player 0 plays perfectly, player 1 randomly
+    if player_id == 0:
+        return engine.perfect_play_policy(state, player_id, rng)
+    board = json.loads(state)["board"]
+    return str(rng.choice([i for i in range(9) if board[i // 3][i % 3] == EMPTY_SQUARE]))
+
+
+class TestTicTacToeEngine(unittest.TestCase):
+    def test_winning_matches_lines(self):
+        lines = [[(r, c) for c in range(3)] for r in range(3)]
+        lines += [[(r, c) for r in range(3)] for c in range(3)]
+        lines += [[(i, i) for i in range(3)], [(i, 2 - i) for i in range(3)]]
+        for mask in range(engine.FULL_BOARD + 1):
+            squares = {divmod(i, 3) for i in range(9) if mask >> i & 1}
+            expected = any(all(square in squares for square in line) for line in lines)
+            self.assertEqual(engine.has_won(mask), expected)
+
+    def test_check_winning_board(self):
+        for cells in itertools.product([EMPTY_SQUARE, 0, 1], repeat=9):
+            board = [list(cells[i : i + 3]) for i in range(0, 9, 3)]
+            mask0, mask1 = engine.from_board(board)
+            self.assertEqual(
+                check_winning_board(board), engine.has_won(mask0) or engine.has_won(mask1)
+            )
+
+    def test_solved_table(self):
+        values = engine.solve()
+        self.assertEqual(len(values), 5478)
+        self.assertEqual(engine.position_value(0, 0), engine.DRAW)
+        # Every opening move draws
+        self.assertEqual(set(engine.move_values(0, 0).values()), {engine.DRAW})
+
+        # X on 0 and 4, O on 1: X threatens 8, and O can't block both 8 and the fork
+        mask0, mask1 = 0b000010001, 0b000000010
+        self.assertEqual(engine.player_to_move(mask0, mask1), 1)
+        self.assertEqual(engine.position_value(mask0, mask1), engine.LOSS)
+        # X on 0 and 4, O on 1 and 2: X wins right away on 8
+        mask1 |= 1 << 2
+        self.assertEqual(engine.position_value(mask0, mask1), engine.WIN)
+        self.assertIn(8, engine.best_moves(mask0, mask1))
+        self.assertTrue(engine.has_won(engine.play(mask0, mask1, 8)[0]))
+
+    def test_game_move_values(self):
+        game = create_game()
+        for action in ["0", "1", "4"]:
+            player = game.get_player_moving()
+            game.advance_game_state(action, player.sid)
+
+        # Blocking 8 still loses to the fork on 6
+        values = game.get_move_values()
+        self.assertEqual(values, {action: engine.LOSS for action in [2, 3, 5, 6, 7, 8]})
+
+    def test_out_of_range_action(self):
+        game = create_game()
+        game.advance_game_state("4", game.get_player_moving().sid)
+        board = [row.copy() for row in game.board]
+        masks = game.masks.copy()
+        player = game.get_player_moving()
+
+        for action in ["-1", "9"]:
+            with self.assertRaises(PlaygroundInvalidActionException):
+                game.advance_game_state(action, player.sid)
+            self.assertEqual(game.board, board)
+            self.assertEqual(game.masks, masks)
+            self.assertIs(game.get_player_moving(), player)
+
+    def test_perfect_play_never_loses(self):
+        trajectories = self_play(
+            TicTacToeGame,
+            TicTacToePlayer,
+            TicTacToeParameters(),
+            perfect_against_random,
+            num_games=50,
+            num_workers=0,
+        )
+        for trajectory in trajectories:
+            self.assertIn(trajectory.outcomes[0], [0.5, 1])
+
+        for trajectory in self_play(
+            TicTacToeGame,
+            TicTacToePlayer,
+            TicTacToeParameters(),
+            engine.perfect_play_policy,
+            num_games=10,
+            num_workers=0,
+        ):
+            self.assertEqual(trajectory.outcomes[0], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import numpy as np
+
+from playgroundrl_envs.exceptions import PlaygroundInvalidActionException
+from playgroundrl_envs.games.go.go import GoGame, GoParameters, GoPlayer
+from playgroundrl_envs.games.snake import SnakeGame, SnakeParameters, SnakePlayer
+from playgroundrl_envs.games.tic_tac_toe import (
+    TicTacToeGame,
+    TicTacToeParameters,
+    TicTacToePlayer,
+)
+from playgroundrl_envs.vector_env import VectorEnv
+
+
+def random_go_actions(observations, rng):
+    actions = []
+    for observation in observations:
+        valid = np.flatnonzero(~observation["invalid_moves"].ravel())
+        # Pass now and then, so games end
+        if len(valid) == 0 or rng.rand() < 0.05:
+            actions.append(observation["invalid_moves"].size)
+        else:
+            actions.append(rng.choice(valid))
+    return actions
+
+
+class TestVectorEnv(unittest.TestCase):
+    def test_go_fast_path_matches_games(self):
+        parameters = GoParameters(board_size=5)
+        fast = VectorEnv(GoGame, GoPlayer, parameters, num_envs=16)
+        slow = VectorEnv(GoGame, GoPlayer, parameters, num_envs=16, fast_path=False)
+        self.assertTrue(fast.batched_go)
+        self.assertFalse(slow.batched_go)
+
+        observations = fast.reset()
+        np.testing.assert_array_equal(observations, slow.reset())
+
+        rng = np.random.RandomState(0)
+        num_done = 0
+        for _ in range(150):
+            actions = random_go_actions(observations, rng)
+            observations, rewards, dones, infos = fast.step(actions)
+            slow_observations, slow_rewards, slow_dones, slow_infos = slow.step(actions)
+
+            np.testing.assert_array_equal(observations, slow_observations)
+            np.testing.assert_array_equal(rewards, slow_rewards)
+            np.testing.assert_array_equal(dones, slow_dones)
+            for info, slow_info in zip(infos, slow_infos):
+                self.assertEqual(info.keys(), slow_info.keys())
+                if info:
+                    self.assertEqual(info["outcomes"], slow_info["outcomes"])
+                    np.testing.assert_array_equal(
+                        info["final_observation"], slow_info["final_observation"]
+                    )
+            num_done += dones.sum()
+        self.assertGreater(num_done, 0)
+
+    def test_go_invalid_action(self):
+        env = VectorEnv(GoGame, GoPlayer, GoParameters(board_size=5), num_envs=2)
+        env.reset()
+        env.step([0, 0])
+        states = env.states.copy()
+        with self.assertRaises(PlaygroundInvalidActionException):
+            env.step([1, 0])
+        np.testing.assert_array_equal(env.states, states)
+
+    def test_tic_tac_toe(self):
+        env = VectorEnv(TicTacToeGame, TicTacToePlayer, TicTacToeParameters(), num_envs=3)
+        observations = env.reset()
+        self.assertEqual(observations.shape, (3,))
+        self.assertTrue((observations["board"] == -1).all())
+
+        # Player 0 wins down the first column in env 0, the others fill the board in order
+        for step, actions in enumerate([["0", "0", "0"], ["1", "1", "1"], ["3", "2", "2"], ["2", "3", "3"]]):
+            observations, rewards, dones, infos = env.step(actions)
+            self.assertFalse(dones.any())
+        observations, rewards, dones, infos = env.step(["6", "4", "4"])
+
+        self.assertEqual(dones.tolist(), [True, False, False])
+        self.assertEqual(rewards[0], 1)
+        self.assertEqual(infos[0]["outcomes"], {0: 1, 1: 0})
+        self.assertEqual(infos[0]["final_observation"]["board"][:, 0].tolist(), [0, 0, 0])
+        self.assertTrue((observations["board"][0] == -1).all())
+        self.assertEqual(infos[1], {})
+
+    def test_snake_fast_path(self):
+        fast = VectorEnv(SnakeGame, SnakePlayer, SnakeParameters(), num_envs=2)
+        slow = VectorEnv(SnakeGame, SnakePlayer, SnakeParameters(), num_envs=2, fast_path=False)
+        self.assertTrue(fast.batched_snake)
+        np.testing.assert_array_equal(fast.reset(), slow.reset())
+
+        # Env 0 runs off the top, env 1 eats the apple at (2, 2) and grows
+        for actions in [["N", "E"], ["N", "S"], ["E", "E"]]:
+            observations, rewards, dones, infos = fast.step(actions)
+            slow_observations, slow_rewards, slow_dones, slow_infos = slow.step(actions)
+            np.testing.assert_array_equal(rewards, slow_rewards)
+            np.testing.assert_array_equal(dones, slow_dones)
+            self.assertEqual(observations[0], slow_observations[0])
+            self.assertEqual(infos[0].keys(), slow_infos[0].keys())
+
+        self.assertEqual(rewards.tolist(), [-0.01, 1])
+        self.assertEqual(observations["snake_length"].tolist(), [1, 2])
+        self.assertEqual(observations["snake"][1, :2].tolist(), [[2, 2], [3, 2]])
+
+        with self.assertRaises(PlaygroundInvalidActionException):
+            fast.step(["X", "N"])
+
+
+if __name__ == "__main__":
+    unittest.main()